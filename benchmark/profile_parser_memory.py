@@ -0,0 +1,113 @@
+"""
+compare peak memory use of make_lhorizon_dataframe() with the regex /
+StringIO parser it replaced, and with parsing plain-text (format=text)
+responses, using the cached responses in lhorizon's test data. responses
+are also repeated end-to-end (by repeating their data sections) to show
+how each parser scales with response size.
+
+note that tracemalloc sees allocations made through Python's allocators
+(strings, buffers, numpy arrays) but not scratch space malloc()ed directly
+by the pandas C parser, which is the same for both paths.
+"""
+from functools import partial
+from io import StringIO
+import json
+from pathlib import Path
+import re
+import time
+import tracemalloc
+
+import pandas as pd
+
+from lhorizon._response_parsers import (
+    HORIZON_COLUMN_SEARCH,
+    HORIZON_DATA_SEARCH,
+    clean_visibility_flags,
+    make_lhorizon_dataframe,
+)
+
+DATA_PATH = Path(__file__).parent.parent / "lhorizon" / "tests" / "data"
+REPEATS = (1, 100, 1000)
+
+
+def legacy_make_lhorizon_dataframe(jpl_response):
+    """the previous parser, minus topocentric handling"""
+    jpl_result = json.loads(jpl_response)['result']
+    data = re.search(HORIZON_DATA_SEARCH, jpl_result).group(1)
+    columns = re.search(HORIZON_COLUMN_SEARCH, jpl_result)[0].replace(" ", "")
+    data_buffer = StringIO()
+    data_buffer.write(columns + "\n" + data)
+    data_buffer.seek(0)
+    horizon_dataframe = pd.read_csv(
+        data_buffer, sep=",", engine="c", low_memory=False
+    )
+    horizon_dataframe = horizon_dataframe.iloc[:, :-1]
+    horizon_dataframe = clean_visibility_flags(horizon_dataframe)
+    for c in horizon_dataframe.columns:
+        if ('(ut)' in c.lower()) or ('(tdb)' in c.lower()):
+            horizon_dataframe[c] = horizon_dataframe[c].str.strip()
+    return horizon_dataframe
+
+
+def enlarge(jpl_response, repeats):
+    """repeat the data section of a response `repeats` times"""
+    body = json.loads(jpl_response)
+    result = body["result"]
+    start = result.index("$$SOE\n") + len("$$SOE\n")
+    stop = result.index("$$EOE")
+    body["result"] = (
+        result[:start] + result[start:stop] * repeats + result[stop:]
+    )
+    return json.dumps(body)
+
+
+def profile(parser, jpl_response):
+    """peak traced memory (bytes) and wall time (s) of one parse"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    frame = parser(jpl_response)
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return frame, peak, duration
+
+
+rows = []
+for path in sorted(DATA_PATH.iterdir()):
+    if path.suffix != "" or not path.is_file():
+        continue
+    response = path.read_text()
+    if "$$SOE" not in response:
+        continue
+    for repeats in REPEATS:
+        enlarged = enlarge(response, repeats)
+        legacy, legacy_peak, legacy_time = profile(
+            legacy_make_lhorizon_dataframe, enlarged
+        )
+        current, current_peak, current_time = profile(
+            make_lhorizon_dataframe, enlarged
+        )
+        pd.testing.assert_frame_equal(legacy, current)
+        # what Horizons would have sent if asked for format=text
+        text = json.loads(enlarged)["result"].encode("utf-8")
+        from_text, text_peak, text_time = profile(
+            partial(make_lhorizon_dataframe, response_format="text"), text
+        )
+        pd.testing.assert_frame_equal(legacy, from_text)
+        rows.append(
+            {
+                "response": path.name,
+                "repeats": repeats,
+                "size_MB": len(enlarged) / 1e6,
+                "legacy_peak_MB": legacy_peak / 1e6,
+                "peak_MB": current_peak / 1e6,
+                "text_peak_MB": text_peak / 1e6,
+                "legacy_s": legacy_time,
+                "s": current_time,
+                "text_s": text_time,
+            }
+        )
+        del enlarged, legacy, current, text, from_text
+
+print(pd.DataFrame(rows).round(3).to_string(index=False))
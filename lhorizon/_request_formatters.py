@@ -10,6 +10,8 @@ from typing import Union
 import numpy as np
 import pandas as pd
 
+from lhorizon.constants import TABLE_COLUMN_QUANTITIES, VEC_TABLE_CODES
+
 
 def format_geodetic_origin(location: Mapping) -> dict:
     """
@@ -103,3 +105,25 @@ def assemble_request_params(
         "VEC_TABLE": f"'{vec_table}'",
         "REF_PLANE": ref_plane
     }
+
+
+def format_column_quantities(
+    query_type: str, columns: Sequence[str]
+) -> Union[str, int]:
+    """
+    find the minimal Horizons quantity specification that produces the
+    named columns of LHorizon.table(): a QUANTITIES string for OBSERVER
+    queries, a VEC_TABLE code for VECTORS queries.
+    """
+    column_quantities = TABLE_COLUMN_QUANTITIES[query_type]
+    unknown = [c for c in columns if c not in column_quantities]
+    if len(unknown) > 0:
+        raise ValueError(
+            f"unknown {query_type} table column(s): {', '.join(unknown)}"
+        )
+    quantities = {column_quantities[c] for c in columns} - {None}
+    if query_type == "VECTORS":
+        # at least one group is required; ask for the smallest table
+        return VEC_TABLE_CODES[frozenset(quantities or "L")]
+    # ...and at least one quantity
+    return ",".join(map(str, sorted(quantities or {20})))
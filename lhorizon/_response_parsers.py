@@ -3,70 +3,211 @@ helper functions for parsing response text from the JPL Horizons API.
 these functions are intended to be called by LHorizon methods and should
 generally not be called directly.
 """
+import datetime as dt
+import functools
+import io
 import json
 import re
 import warnings
-from io import StringIO
-from typing import Optional
+from collections.abc import Sequence
+from typing import NamedTuple, Optional, Union
 
 import numpy as np
 import pandas as pd
 from dateutil import parser as dtp
 from pandas._libs import OutOfBoundsDatetime
 
-from lhorizon.config import TABLE_PATTERNS, VISIBILITY_FLAG_NAMES
+from lhorizon.config import (
+    JD_TABLE_PATTERNS, TABLE_PATTERNS, VISIBILITY_FLAG_NAMES
+)
 from lhorizon.constants import AU_TO_M
 from lhorizon.lhorizon_utils import hunt_csv, \
     convert_horizons_date_spec_to_strftime
 from lhorizon._type_aliases import Array
 
 # delimiters for column and data sections
-# 'JDTDB' begins the vectors columns; 'Date' begins the observer columns
+# 'JDTDB' begins the vectors columns; 'Date' begins the observer columns.
+# make_lhorizon_dataframe() locates these sections by offset, but these
+# patterns are retained for anything that wants to search a response.
 HORIZON_COLUMN_SEARCH = re.compile(r"(Date|JDTDB).*(?=\n\*+)")
 HORIZON_DATA_SEARCH = re.compile(r"\$\$SOE\n(.*)\$\$EOE", re.DOTALL)
 GEODETIC_SEARCH = re.compile(r"(?<=Target geodetic : )\.?\d.*(?= {)")
+# Horizons refuses to produce ephemerides longer than its line limit, with
+# a message like "Projected output length (~100001) exceeds 90024 line max"
+LINE_LIMIT_SEARCH = re.compile(r"exceeds\s+\d+\s+line\s+max", re.IGNORECASE)
 
 
 class HorizonsReturnedError(ValueError):
     pass
 
 
+def horizons_error_message(jpl_response: Optional[str]) -> Optional[str]:
+    """
+    return the error message from a Horizons API error response, or None if
+    jpl_response is not a Horizons API error response.
+    """
+    try:
+        body = json.loads(jpl_response)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(body, dict) and ("error" in body):
+        return str(body["error"])
+    return None
+
+
+def horizons_response_truncated(jpl_response: Union[str, bytes]) -> bool:
+    """
+    does a Horizons API response (in either format) lack part of the
+    requested ephemeris? this is the case if Horizons refused to produce it
+    because it would exceed the line limit, or if the response has a
+    start-of-ephemeris marker but no end-of-ephemeris marker (i.e., it was
+    cut off).
+    """
+    if isinstance(jpl_response, bytes):
+        start, stop = b"$$SOE", b"$$EOE"
+    else:
+        start, stop = "$$SOE", "$$EOE"
+    if start in jpl_response:
+        return stop not in jpl_response
+    # responses without data are short, so this is cheap
+    if isinstance(jpl_response, bytes):
+        jpl_response = jpl_response.decode("utf-8", errors="replace")
+    return LINE_LIMIT_SEARCH.search(jpl_response) is not None
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    read-only binary stream over a slice of a buffer, so that pd.read_csv()
+    can consume part of an encoded response without copying it
+    """
+
+    def __init__(self, buffer, start: int = 0, stop: Optional[int] = None):
+        self._view = memoryview(buffer)[start:stop]
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destination) -> int:
+        size = min(len(destination), len(self._view) - self._position)
+        destination[:size] = self._view[
+            self._position:self._position + size
+        ]
+        self._position += size
+        return size
+
+
+def _column_names(column_line: str) -> list[str]:
+    """
+    split a Horizons column header line into column names, naming blank and
+    duplicate headers as pd.read_csv() would if given the header line itself
+    """
+    names, seen = [], {}
+    for ix, name in enumerate(column_line.replace(" ", "").split(",")):
+        if name == "":
+            name = f"Unnamed: {ix}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _find_column_line(result: bytes, data_start: int) -> Optional[str]:
+    """
+    find the column header line, which is separated from the $$SOE marker
+    by a line of asterisks
+    """
+    stars_start = result.rfind(b"\n", 0, data_start - 1) + 1
+    column_start = result.rfind(b"\n", 0, max(stars_start - 1, 0)) + 1
+    column_line = result[column_start:stars_start - 1].decode().strip()
+    if (
+        result.startswith(b"*", stars_start)
+        and column_line.startswith(("Date", "JDTDB"))
+    ):
+        return column_line
+    # unusual layout; search the preamble the slow way
+    match = re.search(HORIZON_COLUMN_SEARCH, result[:data_start].decode())
+    return None if match is None else match[0]
+
+
+def _extract_result(
+    jpl_response: Union[str, bytes], response_format: str
+) -> bytes:
+    """
+    get the UTF-8-encoded result section of a Horizons API response. text
+    responses are nothing but the result section, so are simply encoded (if
+    necessary); JSON responses are decoded, raising a HorizonsReturnedError
+    if the response is an error message.
+    """
+    if response_format == "text":
+        if isinstance(jpl_response, str):
+            return jpl_response.encode("utf-8")
+        return jpl_response
+    if response_format != "json":
+        raise ValueError("response_format must be 'json' or 'text'")
+    try:
+        body = json.loads(jpl_response)
+    except TypeError:
+        body = None
+    if isinstance(body, dict) and ("error" in body):
+        raise HorizonsReturnedError(str(body["error"]))
+    if not (isinstance(body, dict) and isinstance(body.get("result"), str)):
+        return b""
+    return body["result"].encode("utf-8")
+
+
 def make_lhorizon_dataframe(
-    jpl_response: str, topocentric_target: bool = False
+    jpl_response: Union[str, bytes],
+    topocentric_target: bool = False,
+    response_format: str = "json",
 ) -> pd.DataFrame:
     """
-    make a DataFrame from Horizons API response JSON.
+    make a DataFrame from a Horizons API response: JSON by default, or, if
+    `response_format` is "text", the plain-text response Horizons returns
+    when queried with `format=text`. text responses may be passed as bytes,
+    which avoids decoding them at all.
+
+    the data section of the response can be many megabytes, so rather than
+    extracting it into new strings, this makes (at most) one encoded copy of
+    the result and passes pd.read_csv() a view of the section between the
+    $$SOE and $$EOE markers.
     """
-    data = None
-    try:
-        # load JSON and extract result section
-        jpl_result = json.loads(jpl_response)['result']
-        # grab these sections and write them into a string buffer:
-        # find bounds of column / data in response & strip spaces from columns
-        data = re.search(HORIZON_DATA_SEARCH, jpl_result).group(1)
-        columns = re.search(
-            HORIZON_COLUMN_SEARCH, jpl_result
-        )[0].replace(" ", "")
-    except (TypeError, AttributeError):
-        if data is not None:
-            raise HorizonsReturnedError(data)
+    result = _extract_result(jpl_response, response_format)
+    data_start = result.find(b"$$SOE\n")
+    data_stop = result.find(b"$$EOE", data_start)
+    if (data_start == -1) or (data_stop == -1):
+        # a plain-text response without data is a message from Horizons
+        if (response_format == "text") and (result.strip() != b""):
+            raise HorizonsReturnedError(
+                result.decode("utf-8", errors="replace").strip()
+            )
         raise ValueError(
             "Couldn't parse either usable data or error an message from "
             "Horizons response."
         )
-    data_buffer = StringIO()
-    data_buffer.write(columns + "\n" + data)
-    data_buffer.seek(0)
-    # read this buffer as csv
+    data_start += len(b"$$SOE\n")
+    column_line = _find_column_line(result, data_start)
+    if column_line is None:
+        raise HorizonsReturnedError(result[data_start:data_stop].decode())
     horizon_dataframe = pd.read_csv(
-        data_buffer, sep=",", engine="c", low_memory=False
+        _BufferReader(result, data_start, data_stop),
+        sep=",",
+        engine="c",
+        header=None,
+        names=_column_names(column_line),
+        low_memory=False,
     )
     # horizons ends lines w/commas, so pandas creates an empty trailing column
     horizon_dataframe = horizon_dataframe.iloc[:, :-1]
     horizon_dataframe = clean_visibility_flags(horizon_dataframe)
     # if appropriate, add target's geodetic coordinates
     if topocentric_target:
-        target_geodetic_coords = hunt_csv(GEODETIC_SEARCH, jpl_result)
+        target_geodetic_coords = hunt_csv(
+            GEODETIC_SEARCH, result[:data_start].decode()
+        )
         horizon_dataframe["geo_lon"] = target_geodetic_coords[0]
         horizon_dataframe["geo_lat"] = target_geodetic_coords[1]
         horizon_dataframe["geo_el"] = target_geodetic_coords[2]
@@ -97,24 +238,92 @@ def clean_visibility_flags(horizon_dataframe: pd.DataFrame) -> pd.DataFrame:
     return horizon_dataframe.drop(empty_flags, axis=1)
 
 
+# unit conversions for numeric columns, by query type and pattern: km to m,
+# AU to m, arcseconds to degrees
+UNIT_SCALES = {
+    "VECTORS": {
+        pattern: 1000
+        for pattern in ("X", "Y", "Z", "VX", "VY", "VZ", "RG", "RR", "LT")
+    },
+    "OBSERVER": {"delta": AU_TO_M, "Ang-diam": 1 / 3600},
+    "ELEMENTS": {pattern: 1000 for pattern in ("QR", "A$", "AD")},
+}
+# patterns for columns that never contain plain numbers
+NONNUMERIC_PATTERNS = (r"Calendar", r"Date_+\(UT\)") + VISIBILITY_FLAG_NAMES
+
+
 def clean_up_vectors_series(pattern: str, series: Array) -> pd.Series:
     """
     regularize units, format text, and parse dates in a VECTORS table column
     """
     # convert km to m
-    if pattern in ("X", "Y", "Z", "VX", "VY", "VZ", "RG", "RR", "LT"):
+    if pattern in UNIT_SCALES["VECTORS"]:
         return pd.Series(series.astype(np.float64) * 1000)
-    # parse ISO dates
+    if pattern == r"JDTDB":
+        return series.astype(np.float64)
+    # parse calendar dates
     if pattern == r"Calendar":
-        # they put AD/BC on these
-        return pd.Series([dtp.parse(instant[5:]) for instant in series])
+        return parse_vectors_calendar(series)
     warnings.warn(f"unhandled VECTORS column {pattern}")
 
 
+def clean_up_elements_series(pattern: str, series: Array) -> pd.Series:
+    """
+    regularize units and parse dates in an ELEMENTS table column
+    """
+    if pattern == r"Calendar":
+        return parse_vectors_calendar(series)
+    # distances from km to m; everything else is already in deg, s, or JD
+    scale = UNIT_SCALES["ELEMENTS"].get(pattern, 1)
+    return pd.Series(series.astype(np.float64) * scale)
+
+
 class OOBTimeWarning(UserWarning):
     pass
 
 
+# format of VECTORS calendar dates, following their 'A.D. ' / 'B.C. ' prefix
+VECTORS_CALENDAR_FORMAT = "%Y-%b-%d %H:%M:%S.%f"
+
+
+def warn_oob_time():
+    """warn that times could not be parsed to Timestamps"""
+    warnings.warn(
+        "This result contains dates outside of Pandas's "
+        "supported Timestamp range, so the 'time' column of the "
+        "output of table() will contain strings rather than "
+        "Timestamps. Pass ignore_oob_time=True to the LHorizon "
+        "constructor to suppress this warning.",
+        OOBTimeWarning
+    )
+
+
+def parse_vectors_calendar(series: pd.Series) -> pd.Series:
+    """
+    parse the 'Calendar Date (TDB)' column of a VECTORS table, formatted
+    like 'A.D. 2000-Jan-01 00:00:00.0000'. B.C. dates cannot be represented
+    as Timestamps, so if there are any, returns the column unparsed (with
+    an OOBTimeWarning). A.D. dates pandas can't represent as Timestamps
+    are parsed to datetimes instead.
+    """
+    if series.str.startswith("B.C.").any():
+        warn_oob_time()
+        return series
+    instants = series.str.slice(5)
+    try:
+        return pd.to_datetime(instants, format=VECTORS_CALENDAR_FORMAT)
+    except OutOfBoundsDatetime:
+        return pd.Series(
+            [
+                dt.datetime.strptime(instant, VECTORS_CALENDAR_FORMAT)
+                for instant in instants
+            ]
+        )
+    except ValueError:
+        # unexpected format; fall back to slow but lenient parsing
+        return pd.Series([dtp.parse(instant) for instant in instants])
+
+
 def clean_up_observer_series(
     pattern: str, series: Array
 ) -> Optional[pd.Series]:
@@ -135,14 +344,7 @@ def clean_up_observer_series(
                 and 'time data "b' not in str(err)
             ):
                 raise
-            warnings.warn(
-                "This result contains dates outside of Pandas's "
-                "supported Timestamp range, so the 'time' column of the "
-                "output of table() will contain strings rather than "
-                "Timestamps. Pass ignore_oob_time=True to the LHorizon "
-                "constructor to suppress this warning.",
-                OOBTimeWarning
-            )
+            warn_oob_time()
             return series
     if pattern == "delta":
         return pd.Series(
@@ -169,7 +371,9 @@ def clean_up_series(query_type: str, pattern: str, series: Array) -> pd.Series:
     dispatch function for Horizons column cleanup functions
     """
     if str(series.iloc[0]).strip() == 'n.a.':
-        if not all(series.astype(str).str.strip() == 'n.a.'):
+        # these columns repeat the same few strings, so check distinct
+        # values rather than stripping every value
+        if not all(str(value).strip() == 'n.a.' for value in series.unique()):
             raise ValueError(
                 "don't know how to convert this type of partial-NaN series"
             )
@@ -178,33 +382,124 @@ def clean_up_series(query_type: str, pattern: str, series: Array) -> pd.Series:
         return clean_up_observer_series(pattern, series)
     if query_type == "VECTORS":
         return clean_up_vectors_series(pattern, series)
+    if query_type == "ELEMENTS":
+        return clean_up_elements_series(pattern, series)
     raise ValueError(f"don't know how to handle query type {query_type}")
 
 
-def polish_lhorizon_dataframe(
-    horizon_frame: pd.DataFrame, query_type: str
-) -> pd.DataFrame:
+class CleanupStep(NamedTuple):
     """
-    make a nicely-formatted table from a dataframe generated by
-    make_lhorizon_dataframe. make tractable column names. also convert
-    distance units from AU or km to m and arcseconds to degrees.
+    how polish_lhorizon_dataframe() produces one column of a table: from
+    `column` of the DataFrame, matched by `pattern` in TABLE_PATTERNS, to
+    `name`. if `scale` is not None and the column is numeric, the result is
+    simply the column times `scale`; otherwise, it is cleaned up by
+    clean_up_series().
     """
-    horizon_columns = {}
+    column: str
+    pattern: str
+    name: str
+    scale: Optional[float]
+
+
+@functools.lru_cache(maxsize=256)
+def _make_cleanup_plan(
+    query_type: str,
+    patterns: tuple[tuple[str, str], ...],
+    columns: tuple[str, ...],
+) -> tuple[CleanupStep, ...]:
+    """cached implementation of make_cleanup_plan()"""
+    plan = []
     # we have to use regex here because sometimes Horizons adds extra
     # underscores for visual spacing, using what appears to be a pretty
     # complicated decision tree
-    for pattern, repl in TABLE_PATTERNS[query_type].items():
-        matches = [
-            col for col in horizon_frame.columns if re.match(pattern, col)
-        ]
+    for pattern, repl in patterns:
+        matches = [col for col in columns if re.match(pattern, col)]
         # did we not ask for this quantity? move on
         if len(matches) == 0:
             continue
         # multiple matches? better fix something
         assert len(matches) == 1
-        series = horizon_frame[matches[0]]
-        cleaned_result = clean_up_series(query_type, pattern, series)
+        scale = None
+        if pattern not in NONNUMERIC_PATTERNS:
+            scale = UNIT_SCALES[query_type].get(pattern, 1)
+        plan.append(CleanupStep(matches[0], pattern, repl, scale))
+    return tuple(plan)
+
+
+def make_cleanup_plan(
+    query_type: str, columns: Sequence[str], time_format: str = "calendar"
+) -> tuple[CleanupStep, ...]:
+    """
+    match the columns of a DataFrame generated by make_lhorizon_dataframe
+    to TABLE_PATTERNS (or, if time_format is "jd", JD_TABLE_PATTERNS),
+    producing a CleanupStep for each column that will appear in the table.
+    bulk queries produce many responses with identical columns, so plans
+    are cached; the cache is keyed on the patterns as well as the columns,
+    so it remains correct if TABLE_PATTERNS is modified.
+    """
+    patterns = TABLE_PATTERNS[query_type]
+    if time_format == "jd":
+        patterns = JD_TABLE_PATTERNS[query_type] | {
+            pattern: repl
+            for pattern, repl in patterns.items()
+            if repl not in ("time", "time_tdb")
+        }
+    elif time_format != "calendar":
+        raise ValueError("time_format must be 'calendar' or 'jd'")
+    return _make_cleanup_plan(
+        query_type, tuple(patterns.items()), tuple(columns)
+    )
+
+
+def polish_lhorizon_dataframe(
+    horizon_frame: pd.DataFrame, query_type: str, time_format="calendar"
+) -> pd.DataFrame:
+    """
+    make a nicely-formatted table from a dataframe generated by
+    make_lhorizon_dataframe. make tractable column names. also convert
+    distance units from AU or km to m and arcseconds to degrees. if
+    time_format is "jd", leave times as Julian dates rather than parsing
+    calendar dates.
+    """
+    horizon_columns = {}
+    for step in make_cleanup_plan(
+        query_type, horizon_frame.columns, time_format
+    ):
+        series = horizon_frame[step.column]
+        # pd.read_csv() has already parsed columns of plain numbers, so
+        # they need no checking for 'n.a.', stray spaces, etc.
+        if (step.scale is not None) and (series.dtype.kind in "fi"):
+            horizon_columns[step.name] = series.astype(np.float64)
+            if step.scale != 1:
+                horizon_columns[step.name] *= step.scale
+            continue
+        cleaned_result = clean_up_series(query_type, step.pattern, series)
         if cleaned_result is None:
             continue
-        horizon_columns[repl] = cleaned_result
+        horizon_columns[step.name] = cleaned_result
     return pd.DataFrame(horizon_columns)
+
+
+def make_lhorizon_table(
+    jpl_response: Union[str, bytes],
+    query_type: str,
+    topocentric_target: bool = False,
+    ignore_oob_time: bool = False,
+    response_format: str = "json",
+    time_format: str = "calendar",
+) -> pd.DataFrame:
+    """
+    make a nicely-formatted table directly from a Horizons API response:
+    the equivalent of LHorizon.table() for responses that are not attached
+    to a LHorizon (e.g. in a worker process).
+    """
+    action = "ignore" if ignore_oob_time is True else "default"
+    # noinspection PyTypeChecker
+    with warnings.catch_warnings(action=action, category=OOBTimeWarning):
+        return polish_lhorizon_dataframe(
+            make_lhorizon_dataframe(
+                jpl_response, topocentric_target, response_format
+            ),
+            query_type,
+            time_format,
+        )
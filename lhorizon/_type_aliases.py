@@ -6,5 +6,5 @@ import pandas as pd
 
 # type aliases
 Array = Union[pd.DataFrame, pd.Series, np.ndarray]
-Ephemeris = Union[pd.DataFrame, "LHorizon"]
+Ephemeris = Union[pd.DataFrame, "LHorizon", "HermiteEphemeris"]
 Timelike = Union[str, dt.datetime, float]
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+asynchronous query functions for `lhorizon`, built on `aiohttp`. these allow
+an event loop to keep many requests to JPL Horizons in flight at once,
+rather than sending them one at a time as `lhorizon.handlers.
+query_all_lhorizons()` does. `aiohttp` is an optional dependency of
+`lhorizon`; this module cannot be imported without it.
+"""
+import asyncio
+import logging
+from collections.abc import Sequence
+from typing import Optional
+
+import aiohttp
+import requests
+from yarl import URL
+
+import lhorizon.config as config
+from lhorizon import LHorizon
+from lhorizon.cache import ResponseCache
+from lhorizon.lhorizon_utils import construct_response
+from lhorizon.ratelimit import RateLimiter, check_retryable, retry_delay
+
+
+def default_async_session(limit: int = 8) -> aiohttp.ClientSession:
+    """
+    returns an aiohttp.ClientSession with default `lhorizon` options and a
+    connection pool of size `limit`. must be created inside a running event
+    loop.
+    """
+    return aiohttp.ClientSession(
+        headers=config.DEFAULT_HEADERS,
+        connector=aiohttp.TCPConnector(limit=limit),
+    )
+
+
+async def fetch_response(
+    request: requests.PreparedRequest,
+    session: Optional[aiohttp.ClientSession] = None,
+    timeout: Optional[float] = None,
+) -> requests.Response:
+    """
+    send a prepared request (generally the `request` attribute of a
+    `LHorizon`) using `session`, or a temporary session if `session` is not
+    passed. returns a requests.Response, so that the result can be used
+    interchangeably with responses from `LHorizon.query()`. `timeout` is in
+    seconds and defaults to `lhorizon.config.TIMEOUT`.
+    """
+    if session is None:
+        async with default_async_session() as session:
+            return await fetch_response(request, session, timeout)
+    if timeout is None:
+        timeout = config.TIMEOUT
+    async with session.request(
+        request.method,
+        # the url is already quoted; don't let aiohttp requote it
+        URL(request.url, encoded=True),
+        headers=dict(request.headers),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    ) as response:
+        content = await response.read()
+        return construct_response(
+            request.url, content, response.status, dict(response.headers)
+        )
+
+
+async def aquery_all_lhorizons(
+    lhorizons: Sequence[LHorizon],
+    max_concurrent: int = 8,
+    delay_retry: float = 8,
+    max_retries: int = 5,
+    cache: Optional[ResponseCache] = None,
+    parse: bool = False,
+    rate_limiter: Optional[RateLimiter] = None,
+    max_delay_retry: float = 300,
+):
+    """
+    asynchronous counterpart of `lhorizon.handlers.query_all_lhorizons()`.
+    queries a sequence of `LHorizon`s using a shared session, keeping at most
+    `max_concurrent` requests in flight at once. if `rate_limiter` is passed,
+    requests are also paced by it.
+
+    retries follow the same policy as `query_all_lhorizons()`: if _Horizons_
+    rejects a query for a transient reason, or it times out, pauses that
+    query for a jittered, exponentially-increasing delay starting at
+    `delay_retry` seconds before retrying it, and raises a TimeoutError after
+    `max_retries` retries. queries rejected because of problems with the
+    query itself raise a HorizonsReturnedError without being retried.
+    if `cache` is passed, it replaces each `LHorizon`'s response cache.
+
+    if `parse` is True, also parses each response (by calling `table()`) in
+    a worker thread as soon as it arrives, so that parsing overlaps with
+    waiting on other responses.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    async with default_async_session(max_concurrent) as session:
+        await asyncio.gather(
+            *(
+                _aquery_with_retries(
+                    lhorizon,
+                    session,
+                    semaphore,
+                    delay_retry,
+                    max_retries,
+                    cache,
+                    parse,
+                    rate_limiter,
+                    max_delay_retry,
+                )
+                for lhorizon in lhorizons
+            )
+        )
+
+
+async def _aquery_with_retries(
+    lhorizon: LHorizon,
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    delay_retry: float,
+    max_retries: int,
+    cache: Optional[ResponseCache],
+    parse: bool,
+    rate_limiter: Optional[RateLimiter],
+    max_delay_retry: float,
+):
+    """query a single LHorizon for aquery_all_lhorizons()"""
+    if cache is not None:
+        lhorizon.cache = cache
+    retries = 0
+    refetch = False
+    while True:
+        async with semaphore:
+            # this checks the response cache; on a hit, there's nothing to
+            # send, so don't wait on the rate limiter
+            if (rate_limiter is not None) and lhorizon._needs_fetch(refetch):
+                await rate_limiter.aacquire()
+                refetch = True
+            try:
+                await lhorizon.aquery(session, refetch=refetch)
+                response = lhorizon.response
+                status = response.status_code
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                response, status = None, repr(error)
+        if status == 200:
+            break
+        if response is not None:
+            check_retryable(response)
+        if retries > max_retries:
+            raise TimeoutError(
+                f"exceeded {max_retries}; retries aborting request."
+            )
+        delay = retry_delay(response, retries, delay_retry, max_delay_retry)
+        logging.info(
+            f"response {status}, pausing {round(delay, 1)} s before retrying "
+            f"request"
+        )
+        # the semaphore is released during the pause, so that other
+        # requests can proceed
+        if rate_limiter is not None:
+            rate_limiter.defer(delay)
+        await asyncio.sleep(delay)
+        refetch = True
+        retries += 1
+    logging.info(f"collected data for {lhorizon}")
+    if parse is True:
+        await asyncio.to_thread(lhorizon.table)
@@ -5,6 +5,7 @@ solar system ephemerides service.
 """
 
 from collections.abc import Mapping, MutableMapping, Sequence
+import datetime as dt
 from typing import Union, Optional, Sequence
 import requests
 import warnings
@@ -12,6 +13,7 @@ import warnings
 import pandas as pd
 
 import lhorizon.config as config
+from lhorizon.cache import ResponseCache
 from lhorizon._response_parsers import (
     make_lhorizon_dataframe,
     polish_lhorizon_dataframe, OOBTimeWarning,
@@ -20,11 +22,18 @@ from lhorizon._response_parsers import (
 from lhorizon._request_formatters import (
     make_commandline,
     assemble_request_params,
+    format_column_quantities,
     format_epoch_params,
     format_geodetic_origin,
 )
 
-from lhorizon.lhorizon_utils import utc_to_jd, default_lhorizon_session
+from lhorizon.lhorizon_utils import (
+    construct_response,
+    default_lhorizon_session,
+    listify,
+    parse_horizons_time,
+    utc_to_jd,
+)
 
 
 class LHorizon:
@@ -70,8 +79,8 @@ class LHorizon:
     Either a scalar in any astropy.time - parsable format,
     a list of epochs in jd, iso, or dt format, or a dict
     defining a range of times and dates. Timescale is UTC for OBSERVER
-    queries and TDB for VECTORS queries. If no epochs are provided,
-    the current time is used. Scalars or range dictionaries are
+    queries and TDB for VECTORS and ELEMENTS queries. If no epochs are
+    provided, the current time is used. Scalars or range dictionaries are
     preferred over lists, as they tend to be processed more easily by
     Horizons. The range dictionary format is:
     ```python
@@ -130,6 +139,44 @@ class LHorizon:
     in str rather than Timestamp. By default, this will raise a OOBTimeWarning.
     This is annoying if you expect to be dealing with times well in the past
     or future, so you can pass ignore_oob_time=True to suppress it.
+    #### cache: Optional[ResponseCache] = None
+    response cache (see `lhorizon.cache`). if this LHorizon has a cache,
+    query() looks for a response to its request there before sending the
+    request to JPL Horizons, and stores successful responses in it. if not
+    passed, `lhorizon.config.RESPONSE_CACHE` is used.
+    #### release_response: bool = False
+    if True, discard the body of the response once it has been parsed, to
+    free memory. the parsed DataFrames are kept. if the parsed DataFrames
+    are subsequently invalidated (e.g. by calling prepare_request()), the
+    next call to dataframe() or table() will fetch the response again.
+    #### response_format: str = "json"
+    format in which to request results from JPL Horizons. "json" (the
+    default) is the API's standard JSON envelope; "text" requests the
+    ephemeris as plain text (`format=text`), which can be parsed directly
+    from the response bytes, skipping the JSON decoding step. this is
+    noticeably faster and less memory-intensive for very large responses.
+    the parsed DataFrames are the same either way.
+    #### time_format: str = "calendar"
+    if "jd", table() represents times as Julian dates (float64) -- UT in
+    the 'jd' column of OBSERVER tables, TDB in the 'jd_tdb' column of
+    VECTORS and ELEMENTS tables -- rather than as parsed calendar dates,
+    and OBSERVER queries request only Julian dates from Horizons
+    (CAL_FORMAT=JD). this skips date parsing entirely, and supports times
+    outside the range of pandas Timestamps. see
+    `lhorizon.lhorizon_utils.jd_to_datetime64()`, `jd_utc_to_tdb()`, and
+    `jd_to_et()` for conversions.
+    #### columns: Optional[Sequence[str]] = None
+    if passed, table() includes only these columns (those that are present
+    in the response), and this LHorizon requests only the Horizons
+    quantities needed to produce them, overriding the `quantities` and
+    `vec_table` query options. it also omits the target body data section
+    from the response (OBJ_DATA=NO). column names are the names used in
+    the output of table(); see `lhorizon.constants.TABLE_COLUMN_QUANTITIES`.
+    #### backend = None
+    local source of tables, like `lhorizon.spk.SpiceBackend`: an object
+    whose `table(lhorizon)` method returns this LHorizon's table, or None
+    if it cannot. if this LHorizon has a backend, table() tries it before
+    querying JPL Horizons. dataframe() and query() always use JPL Horizons.
     #### **kwoptions
     Varkwarg alternative to passing `query_options` as a mapping. Varkwargs
     override keys in `query_options`.
@@ -150,6 +197,10 @@ class LHorizon:
     `lhorizon.response.content` is a DIY alternative to using the
     `lhorizon.table()` or `lhorizon.dataframe()` methods.
 
+    #### from_cache
+    True if `response` was retrieved from this LHorizon's response cache
+    rather than from JPL Horizons.
+
     ### methods
     """
 
@@ -163,6 +214,12 @@ class LHorizon:
         allow_long_queries: bool = False,
         query_options: Optional[Mapping] = None,
         ignore_oob_time: bool = False,
+        cache: Optional[ResponseCache] = None,
+        release_response: bool = False,
+        response_format: str = "json",
+        time_format: str = "calendar",
+        columns: Optional[Sequence[str]] = None,
+        backend=None,
         **kwoptions
     ):
         if isinstance(target, MutableMapping):
@@ -171,17 +228,34 @@ class LHorizon:
         if isinstance(origin, MutableMapping):
             origin = self._prep_geodetic_location(origin)
         self.location = origin
-        if query_type not in ("VECTORS", "OBSERVER"):
+        if query_type not in ("VECTORS", "OBSERVER", "ELEMENTS"):
             raise ValueError(
-                "only VECTORS and OBSERVER are supported as query types."
+                "only VECTORS, OBSERVER, and ELEMENTS are supported as query "
+                "types."
             )
         self.query_type = query_type
+        if response_format not in ("json", "text"):
+            raise ValueError("response_format must be 'json' or 'text'")
+        self.response_format = response_format
+        if time_format not in ("calendar", "jd"):
+            raise ValueError("time_format must be 'calendar' or 'jd'")
+        self.time_format = time_format
+        self.columns = None if columns is None else list(columns)
+        self.backend = backend
         self.ignore_oob_time = ignore_oob_time
         self.epochs = self._prep_epochs(epochs)
         if session is None:
             session = default_lhorizon_session()
         self.session = session
+        if cache is None:
+            cache = config.RESPONSE_CACHE
+        self.cache = cache
         self.response = None
+        self.from_cache = False
+        self.release_response = release_response
+        self._response_released = False
+        self._dataframe = None
+        self._table = None
         self.request = None
         self.allow_long_queries = allow_long_queries
         query_options = {} if query_options is None else query_options
@@ -195,18 +269,10 @@ class LHorizon:
         changes but whitespace stripping.
 
         this function triggers a query to JPL Horizons if a query has not yet
-        been sent. Otherwise, it uses the cached response.
+        been sent. Otherwise, it uses the cached response. the parsed
+        DataFrame is also cached; subsequent calls return copies of it.
         """
-        if self.response is None:
-            self.query()
-        if ("g:" in str(self.target)) or isinstance(self.target, Mapping):
-            get_target_location = True
-        else:
-            get_target_location = False
-        frame = make_lhorizon_dataframe(
-            self.response.text, topocentric_target=get_target_location
-        )
-        return frame
+        return self._parsed_dataframe().copy()
 
     def table(self) -> pd.DataFrame:
         """
@@ -218,12 +284,96 @@ class LHorizon:
         back to LHorizon.dataframe().
 
         this function triggers a query to JPL Horizons if a query has not yet
-        been sent. Otherwise, it uses the cached response.
+        been sent. Otherwise, it uses the cached response. the formatted
+        DataFrame is also cached; subsequent calls return copies of it. if
+        this LHorizon has a backend that can produce the table, it does so
+        instead.
         """
+        if self._table is None:
+            if self.backend is not None:
+                self._table = self.backend.table(self)
+            if self._table is None:
+                self._table = self._polished_dataframe()
+            if self.columns is not None:
+                self._table = self._table[
+                    [c for c in self.columns if c in self._table.columns]
+                ]
+        return self._table.copy()
+
+    def _polished_dataframe(self) -> pd.DataFrame:
+        """make a table from the parsed DataFrame"""
         action = "ignore" if self.ignore_oob_time is True else "default"
         # noinspection PyTypeChecker
         with warnings.catch_warnings(action=action, category=OOBTimeWarning):
-            return polish_lhorizon_dataframe(self.dataframe(), self.query_type)
+            return polish_lhorizon_dataframe(
+                self._parsed_dataframe(), self.query_type, self.time_format
+            )
+
+    def _parsed_dataframe(self) -> pd.DataFrame:
+        """
+        return (without copying) the cached DataFrame parsed from the
+        response, querying and parsing if necessary.
+        """
+        if self._dataframe is not None:
+            return self._dataframe
+        if (self.response is None) or self._response_released:
+            self.query(refetch=self._response_released)
+        self._dataframe = make_lhorizon_dataframe(
+            self._response_body(),
+            topocentric_target=self._has_topocentric_target(),
+            response_format=self.response_format,
+        )
+        if self.release_response is True:
+            self._release_response()
+        return self._dataframe
+
+    def _response_body(self) -> Union[str, bytes]:
+        """
+        body of the response in the form make_lhorizon_dataframe() wants it:
+        text responses are passed undecoded
+        """
+        if self.response_format == "text":
+            return self.response.content
+        return self.response.text
+
+    def _has_topocentric_target(self) -> bool:
+        """is this LHorizon's target a topocentric location?"""
+        return ("g:" in str(self.target)) or isinstance(self.target, Mapping)
+
+    def _release_response(self):
+        """
+        replace self.response with a body-less copy. should generally only be
+        called by _parsed_dataframe()
+        """
+        self.response = construct_response(
+            self.response.url, b"", self.response.status_code
+        )
+        self._response_released = True
+
+    def _clear_parsed(self):
+        """
+        invalidate cached DataFrames. called whenever the response or request
+        changes.
+        """
+        self._dataframe = None
+        self._table = None
+
+    def stitch(self, pieces: Sequence["LHorizon"]):
+        """
+        replace this LHorizon's parsed DataFrames with the concatenated
+        DataFrames of `pieces`: LHorizons that together cover its epochs, in
+        order. the bulk query functions in `lhorizon.handlers` use this to
+        reassemble queries whose responses were truncated by JPL Horizons.
+        like any other parsed DataFrames, the stitched DataFrames are
+        discarded if this LHorizon is queried again or its request is
+        prepared again.
+        """
+        self._dataframe = pd.concat(
+            [piece.dataframe() for piece in pieces], ignore_index=True
+        )
+        self._table = pd.concat(
+            [piece.table() for piece in pieces], ignore_index=True
+        )
 
     def check_queried(self) -> bool:
         """
@@ -246,18 +396,109 @@ class LHorizon:
         send this LHorizon's currently-formatted request to JPL HORIZONS and
         update this LHorizon's response attribute. if we have already fetched
         with identical parameters, don't fetch again unless explicitly told to.
+        if this LHorizon has a response cache, look for the response there
+        first; refetch=True skips this lookup, but still updates the cache.
+        """
+        if self._needs_fetch(refetch):
+            self._set_fetched_response(
+                self.session.send(self.request, timeout=config.TIMEOUT)
+            )
+
+    async def aquery(self, session=None, refetch: bool = False) -> None:
+        """
+        asynchronous version of query(). sends this LHorizon's request using
+        an `aiohttp.ClientSession` rather than this LHorizon's
+        `requests.Session`. if `session` is not passed, creates a temporary
+        one. requires `aiohttp`; see `lhorizon.aio` for details and for bulk
+        asynchronous queries.
         """
-        if refetch or not self.check_queried():
-            self.response = self.session.send(
-                self.request, timeout=config.TIMEOUT
+        from lhorizon.aio import fetch_response
+
+        if self._needs_fetch(refetch):
+            self._set_fetched_response(
+                await fetch_response(self.request, session)
             )
 
+    def _needs_fetch(self, refetch: bool) -> bool:
+        """
+        shared preamble of query() and aquery(). determine whether the request
+        must actually be sent, invalidating cached DataFrames and checking the
+        response cache if the response will change.
+        """
+        if not (refetch or not self.check_queried()):
+            return False
+        self._clear_parsed()
+        self._response_released = False
+        if (refetch is False) and self._fetch_from_cache():
+            return False
+        return True
+
+    def _set_fetched_response(self, response: requests.Response):
+        """store a response received from JPL Horizons"""
+        self.response = response
+        self.from_cache = False
+        self._store_in_cache()
+
+    def _fetch_from_cache(self) -> bool:
+        """
+        set self.response from this LHorizon's response cache, if possible.
+        return True on a cache hit and False otherwise.
+        """
+        if self.cache is None:
+            return False
+        content = self.cache.get(self.request.url)
+        if content is None:
+            return False
+        self.response = construct_response(self.request.url, content)
+        self.from_cache = True
+        return True
+
+    def _store_in_cache(self):
+        """
+        store a successful response in this LHorizon's response cache.
+        responses without a complete ephemeris -- error messages, refusals,
+        truncated tables -- may be transient, so they are cached only
+        briefly.
+        """
+        if (self.cache is None) or (self.response.status_code != 200):
+            return
+        content = self.response.content
+        if (b"$$SOE" in content) and (b"$$EOE" in content):
+            ttl = self._cache_ttl()
+        else:
+            ttl = config.CACHE_RECENT_TTL
+        self.cache.put(self.request.url, content, ttl=ttl)
+
+    def _cache_ttl(self) -> Optional[float]:
+        """
+        lifetime for a cached response to this LHorizon's request: short if
+        the request includes recent or future times (ephemerides for these
+        times may be revised), otherwise indefinite.
+        """
+        try:
+            if isinstance(self.epochs, Mapping):
+                latest = utc_to_jd(
+                    parse_horizons_time(self.epochs["stop"]).replace(
+                        tzinfo=None
+                    )
+                )
+            else:
+                latest = max(map(float, listify(self.epochs)))
+        except (TypeError, ValueError, OverflowError):
+            return config.CACHE_RECENT_TTL
+        now = utc_to_jd(dt.datetime.now(dt.UTC).replace(tzinfo=None))
+        if latest > now - config.CACHE_RECENT_DAYS:
+            return config.CACHE_RECENT_TTL
+        return None
+
     def prepare_request(self):
         """
         Prepare request using active session and parameters. this is called
         automatically by LHorizon.__init__(), but can also be called after
-        query parameters or request have been manually altered.
+        query parameters or request have been manually altered. invalidates
+        any cached DataFrames.
         """
+        self._clear_parsed()
         self._prepare(**self.query_options)
 
     def _prepare(
@@ -288,8 +529,18 @@ class LHorizon:
         command = make_commandline(
             self.target, closest_apparition, no_fragments
         )
+        if self.columns is not None:
+            if self.query_type == "OBSERVER":
+                quantities = format_column_quantities(
+                    self.query_type, self.columns
+                )
+            elif self.query_type == "VECTORS":
+                vec_table = format_column_quantities(
+                    self.query_type, self.columns
+                )
         if quantities is None:
-            quantities = getattr(config, self.query_type + "_QUANTITIES")
+            # ELEMENTS tables have no optional quantities
+            quantities = getattr(config, self.query_type + "_QUANTITIES", "")
         elif isinstance(quantities, (list, tuple)):
             quantities = ",".join(map(str, quantities))
         elif isinstance(quantities, int):
@@ -326,6 +577,13 @@ class LHorizon:
             params["SKIP_DAYLT"] = "NO"
         if rise_transit_set:
             params['R_T_S_ONLY'] = "YES"
+        if self.time_format == "jd":
+            params["CAL_FORMAT"] = "JD"
+        if self.columns is not None:
+            params["OBJ_DATA"] = "NO"
+        # the API returns JSON if format is not specified
+        if self.response_format == "text":
+            params["format"] = "text"
         # build, prep, and store request
         request = requests.Request(
             "GET", config.HORIZONS_SERVER, params=params
@@ -354,7 +612,8 @@ class LHorizon:
                     "likely to be truncated serverside and produce unexpected "
                     "results. If you queried a list of epochs, consider "
                     "querying a range; also consider using one of the helper "
-                    "functions for bulk queries in lhorizon.handlers. If "
+                    "functions for bulk queries in lhorizon.handlers (for "
+                    "long lists of epochs, construct_tlist_lhorizons()). If "
                     "you're absolutely sure you want to send this query, "
                     "initialize this LHorizons object again with "
                     "allow_long_queries=True."
@@ -367,8 +626,6 @@ class LHorizon:
         by __init__
         """
         if epochs is None:
-            import datetime as dt
-
             return utc_to_jd(dt.datetime.now(dt.UTC).replace(tzinfo=None))
         if isinstance(epochs, (int, float)):  # Horizons will assume JD, great
             return epochs
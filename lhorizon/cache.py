@@ -0,0 +1,214 @@
+"""
+persistent caches for responses from JPL Horizons. `LHorizon` objects
+consult a cache (if they have one) before sending a request and store
+successful responses in it afterward, so identical queries made by other
+`LHorizon`s -- including ones in other processes, or in yesterday's job --
+do not go over the network again.
+
+any object that implements the `get()` / `put()` interface of
+`ResponseCache` can be used; `DiskResponseCache` is the standard
+implementation.
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import hashlib
+from pathlib import Path
+import sqlite3
+import time
+from typing import Iterator, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from lhorizon.lhorizon_utils import write_atomically
+
+
+def normalize_url(url: str) -> str:
+    """
+    produce a canonical form of a request URL: lowercase scheme and host,
+    query parameters sorted and consistently quoted. URLs that differ only
+    in parameter order or quoting style normalize to the same string.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, "")
+    )
+
+
+def cache_key(url: str) -> str:
+    """content address (sha256 hex digest) of a normalized request URL"""
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    abstract base class for `lhorizon` response caches. subclasses must
+    implement `get()` and `put()`, and should increment `hits` and `misses`
+    in `get()`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        return the cached body of the response to `url`, or None if there is
+        no unexpired cached response to `url`.
+        """
+
+    @abstractmethod
+    def put(self, url: str, content: bytes, ttl: Optional[float] = None):
+        """
+        cache `content` as the body of the response to `url`. if `ttl` is
+        not None, the entry expires after `ttl` seconds.
+        """
+
+    def stats(self) -> dict:
+        """hit / miss counts for this cache object"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class DiskResponseCache(ResponseCache):
+    """
+    content-addressed on-disk response cache. response bodies are stored as
+    individual files named by `cache_key()`; an SQLite index in the same
+    directory records their sizes, expiration times, and last access times.
+    the cache is bounded in total size by evicting least-recently-used
+    entries. it is safe to share a cache directory between processes.
+
+    ### parameters
+    #### directory: Union[str, Path]
+    root directory of the cache. created if it does not exist.
+    #### max_size: Optional[int] = 2 ** 30
+    maximum total size of cached response bodies in bytes. None means
+    unbounded.
+    #### default_ttl: Optional[float] = None
+    lifetime in seconds of entries for which `put()` is not passed an
+    explicit ttl. None means they never expire.
+
+    hit / miss counters are per-object, not shared between processes.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_size: Optional[int] = 2 ** 30,
+        default_ttl: Optional[float] = None,
+    ):
+        super().__init__()
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.sqlite3"
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, size INTEGER, "
+                "accessed REAL, expires REAL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # connections are cheap, and opening one per operation keeps this
+        # object safe to pass to forked / spawned worker processes
+        connection = sqlite3.connect(
+            self.index_path, timeout=60, isolation_level=None
+        )
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def _object_path(self, key: str) -> Path:
+        return self.directory / "objects" / key[:2] / key
+
+    def get(self, url: str) -> Optional[bytes]:
+        key = cache_key(url)
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT expires FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] is not None and row[0] < now:
+                self._remove(connection, [key])
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                content = self._object_path(key).read_bytes()
+            except FileNotFoundError:
+                # evicted by another process between lookup and read
+                self._remove(connection, [key])
+                self.misses += 1
+                return None
+            connection.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+            )
+        self.hits += 1
+        return content
+
+    def put(self, url: str, content: bytes, ttl: Optional[float] = None):
+        key = cache_key(url)
+        if ttl is None:
+            ttl = self.default_ttl
+        now = time.time()
+        expires = None if ttl is None else now + ttl
+        path = self._object_path(key)
+        path.parent.mkdir(exist_ok=True)
+        write_atomically(path, content)
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, len(content), now, expires),
+            )
+            self._evict(connection, now)
+            connection.execute("COMMIT")
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        """drop expired entries, then LRU entries until under max_size"""
+        expired = connection.execute(
+            "SELECT key FROM entries WHERE expires < ?", (now,)
+        ).fetchall()
+        self._remove(connection, [row[0] for row in expired])
+        if self.max_size is None:
+            return
+        total = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        if total <= self.max_size:
+            return
+        evicted = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            evicted.append(key)
+            total -= size
+        self._remove(connection, evicted)
+
+    def _remove(self, connection: sqlite3.Connection, keys: list[str]):
+        for key in keys:
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._object_path(key).unlink(missing_ok=True)
+
+    def clear(self):
+        """remove all entries from the cache"""
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            keys = connection.execute("SELECT key FROM entries").fetchall()
+            self._remove(connection, [row[0] for row in keys])
+            connection.execute("COMMIT")
+
+    def stats(self) -> dict:
+        """hit / miss counts, plus current entry count and size in bytes"""
+        with self._connect() as connection:
+            entries, size = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return super().stats() | {"entries": entries, "size": size}
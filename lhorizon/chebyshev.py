@@ -0,0 +1,247 @@
+"""
+compact storage of VECTORS ephemerides as piecewise Chebyshev polynomials,
+in the manner of SPK types 2 and 3. `ChebyshevEphemeris.fit()` fits
+polynomials of a fixed degree to segments of a VECTORS table, splitting
+segments until each fits the sampled positions within a tolerance;
+`save()` writes them to a file that `ChebyshevEphemeris.open()`
+memory-maps, so that evaluating a few epochs of a long ephemeris reads
+only the segments that contain them.
+
+file layout (all numbers little-endian):
+- 8 bytes: the magic string b"LHCHEB01"
+- 8 bytes: length of the header, an unsigned integer
+- header: JSON with "degree", "segments", and "metadata" keys, padded with
+  spaces so that the arrays that follow start at a multiple of 64 bytes
+- segment boundaries: float64[segments + 1], ET (seconds since J2000 TDB)
+- residuals: float64[segments], the largest position error of each
+  segment's fit at the samples it was fit to (m)
+- coefficients: float64[segments, 3, degree + 1], Chebyshev coefficients
+  of x, y, and z in each segment (m)
+"""
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from lhorizon._type_aliases import Array
+from lhorizon.interpolation import (
+    POSITION_COLUMNS,
+    VELOCITY_COLUMNS,
+    tdb_jd,
+    vectors_arrays,
+)
+from lhorizon.lhorizon_utils import jd_to_et
+
+CHEBYSHEV_MAGIC = b"LHCHEB01"
+# fits start from pieces of at most this many samples, bounding the size of
+# the least-squares problems fit() solves
+MAX_FIT_SAMPLES = 8192
+
+
+def chebyshev_basis(
+    s: np.ndarray, degree: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    values and derivatives of Chebyshev polynomials 0 through `degree` at
+    points `s` in [-1, 1], as arrays with one row per point
+    """
+    basis = np.empty((len(s), degree + 1))
+    derivative = np.empty((len(s), degree + 1))
+    basis[:, 0], derivative[:, 0] = 1, 0
+    if degree > 0:
+        basis[:, 1], derivative[:, 1] = s, 1
+    for k in range(1, degree):
+        basis[:, k + 1] = 2 * s * basis[:, k] - basis[:, k - 1]
+        derivative[:, k + 1] = (
+            2 * basis[:, k] + 2 * s * derivative[:, k] - derivative[:, k - 1]
+        )
+    return basis, derivative
+
+
+def fit_segment(
+    et: np.ndarray, position: np.ndarray, velocity: np.ndarray, degree: int
+) -> tuple[np.ndarray, float]:
+    """
+    least-squares fit of Chebyshev polynomials to the positions and
+    velocities of one segment of samples. velocities are weighted by the
+    segment's half-length, so that they count in units of position.
+    returns coefficients (one row per coordinate) and the largest position
+    error at the samples.
+    """
+    half = (et[-1] - et[0]) / 2
+    basis, derivative = chebyshev_basis((et - et[0]) / half - 1, degree)
+    coefficients = np.linalg.lstsq(
+        np.vstack([basis, derivative]),
+        np.vstack([position, velocity * half]),
+        rcond=None,
+    )[0]
+    residual = np.linalg.norm(basis @ coefficients - position, axis=1).max()
+    return coefficients.T, float(residual)
+
+
+class ChebyshevEphemeris:
+    """
+    piecewise Chebyshev representation of a VECTORS ephemeris. make one
+    from a VECTORS table with `fit()` or from a file written by `save()`
+    with `open()`.
+
+    ### parameters
+    #### boundaries: np.ndarray
+    start and stop times of the segments, ET (seconds since J2000 TDB)
+    #### coefficients: np.ndarray
+    Chebyshev coefficients of x, y, and z in each segment (m), with shape
+    (segments, 3, degree + 1)
+    #### residuals: np.ndarray
+    largest position error of each segment's fit at its samples (m)
+    #### metadata: Optional[dict] = None
+    JSON-serializable description of the ephemeris (target, origin, etc.)
+    """
+
+    def __init__(
+        self,
+        boundaries: np.ndarray,
+        coefficients: np.ndarray,
+        residuals: np.ndarray,
+        metadata: Optional[dict] = None,
+    ):
+        self.boundaries = boundaries
+        self.coefficients = coefficients
+        self.residuals = residuals
+        self.metadata = {} if metadata is None else metadata
+        self.degree = coefficients.shape[2] - 1
+
+    @classmethod
+    def fit(
+        cls,
+        table: pd.DataFrame,
+        tolerance: float = 1,
+        degree: int = 12,
+        metadata: Optional[dict] = None,
+    ) -> "ChebyshevEphemeris":
+        """
+        fit a VECTORS table (as produced by `LHorizon.table()`, with x, y,
+        z, vx, vy, vz in m and m/s and jd_tdb or time_tdb). segments are
+        halved until the fit of each is within `tolerance` (m) of every
+        sampled position, which means the samples must be dense enough to
+        show every feature of the orbit that matters at that tolerance.
+        raises a ValueError if a segment that misses cannot be halved
+        without leaving fewer than `degree` + 1 samples in a half.
+        """
+        et, position, velocity = vectors_arrays(table)
+        # pending segments as inclusive ranges of sample indices; adjacent
+        # segments share a boundary sample
+        pieces = int(np.ceil((len(et) - 1) / (MAX_FIT_SAMPLES - 1)))
+        edges = np.linspace(0, len(et) - 1, pieces + 1).round().astype(int)
+        pending = list(zip(edges[:-1], edges[1:]))[::-1]
+        boundaries, coefficients, residuals = [et[0]], [], []
+        while pending:
+            first, last = pending.pop()
+            fitted, residual = fit_segment(
+                et[first:last + 1],
+                position[first:last + 1],
+                velocity[first:last + 1],
+                degree,
+            )
+            if residual > tolerance:
+                middle = (first + last) // 2
+                if min(middle - first, last - middle) < degree:
+                    raise ValueError(
+                        f"samples are too sparse to fit within {tolerance} "
+                        f"m at degree {degree} near ET {et[first]}"
+                    )
+                pending += [(middle, last), (first, middle)]
+                continue
+            boundaries.append(et[last])
+            coefficients.append(fitted)
+            residuals.append(residual)
+        return cls(
+            np.array(boundaries),
+            np.array(coefficients),
+            np.array(residuals),
+            metadata,
+        )
+
+    def save(self, path: Union[str, Path]):
+        """write this ephemeris to a file that open() can memory-map"""
+        header = json.dumps(
+            {
+                "degree": self.degree,
+                "segments": len(self.residuals),
+                "metadata": self.metadata,
+            }
+        ).encode("utf-8")
+        header += b" " * (-(len(header) + 16) % 64)
+        with open(path, "wb") as stream:
+            stream.write(CHEBYSHEV_MAGIC)
+            stream.write(np.uint64(len(header)).astype("<u8").tobytes())
+            stream.write(header)
+            for array in (self.boundaries, self.residuals, self.coefficients):
+                stream.write(np.ascontiguousarray(array, dtype="<f8").data)
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "ChebyshevEphemeris":
+        """memory-map an ephemeris written by save()"""
+        with open(path, "rb") as stream:
+            if stream.read(8) != CHEBYSHEV_MAGIC:
+                raise ValueError(f"{path} is not a Chebyshev ephemeris file")
+            length = int(np.frombuffer(stream.read(8), dtype="<u8")[0])
+            header = json.loads(stream.read(length))
+        segments, degree = header["segments"], header["degree"]
+        data = np.memmap(
+            path,
+            dtype="<f8",
+            mode="r",
+            offset=16 + length,
+            shape=(2 * segments + 1 + segments * 3 * (degree + 1),),
+        )
+        return cls(
+            data[:segments + 1],
+            data[2 * segments + 1:].reshape(segments, 3, degree + 1),
+            data[segments + 1:2 * segments + 1],
+            header["metadata"],
+        )
+
+    def evaluate(
+        self, epochs: Union[float, Array]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        evaluate at `epochs`, Julian dates or datetimes in TDB, which must
+        lie within the span of the ephemeris. returns arrays of positions
+        (m) and velocities (m/s), one row per epoch, and the fit residuals
+        (m) of the segments that contain them.
+        """
+        et = jd_to_et(tdb_jd(epochs))
+        if (et.min() < self.boundaries[0]) or (
+            et.max() > self.boundaries[-1]
+        ):
+            raise ValueError("epochs lie outside the span of the ephemeris")
+        ix = np.clip(
+            np.searchsorted(self.boundaries, et, "right") - 1,
+            0,
+            len(self.residuals) - 1,
+        )
+        half = (self.boundaries[ix + 1] - self.boundaries[ix]) / 2
+        basis, derivative = chebyshev_basis(
+            (et - self.boundaries[ix]) / half - 1, self.degree
+        )
+        coefficients = self.coefficients[ix]
+        position = np.einsum("ijk,ik->ij", coefficients, basis)
+        velocity = np.einsum("ijk,ik->ij", coefficients, derivative)
+        return position, velocity / half[:, None], self.residuals[ix]
+
+    def table(self, epochs: Union[float, Array]) -> pd.DataFrame:
+        """
+        evaluate at `epochs` (see `evaluate()`), returning a table in the
+        style of a VECTORS table, with an additional 'error' column of fit
+        residuals (m)
+        """
+        position, velocity, error = self.evaluate(epochs)
+        table = pd.DataFrame(
+            np.hstack([position, velocity]),
+            columns=list(POSITION_COLUMNS + VELOCITY_COLUMNS),
+        )
+        table.insert(0, "jd_tdb", tdb_jd(epochs))
+        table["error"] = error
+        return table
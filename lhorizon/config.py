@@ -11,11 +11,23 @@ change the default behavior of `LHorizon` objects.
 * DEFAULT_HEADERS: default headers for Horizons requests
 * TABLE_PATTERNS: tables of regexes used to match Horizons fields and the
     arguably more-readable column names we assign them to
+* JD_TABLE_PATTERNS: patterns for Julian date columns, used in place of
+    the calendar time patterns in TABLE_PATTERNS by `LHorizon`s initialized
+    with time_format="jd"
+* RESPONSE_CACHE: default response cache (see `lhorizon.cache`) for
+    `LHorizon` objects; None means no caching
+* CACHE_RECENT_DAYS: cached responses to queries that include times later
+    than this many days before the present are considered 'recent'
+* CACHE_RECENT_TTL: lifetime in seconds of cached responses to 'recent'
+    queries. responses to other queries are cached indefinitely.
 """
 
 OBSERVER_QUANTITIES = "1,2,4,10,13,14,15,17,20,45"
 VECTORS_QUANTITIES = "3"
 TIMEOUT = 30
+RESPONSE_CACHE = None
+CACHE_RECENT_DAYS = 30
+CACHE_RECENT_TTL = 60 * 60
 
 HORIZONS_SERVER = "https://ssd.jpl.nasa.gov/api/horizons.api"
 DEFAULT_HEADERS = {
@@ -77,5 +89,27 @@ TABLE_PATTERNS = {
         "geo_lon": "geo_lon",
         "geo_el": "geo_el",
     } | {f: f for f in VISIBILITY_FLAG_NAMES},
+    "ELEMENTS": {
+        r"Calendar": "time_tdb",
+        r"EC": "ecc",
+        r"QR": "periapsis_dist",
+        r"IN": "inc",
+        r"OM": "node",
+        r"W": "arg_periapsis",
+        r"Tp": "tp",
+        r"N": "mean_motion",
+        r"MA": "mean_anomaly",
+        r"TA": "true_anomaly",
+        # (not AD)
+        r"A$": "a",
+        r"AD": "apoapsis_dist",
+        r"PR": "period",
+    },
 }
 
+JD_TABLE_PATTERNS = {
+    "VECTORS": {r"JDTDB": "jd_tdb"},
+    # TABLE_PATTERNS["OBSERVER"] already includes the JD column
+    "OBSERVER": {},
+    "ELEMENTS": {r"JDTDB": "jd_tdb"},
+}
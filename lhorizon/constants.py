@@ -17,6 +17,10 @@ HORIZON_TIME_ABBREVIATIONS = MPt(
 )
 J2000_UTC = pd.Timestamp("2000-01-01 11:58:55.816073")
 J2000_TDB = pd.Timestamp("2000-01-01 12:00:00")
+J2000_JD = 2451545.0
+# erfa's conventional first part of a two-part Julian date (the MJD zero point)
+MJD_ZERO_JD = 2400000.5
+UNIX_EPOCH_JD = 2440587.5
 HORIZONS_QUANTITY_NAMES = MPt(
     {
         "OBSERVER": {
@@ -80,3 +84,87 @@ HORIZONS_QUANTITY_NAMES = MPt(
         },
     }
 )
+# which Horizons quantity code produces each column of LHorizon.table():
+# QUANTITIES codes for OBSERVER queries, and (P)osition, (V)elocity, or
+# (L)ight-time / range / range-rate groups of VEC_TABLE for VECTORS queries.
+# None means that the column does not depend on the requested quantities;
+# ELEMENTS tables always have all their columns.
+TABLE_COLUMN_QUANTITIES = MPt(
+    {
+        "OBSERVER": {
+            "time": None,
+            "jd": None,
+            "geo_lat": None,
+            "geo_lon": None,
+            "geo_el": None,
+            "solar_presence": None,
+            "interference_flag": None,
+            "nearside_flag": None,
+            "illumination_flag": None,
+            "ra_ast": 1,
+            "dec_ast": 1,
+            "ra_app": 2,
+            "dec_app": 2,
+            "ra_app_r": 2,
+            "dec_app_r": 2,
+            "az": 4,
+            "alt": 4,
+            "az_r": 4,
+            "alt_r": 4,
+            "ill": 10,
+            "ang_diam": 13,
+            "sub_lon": 14,
+            "sub_lat": 14,
+            "sun_sub_lon": 15,
+            "sun_sub_lat": 15,
+            "npa": 17,
+            "dist": 20,
+            "t_o_m": 25,
+            "ra_app_icrf": 45,
+            "dec_app_icrf": 45,
+            "ra_app_icrf_r": 45,
+            "dec_app_icrf_r": 45,
+        },
+        "VECTORS": {
+            "time_tdb": None,
+            "jd_tdb": None,
+            "x": "P",
+            "y": "P",
+            "z": "P",
+            "vx": "V",
+            "vy": "V",
+            "vz": "V",
+            "light_time": "L",
+            "dist": "L",
+            "velocity": "L",
+        },
+        "ELEMENTS": {
+            "time_tdb": None,
+            "jd_tdb": None,
+            "ecc": None,
+            "periapsis_dist": None,
+            "inc": None,
+            "node": None,
+            "arg_periapsis": None,
+            "tp": None,
+            "mean_motion": None,
+            "mean_anomaly": None,
+            "true_anomaly": None,
+            "a": None,
+            "apoapsis_dist": None,
+            "period": None,
+        },
+    }
+)
+# smallest VEC_TABLE code that includes each combination of groups
+VEC_TABLE_CODES = MPt(
+    {
+        frozenset("P"): 1,
+        frozenset("PV"): 2,
+        frozenset("PVL"): 3,
+        frozenset("VL"): 3,
+        frozenset("PL"): 4,
+        frozenset("V"): 5,
+        frozenset("L"): 6,
+    }
+)
@@ -4,26 +4,53 @@ helper functions for lhorizon.
 """
 import json
 import logging
-from collections.abc import Mapping, MutableMapping, Sequence
+from collections.abc import (
+    Callable, Iterable, Iterator, Mapping, MutableMapping, Sequence, Sized
+)
+from concurrent.futures import (
+    Future, ProcessPoolExecutor, ThreadPoolExecutor
+)
 import datetime as dt
 import math
+import multiprocessing
+from pathlib import Path
+import queue
 import re
-import time
-from typing import Union, Optional
+import threading
+from typing import NamedTuple, Optional, Union
+from urllib.parse import quote_plus
 
-import dateutil.parser as dtp
 import numpy as np
 import pandas as pd
 import requests
 from more_itertools import chunked
 
 from lhorizon import LHorizon
+from lhorizon._response_parsers import (
+    HorizonsReturnedError,
+    horizons_response_truncated,
+    make_lhorizon_table,
+)
+from lhorizon.cache import ResponseCache
 from lhorizon.config import HORIZONS_SERVER
 from lhorizon.constants import HORIZON_TIME_ABBREVIATIONS
 from lhorizon.lhorizon_utils import (
     default_lhorizon_session,
     have_telnet_conversation,
+    listify,
+    key_times,
+    naive_utc,
     open_noninteractive_jpl_telnet_connection,
+    parse_horizons_time,
+    parse_step,
+    step_grid,
+    time_key,
+)
+from lhorizon.ratelimit import (
+    RateLimiter,
+    check_retryable,
+    make_rate_limiter,
+    retry_delay,
 )
 
 
@@ -42,15 +69,14 @@ def estimate_line_count(
     )
 
 
-def chunk_time(epochs: MutableMapping, chunksize: int) -> list[dict]:
+def _step_seconds_and_lines(horizons_dt: MutableMapping) -> tuple[float, int]:
     """
-    chunk time into a series of intervals that will return at most `chunksize`
-    lines from _Horizons_.
+    length of each step, in seconds, and number of steps in a time range
+    (as returned by datetime_from_horizon_epochs())
     """
-    horizons_dt = datetime_from_horizon_epochs(**epochs)
     # interpret stepsize-with-units as time and use it to calculate number of
     # lines in requested interval
-    if horizons_dt["step"][-1].isalpha():
+    if str(horizons_dt["step"])[-1].isalpha():
         seconds_per_step = HORIZON_TIME_ABBREVIATIONS[
             horizons_dt["step"][-1]
         ] * int(horizons_dt["step"][:-1])
@@ -58,14 +84,25 @@ def chunk_time(epochs: MutableMapping, chunksize: int) -> list[dict]:
     # interpret stepsize-without-units as number of lines in requested
     # interval and use it to calculate stepsize in time
     else:
-        lines = horizons_dt["step"]
+        lines = int(horizons_dt["step"])
         seconds_per_step = (
             horizons_dt["stop"] - horizons_dt["start"]
         ).total_seconds() / lines
+    return seconds_per_step, lines
+
+
+def chunk_time(epochs: MutableMapping, chunksize: int) -> list[dict]:
+    """
+    chunk time into a series of intervals that will return at most `chunksize`
+    lines from _Horizons_. this is approximate; the bulk query constructors
+    use `plan_chunks()`, which is exact.
+    """
+    horizons_dt = datetime_from_horizon_epochs(**epochs)
+    seconds_per_step, lines = _step_seconds_and_lines(horizons_dt)
     # chunk interval into as many sub-intervals as necessary
     chunks = tuple(chunked(range(lines), chunksize))
     # divide unitless steps by number of chunks
-    if not horizons_dt["step"][-1].isalpha():
+    if not str(horizons_dt["step"])[-1].isalpha():
         horizons_dt["step"] = math.ceil(int(horizons_dt["step"]) / len(chunks))
     times = []
     # set specific time bounds of queries and return them
@@ -86,9 +123,112 @@ def chunk_time(epochs: MutableMapping, chunksize: int) -> list[dict]:
     return times
 
 
+def bisect_epochs(
+    epochs: Union[Mapping, Sequence[float]]
+) -> tuple[Union[dict, list], Union[dict, list]]:
+    """
+    split epochs -- a range, or a list of Julian dates -- into two halves
+    that together cover the same times, without overlapping. ranges are
+    split on a step boundary (see `plan_chunks()`). used to split queries
+    whose responses _Horizons_ truncated.
+    """
+    if not isinstance(epochs, Mapping):
+        epochs = listify(epochs)
+        if len(epochs) < 2:
+            raise ValueError("a single epoch cannot be split")
+        return epochs[:len(epochs) // 2], epochs[len(epochs) // 2:]
+    halves = plan_chunks(epochs, chunksize=math.inf, n_chunks=2)
+    if len(halves) < 2:
+        raise ValueError(f"the time range {epochs} is too short to split")
+    return halves[0], halves[1]
+
+
+def split_lhorizon(lhorizon: LHorizon) -> list[LHorizon]:
+    """
+    make two new, unqueried `LHorizon`s with the same parameters as
+    `lhorizon` that together cover its epochs (see `bisect_epochs()`).
+    """
+    return [
+        LHorizon(
+            lhorizon.target,
+            lhorizon.location,
+            epochs=half,
+            session=lhorizon.session,
+            query_type=lhorizon.query_type,
+            allow_long_queries=lhorizon.allow_long_queries,
+            query_options=lhorizon.query_options,
+            ignore_oob_time=lhorizon.ignore_oob_time,
+            cache=lhorizon.cache,
+            release_response=lhorizon.release_response,
+            response_format=lhorizon.response_format,
+            time_format=lhorizon.time_format,
+            columns=lhorizon.columns,
+        )
+        for half in bisect_epochs(lhorizon.epochs)
+    ]
+
+
 def datetime_from_horizon_epochs(start: str, stop: str, step: Union[int, str]):
-    """convert epoch dict to datetime in order to estimate response length."""
-    return {"start": dtp.parse(start), "stop": dtp.parse(stop), "step": step}
+    """
+    convert epoch dict to datetime in order to estimate response length.
+    start and stop may be calendar dates or "JD"-prefixed Julian dates.
+    """
+    return {
+        "start": parse_horizons_time(start),
+        "stop": parse_horizons_time(stop),
+        "step": step,
+    }
+
+
+def plan_chunks(
+    epochs: Mapping, chunksize: int = 85000, n_chunks: Optional[int] = None
+) -> list[dict]:
+    """
+    split a time range into consecutive ranges that together sample exactly
+    the times _Horizons_ would sample in it, with no duplicated or missing
+    samples at their boundaries, and that each return at most `chunksize`
+    lines. unlike `chunk_time()`, this supports all _Horizons_ step units,
+    including calendar months ("mo") and years ("y"), and balances the
+    chunks: their lengths differ by at most one line.
+
+    if `n_chunks` is passed, makes a multiple of `n_chunks` chunks, so that
+    `n_chunks` parallel workers (e.g. in `query_lhorizons_threaded()`) get
+    equal amounts of work. chunks always contain at least two samples, so
+    very short ranges may be split into fewer chunks.
+    """
+    horizons_dt = datetime_from_horizon_epochs(**epochs)
+    start = naive_utc(horizons_dt["start"])
+    stop = naive_utc(horizons_dt["stop"])
+    count, unit = parse_step(epochs["step"])
+    step_time, last = step_grid(start, stop, count, unit)
+    samples = last + 1
+    chunk_count = max(math.ceil(samples / chunksize), 1)
+    if n_chunks is not None:
+        chunk_count = n_chunks * math.ceil(chunk_count / n_chunks)
+    chunk_count = max(min(chunk_count, samples // 2), 1)
+    # e.g., a month after Jan 31 is Feb 29, but a month after Feb 29 is
+    # Mar 29, not Mar 31, so later chunks would drift off the grid
+    if unit == "mo":
+        drifts = start.day > 28
+    else:
+        drifts = (unit == "y") and ((start.month, start.day) == (2, 29))
+    if drifts and (chunk_count > 1):
+        raise ValueError(
+            f"a time range starting on {start.date()} with a step of "
+            f"{epochs['step']} can't be split exactly"
+        )
+    bounds = [samples * ix // chunk_count for ix in range(chunk_count + 1)]
+    chunks = []
+    for first, after in zip(bounds, bounds[1:]):
+        chunks.append(
+            {
+                "start": step_time(first).isoformat(),
+                "stop": step_time(after - 1).isoformat(),
+                # unitless steps are numbers of intervals
+                "step": epochs["step"] if unit else str(after - 1 - first),
+            }
+        )
+    return chunks
 
 
 def construct_lhorizon_list(
@@ -99,17 +239,31 @@ def construct_lhorizon_list(
     query_type: str = "OBSERVER",
     query_options: Optional[Mapping] = None,
     chunksize=85000,
+    cache: Optional[ResponseCache] = None,
+    response_format: str = "json",
+    time_format: str = "calendar",
+    columns: Optional[Sequence[str]] = None,
+    n_chunks: Optional[int] = None,
 ) -> list[LHorizon]:
     """
     construct a list of `LHorizon`s. Intended for queries that will
     return over 90000 lines, currently the hard limit of the _Horizons_
     CGI. this function takes most of the same arguments as `LHorizon`, but
     epochs must be specified as a dictionary with times in ISO format.
+    chunks are planned by `plan_chunks()`; pass `n_chunks` to divide the
+    range evenly between that many parallel workers. chunk boundaries are
+    deterministic, so with a response `cache`, repeating
+    a bulk query reuses cached responses for each chunk. large chunks parse
+    faster with response_format="text" (see `LHorizon`). chunks need not be
+    conservatively small: the bulk query functions split any chunk whose
+    response _Horizons_ truncates. once the chunks are queried,
+    `assemble_tables()` combines their tables economically.
 
     NOTE: this function does not support chunking long lists of
-    explicitly-defined individual epochs. queries of this type are extremely
-    inefficient for _Horizons_ and delivering many of them in quick succession
-    typically causes it to tightly throttle the requester.
+    explicitly-defined individual epochs; use `construct_tlist_lhorizons()`.
+    queries of this type are extremely inefficient for _Horizons_ and
+    delivering many of them in quick succession typically causes it to
+    tightly throttle the requester.
     """
     return [
         LHorizon(
@@ -119,9 +273,369 @@ def construct_lhorizon_list(
             session=session,
             epochs=chunk,
             query_options=query_options,
+            cache=cache,
+            response_format=response_format,
+            time_format=time_format,
+            columns=columns,
+        )
+        for chunk in plan_chunks(epochs, chunksize, n_chunks)
+    ]
+
+
+def _unique_epochs(epochs: Sequence) -> tuple[np.ndarray, np.ndarray]:
+    """
+    convert epochs to Julian dates as LHorizon would, then dedupe and sort
+    them. returns the sorted unique epochs and, for each passed epoch, its
+    index in them. raises a ValueError if no epochs are passed.
+    """
+    if isinstance(epochs, Sized) and (len(epochs) == 0):
+        raise ValueError("no epochs were passed")
+    jds = np.asarray(listify(LHorizon._prep_epochs(epochs)), dtype=float)
+    return np.unique(jds, return_inverse=True)
+
+
+def construct_tlist_lhorizons(
+    epochs: Sequence,
+    target: Union[int, str, MutableMapping] = "301",
+    origin: Union[int, str, MutableMapping] = "500@399",
+    session: Optional[requests.Session] = None,
+    query_type: str = "OBSERVER",
+    query_options: Optional[Mapping] = None,
+    cache: Optional[ResponseCache] = None,
+    max_url_length: int = 2000,
+    **lhorizon_options,
+) -> list[LHorizon]:
+    """
+    construct a list of `LHorizon`s that together query an arbitrarily long
+    list of explicitly-defined epochs (in any form accepted by `LHorizon`).
+    the epochs are deduplicated and sorted, then packed into as few `LHorizon`s
+    as possible without making any request URL `max_url_length` characters or
+    longer. `lhorizon_options` are passed to `LHorizon`.
+
+    use `gather_tlist_tables()` to combine the results into a single table in
+    the original order of `epochs`. remember that _Horizons_ handles long lists
+    of individual epochs slowly and may throttle you for sending many of them;
+    if your epochs are evenly spaced, query a range instead.
+    """
+    unique_epochs, _ = _unique_epochs(epochs)
+
+    def make_lhorizon(batch):
+        return LHorizon(
+            target,
+            origin,
+            query_type=query_type,
+            session=session,
+            epochs=batch,
+            query_options=query_options,
+            cache=cache,
+            **lhorizon_options,
+        )
+
+    def tlist_length(epoch):
+        # epochs are separated by an encoded newline
+        return len(quote_plus(str(epoch))) + len("%0A")
+
+    first = unique_epochs[:1].tolist()
+    base_length = len(make_lhorizon(first).request.url) - tlist_length(
+        first[0]
+    )
+    batches, batch, url_length = [], [], base_length
+    for epoch in unique_epochs.tolist():
+        if batch and (url_length + tlist_length(epoch) >= max_url_length):
+            batches.append(batch)
+            batch, url_length = [], base_length
+        batch.append(epoch)
+        url_length += tlist_length(epoch)
+    batches.append(batch)
+    return [make_lhorizon(batch) for batch in batches]
+
+
+def gather_tlist_tables(
+    lhorizons: Sequence[LHorizon], epochs: Sequence
+) -> pd.DataFrame:
+    """
+    combine the tables of `LHorizon`s made by `construct_tlist_lhorizons()`
+    from `epochs` into a single table with a row for each of `epochs`, in the
+    same order (including duplicates). queries any `LHorizon`s that have not
+    yet been queried. raises a ValueError if _Horizons_ did not return
+    exactly one row per epoch (e.g., if the query options exclude some).
+    """
+    unique_epochs, order = _unique_epochs(epochs)
+    table = pd.concat(
+        [lhorizon.table() for lhorizon in lhorizons], ignore_index=True
+    )
+    if len(table) != len(unique_epochs):
+        raise ValueError(
+            f"expected {len(unique_epochs)} rows, one for each distinct "
+            f"epoch, but Horizons returned {len(table)}; cannot match rows "
+            f"to epochs."
+        )
+    return table.iloc[order].reset_index(drop=True)
+
+
+class EpochRange(NamedTuple):
+    """
+    a range query planned by `plan_epoch_ranges()`: `intervals` evenly-spaced
+    intervals from `start` to `stop` (Julian dates). `members` are indices
+    of the epochs it covers in the plan's `unique_epochs`; `rows` are their
+    row numbers in the range's table.
+    """
+    start: float
+    stop: float
+    intervals: int
+    members: np.ndarray
+    rows: np.ndarray
+
+    def epochs(self) -> dict:
+        """epochs for an `LHorizon` that queries this range"""
+        return {
+            "start": f"JD {self.start:.9f}",
+            "stop": f"JD {self.stop:.9f}",
+            # a unitless step means 'this many even intervals'
+            "step": str(self.intervals),
+        }
+
+
+class EpochPlan(NamedTuple):
+    """
+    a plan for querying a list of epochs, made by `plan_epoch_ranges()`.
+    `unique_epochs` are the distinct epochs as sorted Julian dates, and
+    `order` gives the index in `unique_epochs` of each originally-passed
+    epoch. `ranges` cover some of them; `residual` are indices of the rest,
+    to be queried as explicit lists.
+    """
+    unique_epochs: np.ndarray
+    order: np.ndarray
+    ranges: list[EpochRange]
+    residual: np.ndarray
+
+
+def _extend_grid_run(
+    epochs: np.ndarray,
+    ix: int,
+    kx: int,
+    request_cost: float,
+    tolerance: float,
+    max_strays: int,
+) -> tuple[float, float, list[int], list[int]]:
+    """
+    follow the grid defined by epochs ix and kx as far as it goes. helper
+    function for _find_grid_runs().
+    """
+    start, step = epochs[ix], epochs[kx] - epochs[ix]
+    members, positions = [ix], [0]
+
+    def grid_position(jx: int) -> Optional[int]:
+        """position of epoch jx on the grid, if it continues the run"""
+        offset = (epochs[jx] - start) / step
+        position = round(offset)
+        missing = position - positions[-1] - 1
+        if (abs(offset - position) * step <= tolerance) and (
+            0 <= missing <= request_cost
+        ):
+            return position
+        return None
+
+    jx = kx
+    while jx < len(epochs):
+        position = grid_position(jx)
+        if position is None:
+            # skip stray epochs if the grid resumes right after them
+            for lx in range(jx + 1, min(jx + 1 + max_strays, len(epochs))):
+                if grid_position(lx) is not None:
+                    jx = lx
+                    break
+            else:
+                break
+            continue
+        members.append(jx)
+        positions.append(position)
+        # refine the step, so that error doesn't accumulate
+        step = (epochs[jx] - start) / position
+        jx += 1
+    return start, step, members, positions
+
+
+def _find_grid_runs(
+    epochs: np.ndarray,
+    request_cost: float,
+    tolerance: float,
+    max_strays: int = 8,
+) -> list[tuple[float, float, list[int], list[int]]]:
+    """
+    greedily split sorted epochs into runs that lie on evenly-spaced grids.
+    a run continues across a gap of missing grid points if the gap contains
+    no more than `request_cost` points, and past up to `max_strays`
+    consecutive off-grid epochs. returns (grid start, grid step, indices of
+    epochs in run, their grid positions) for each run.
+    """
+    runs, ix = [], 0
+    while ix < len(epochs):
+        if ix == len(epochs) - 1:
+            runs.append((epochs[ix], 1.0, [ix], [0]))
+            break
+        run = _extend_grid_run(
+            epochs, ix, ix + 1, request_cost, tolerance, max_strays
+        )
+        # if the next epoch is a stray, it defines a bogus step; try the
+        # grids defined by the epochs after it instead
+        for kx in range(ix + 2, min(ix + 2 + max_strays, len(epochs))):
+            if len(run[2]) > 2:
+                break
+            candidate = _extend_grid_run(
+                epochs, ix, kx, request_cost, tolerance, max_strays
+            )
+            if len(candidate[2]) > len(run[2]):
+                run = candidate
+        runs.append(run)
+        ix = run[2][-1] + 1
+    return runs
+
+
+def plan_epoch_ranges(
+    epochs: Sequence,
+    request_cost: float = 500,
+    min_range_length: int = 20,
+    tolerance: float = 1e-6,
+    chunksize: int = 85000,
+) -> EpochPlan:
+    """
+    plan queries for a list of epochs (in any form accepted by `LHorizon`)
+    that are wholly or partly regular -- e.g., an instrument cadence with
+    gaps. runs of evenly-spaced epochs are covered with range queries, which
+    _Horizons_ handles much more efficiently than explicit lists of epochs;
+    the remaining epochs are left to be queried as explicit lists.
+
+    `request_cost` sets the tradeoff between over-fetching and sending more
+    requests: it is the number of unwanted rows worth fetching to avoid one
+    additional request. a range spans a gap in its grid only if the gap is
+    no more than `request_cost` points long. runs of fewer than
+    `min_range_length` epochs are not worth their own range query.
+    `tolerance` is the largest deviation from a grid, in days, at which an
+    epoch is still considered to lie on it. ranges longer than `chunksize`
+    intervals are split.
+
+    pass the result to `construct_planned_lhorizons()` to make `LHorizon`s,
+    and their tables to `gather_planned_tables()`.
+    """
+    unique_epochs, order = _unique_epochs(epochs)
+    ranges, residual = [], []
+    for start, step, members, positions in _find_grid_runs(
+        unique_epochs, request_cost, tolerance
+    ):
+        if len(members) < max(min_range_length, 2):
+            residual += members
+            continue
+        # residual epochs may be interleaved with this run
+        residual += sorted(
+            set(range(members[0], members[-1] + 1)).difference(members)
+        )
+        members, positions = np.array(members), np.array(positions)
+        # split into pieces no more than chunksize intervals long, starting
+        # each at a wanted epoch
+        piece_start = 0
+        while piece_start < len(members):
+            first = positions[piece_start]
+            piece_stop = np.searchsorted(
+                positions, first + chunksize, side="right"
+            )
+            last = positions[piece_stop - 1]
+            if last == first:
+                # a range must span at least one interval
+                residual.append(members[piece_start])
+            else:
+                ranges.append(
+                    EpochRange(
+                        start + first * step,
+                        start + last * step,
+                        int(last - first),
+                        members[piece_start:piece_stop],
+                        positions[piece_start:piece_stop] - first,
+                    )
+                )
+            piece_start = piece_stop
+    return EpochPlan(
+        unique_epochs, order, ranges, np.array(sorted(residual), dtype=int)
+    )
+
+
+def construct_planned_lhorizons(
+    plan: EpochPlan,
+    target: Union[int, str, MutableMapping] = "301",
+    origin: Union[int, str, MutableMapping] = "500@399",
+    session: Optional[requests.Session] = None,
+    query_type: str = "OBSERVER",
+    query_options: Optional[Mapping] = None,
+    cache: Optional[ResponseCache] = None,
+    **lhorizon_options,
+) -> list[LHorizon]:
+    """
+    construct the `LHorizon`s called for by an `EpochPlan`: one for each of
+    its ranges, followed by explicit-list `LHorizon`s for its residual
+    epochs (as made by `construct_tlist_lhorizons()`). `lhorizon_options`
+    are passed to `LHorizon`.
+    """
+    lhorizons = [
+        LHorizon(
+            target,
+            origin,
+            query_type=query_type,
+            session=session,
+            epochs=epoch_range.epochs(),
+            query_options=query_options,
+            cache=cache,
+            **lhorizon_options,
         )
-        for chunk in chunk_time(epochs, chunksize)
+        for epoch_range in plan.ranges
     ]
+    if len(plan.residual) > 0:
+        lhorizons += construct_tlist_lhorizons(
+            plan.unique_epochs[plan.residual],
+            target,
+            origin,
+            session,
+            query_type,
+            query_options,
+            cache,
+            **lhorizon_options,
+        )
+    return lhorizons
+
+
+def gather_planned_tables(
+    plan: EpochPlan, lhorizons: Sequence[LHorizon]
+) -> pd.DataFrame:
+    """
+    select the requested epochs from the tables of `LHorizon`s made by
+    `construct_planned_lhorizons()`, combining them into a single table with
+    a row for each epoch originally passed to `plan_epoch_ranges()`, in the
+    same order. queries any `LHorizon`s that have not yet been queried.
+    raises a ValueError if _Horizons_ did not return exactly one row per
+    requested grid point or epoch.
+    """
+    pieces, members = [], []
+    for epoch_range, lhorizon in zip(plan.ranges, lhorizons):
+        table = lhorizon.table()
+        if len(table) != epoch_range.intervals + 1:
+            raise ValueError(
+                f"expected {epoch_range.intervals + 1} rows for range "
+                f"{epoch_range.epochs()}, but Horizons returned {len(table)}."
+            )
+        pieces.append(table.iloc[epoch_range.rows])
+        members.append(epoch_range.members)
+    if len(plan.residual) > 0:
+        pieces.append(
+            gather_tlist_tables(
+                lhorizons[len(plan.ranges):],
+                plan.unique_epochs[plan.residual],
+            )
+        )
+        members.append(plan.residual)
+    table = pd.concat(pieces, ignore_index=True)
+    # rows of table, in order of unique epochs
+    unique_rows = np.empty(len(plan.unique_epochs), dtype=int)
+    unique_rows[np.concatenate(members)] = np.arange(len(table))
+    return table.iloc[unique_rows[plan.order]].reset_index(drop=True)
 
 
 def query_all_lhorizons(
@@ -129,47 +643,513 @@ def query_all_lhorizons(
     delay_between=2,
     delay_retry=8,
     max_retries=5,
+    cache: Optional[ResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    max_delay_retry=300,
+    max_splits=6,
 ):
     """
-    queries a sequence of `LHorizon`s using a shared
-    session, carefully closing sockets and pausing between them, regenerating
-    session and pausing for a longer interval if _Horizons_ rejects a query
+    queries a sequence of `LHorizon`s using a shared session. requests are
+    paced by `rate_limiter`: by default, a new `RateLimiter` that permits one
+    request every `delay_between` seconds. pass a `RateLimiter` to share a
+    politeness limit between several bulk jobs.
+
+    if _Horizons_ rejects a query for a transient reason (throttling, server
+    trouble), regenerates the session and retries after a jittered,
+    exponentially-increasing delay that starts at `delay_retry` seconds and
+    is capped at `max_delay_retry` seconds (unless the response's Retry-After
+    header requests a longer one). raises a TimeoutError after `max_retries`
+    retries. raises a HorizonsReturnedError without retrying if _Horizons_
+    rejects a query because of a problem with the query itself.
+
+    if `cache` is passed, it replaces each `LHorizon`'s response cache.
+    responses retrieved from a cache do not count against the rate limit.
+
+    if _Horizons_ truncates a response (generally because it would exceed
+    the _Horizons_ line limit, which cannot be predicted for queries with
+    airmass, hour angle, or similar restrictions), splits that query's
+    epochs in half and queries each half, repeating as necessary up to
+    `max_splits` times, then stitches the results together (see
+    `LHorizon.stitch()`). this makes it safe to use large chunks.
     """
     # TODO, maybe: add an attractive progress bar of some type
+    rate_limiter = make_rate_limiter(delay_between, rate_limiter)
     session = default_lhorizon_session()
-    for ix, lhorizon in enumerate(lhorizons):
+
+    def query_one(lhorizon: LHorizon):
+        nonlocal session
         lhorizon.session = session
+        if cache is not None:
+            lhorizon.cache = cache
         lhorizon.prepare_request()
+        _query_with_retries(
+            lhorizon,
+            rate_limiter,
+            delay_retry,
+            max_retries,
+            max_delay_retry,
+            default_lhorizon_session,
+        )
+        # retries replace the session; keep using the fresh one
+        session = lhorizon.session
+
+    for ix, lhorizon in enumerate(lhorizons):
         logging.info(
             f"querying Horizons for LHorizon {ix+1} of {len(lhorizons)}"
         )
-        lhorizon.query()
-        retries = 0
-        while lhorizon.response.status_code != 200:
-            if retries > max_retries:
-                raise TimeoutError(
-                    f"exceeded {max_retries}; retries aborting request."
+        pieces = _query_splitting(lhorizon, query_one, max_splits)
+        if len(pieces) > 1:
+            lhorizon.stitch(pieces)
+
+
+class QueryResult(NamedTuple):
+    """
+    outcome of one query in a bulk job. `error` is None if the query
+    succeeded, and otherwise is the exception that caused it to fail.
+    """
+    lhorizon: LHorizon
+    error: Optional[Exception]
+
+
+def query_lhorizons_threaded(
+    lhorizons: Sequence[LHorizon],
+    max_workers=8,
+    delay_between=2,
+    delay_retry=8,
+    max_retries=5,
+    cache: Optional[ResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    max_delay_retry=300,
+    max_splits=6,
+) -> list[QueryResult]:
+    """
+    parallel version of `query_all_lhorizons()`. queries a sequence of
+    `LHorizon`s from a pool of `max_workers` threads that share a session
+    with a connection pool of the same size. requests are paced and retried
+    just as they are by `query_all_lhorizons()`; in particular, the rate
+    limit applies to all threads together. truncated responses are also
+    handled the same way.
+
+    a failed query does not stop the others. returns a list of `QueryResult`
+    in the same order as `lhorizons`, each giving the queried `LHorizon` and
+    the exception that caused its query to fail, if any.
+    """
+    rate_limiter = make_rate_limiter(delay_between, rate_limiter)
+    session = default_lhorizon_session(pool_size=max_workers)
+
+    def query_piece(lhorizon: LHorizon):
+        lhorizon.session = session
+        if cache is not None:
+            lhorizon.cache = cache
+        lhorizon.prepare_request()
+        # don't regenerate the session on retries; other threads are
+        # using it
+        _query_with_retries(
+            lhorizon, rate_limiter, delay_retry, max_retries,
+            max_delay_retry
+        )
+
+    def query_one(lhorizon: LHorizon) -> QueryResult:
+        try:
+            pieces = _query_splitting(lhorizon, query_piece, max_splits)
+            if len(pieces) > 1:
+                lhorizon.stitch(pieces)
+            return QueryResult(lhorizon, None)
+        except Exception as error:
+            logging.info(f"query failed for {lhorizon}: {error}")
+            return QueryResult(lhorizon, error)
+
+    try:
+        with ThreadPoolExecutor(max_workers) as executor:
+            return list(executor.map(query_one, lhorizons))
+    finally:
+        session.close()
+
+
+def _make_stitched_table(
+    jpl_responses: Sequence[Union[str, bytes]], *table_args
+) -> pd.DataFrame:
+    """
+    make_lhorizon_table() for the responses to a query that was split into
+    consecutive pieces, concatenating their tables
+    """
+    if len(jpl_responses) == 1:
+        return make_lhorizon_table(jpl_responses[0], *table_args)
+    return pd.concat(
+        [make_lhorizon_table(body, *table_args) for body in jpl_responses],
+        ignore_index=True,
+    )
+
+
+def iter_lhorizon_tables(
+    lhorizons: Iterable[LHorizon],
+    max_pending: int = 2,
+    parse_processes: int = 1,
+    delay_between=2,
+    delay_retry=8,
+    max_retries=5,
+    cache: Optional[ResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    max_delay_retry=300,
+    max_splits=6,
+) -> Iterator[pd.DataFrame]:
+    """
+    query `LHorizon`s and yield their tables (as produced by
+    `LHorizon.table()`), in order, overlapping network and CPU work: a
+    background thread fetches responses while a pool of `parse_processes`
+    worker processes parses them. pass `parse_processes=0` to parse in a
+    worker thread instead, which avoids process startup and data transfer
+    costs but competes with the main thread for the interpreter.
+
+    at most `max_pending` responses are held (being parsed or waiting to be
+    yielded) at once, and each `LHorizon`'s response body is released once
+    it has been handed off to a parser, so memory use stays flat no matter
+    how many `LHorizon`s there are. `lhorizons` may be a lazy iterable.
+
+    requests are paced and retried, and truncated responses split, just as
+    they are by `query_all_lhorizons()`, which also describes the other
+    arguments.
+    """
+    rate_limiter = make_rate_limiter(delay_between, rate_limiter)
+    if parse_processes == 0:
+        executor = ThreadPoolExecutor(1)
+    else:
+        # the fetch thread submits jobs, so don't fork from it
+        executor = ProcessPoolExecutor(
+            parse_processes, mp_context=multiprocessing.get_context("spawn")
+        )
+    pending = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def hand_off(item: Optional[Future]):
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    session = default_lhorizon_session()
+
+    def query_one(lhorizon: LHorizon):
+        nonlocal session
+        lhorizon.session = session
+        if cache is not None:
+            lhorizon.cache = cache
+        lhorizon.prepare_request()
+        _query_with_retries(
+            lhorizon,
+            rate_limiter,
+            delay_retry,
+            max_retries,
+            max_delay_retry,
+            default_lhorizon_session,
+        )
+        session = lhorizon.session
+
+    def fetch():
+        try:
+            for lhorizon in lhorizons:
+                if stop.is_set():
+                    return
+                pieces = _query_splitting(lhorizon, query_one, max_splits)
+                parsed = executor.submit(
+                    _make_stitched_table,
+                    [piece._response_body() for piece in pieces],
+                    lhorizon.query_type,
+                    lhorizon._has_topocentric_target(),
+                    lhorizon.ignore_oob_time,
+                    lhorizon.response_format,
+                    lhorizon.time_format,
                 )
-            logging.info(
-                f"response code {lhorizon.response.status_code}, "
-                f"pausing before retrying request"
+                for piece in pieces:
+                    piece._release_response()
+                hand_off(parsed)
+        except Exception as error:
+            failed = Future()
+            failed.set_exception(error)
+            hand_off(failed)
+        finally:
+            hand_off(None)
+            session.close()
+
+    fetcher = threading.Thread(target=fetch, daemon=True)
+    fetcher.start()
+    try:
+        while (parsed := pending.get()) is not None:
+            yield parsed.result()
+    finally:
+        stop.set()
+        fetcher.join()
+        executor.shutdown(cancel_futures=True)
+
+
+def iter_tables(
+    epochs: MutableMapping,
+    target: Union[int, str, MutableMapping] = "301",
+    origin: Union[int, str, MutableMapping] = "500@399",
+    query_type: str = "OBSERVER",
+    query_options: Optional[Mapping] = None,
+    chunksize=85000,
+    ignore_oob_time: bool = False,
+    response_format: str = "json",
+    time_format: str = "calendar",
+    columns: Optional[Sequence[str]] = None,
+    n_chunks: Optional[int] = None,
+    **pipeline_options,
+) -> Iterator[pd.DataFrame]:
+    """
+    streaming alternative to `construct_lhorizon_list()`: splits a time
+    range into chunks just as it does, but yields a table for each chunk
+    (as produced by `LHorizon.table()`) rather than returning a list of
+    `LHorizon`s. each chunk's `LHorizon` is constructed only when it is
+    needed and discarded once its table has been produced, so peak memory
+    use is bounded by a few chunks regardless of the length of the range.
+
+    `pipeline_options` are passed to `iter_lhorizon_tables()`; for the
+    smallest memory footprint, pass `max_pending=1`.
+    """
+    lhorizons = (
+        LHorizon(
+            target,
+            origin,
+            query_type=query_type,
+            epochs=chunk,
+            query_options=query_options,
+            ignore_oob_time=ignore_oob_time,
+            response_format=response_format,
+            time_format=time_format,
+            columns=columns,
+        )
+        for chunk in plan_chunks(epochs, chunksize, n_chunks)
+    )
+    yield from iter_lhorizon_tables(lhorizons, **pipeline_options)
+
+
+def _is_bufferable(dtype) -> bool:
+    """
+    can assemble_tables() copy a column with this dtype into a NumPy buffer?
+    other columns (e.g. strings) are concatenated instead.
+    """
+    return isinstance(dtype, np.dtype) and (dtype.kind in "biufcmM")
+
+
+def assemble_tables(
+    chunks: Iterable[Union[LHorizon, pd.DataFrame]],
+    release: bool = True,
+    expected_rows: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    assemble the tables of consecutive chunks of a bulk query -- `LHorizon`s
+    (e.g. from `construct_lhorizon_list()`) or tables (e.g. from
+    `iter_tables()`) -- into one table. this copies each chunk's numeric and
+    time columns into preallocated buffers as it goes, rather than
+    concatenating whole tables at the end, so it needs much less memory
+    than `pd.concat()`. if `release` is True, each `LHorizon`'s response
+    and parsed DataFrames are discarded as soon as they have been copied.
+
+    buffers are sized from the length of the first chunk and the number of
+    chunks. if `chunks` has no length (e.g. it is a generator), pass
+    `expected_rows` (e.g. the total number of samples in a range) to avoid
+    growing the buffers as chunks arrive.
+
+    rows at the start of a chunk that duplicate rows at the end of the
+    previous chunk are dropped. raises a ValueError if times are not
+    strictly increasing otherwise.
+    """
+    buffers, pieces, dtypes, key = {}, {}, {}, None
+    # key times of the last nonempty chunk
+    previous = None
+    rows, capacity = 0, 0
+    for chunk in chunks:
+        if isinstance(chunk, LHorizon):
+            table = chunk.table()
+            if release is True:
+                chunk._release_response()
+                chunk._clear_parsed()
+        else:
+            table = chunk
+        if key is None:
+            key = time_key(table)
+            dtypes = dict(table.dtypes)
+            if expected_rows is not None:
+                capacity = expected_rows
+            elif isinstance(chunks, Sized):
+                capacity = len(table) * len(chunks)
+            for column, dtype in dtypes.items():
+                if _is_bufferable(dtype):
+                    buffers[column] = np.empty(capacity, dtype)
+                else:
+                    pieces[column] = []
+        elif list(table.columns) != list(dtypes):
+            raise ValueError("all chunks must have the same columns.")
+        times = key_times(table, key)
+        if not (times[1:] > times[:-1]).all():
+            raise ValueError("times within a chunk are not increasing.")
+        # drop rows that overlap the previous chunk, but only if they repeat
+        # its last rows; anything else means chunks are out of order
+        overlap = 0
+        if previous is not None:
+            overlap = int(np.searchsorted(times, previous[-1], "right"))
+            if (overlap > len(previous)) or not np.array_equal(
+                times[:overlap], previous[len(previous) - overlap:]
+            ):
+                raise ValueError("chunks are out of order.")
+        if len(times) > 0:
+            # copied, so as not to keep the whole table alive
+            previous = times.copy()
+        length = len(table) - overlap
+        if rows + length > capacity:
+            capacity = max(rows + length, capacity * 2)
+            for column, buffer in buffers.items():
+                buffers[column] = np.empty(capacity, buffer.dtype)
+                buffers[column][:rows] = buffer[:rows]
+        for column, buffer in buffers.items():
+            buffer[rows:rows + length] = table[column].to_numpy()[overlap:]
+        for column, column_pieces in pieces.items():
+            column_pieces.append(table[column].iloc[overlap:])
+        rows += length
+        del table
+    columns = {}
+    for column, dtype in dtypes.items():
+        # release each buffer as soon as its column is made
+        if column in pieces:
+            columns[column] = pd.concat(pieces.pop(column), ignore_index=True)
+            continue
+        buffer = buffers.pop(column)
+        if len(buffer) > rows:
+            buffer = buffer[:rows].copy()
+        columns[column] = pd.Series(buffer, dtype=dtype, copy=False)
+    return pd.DataFrame(columns, copy=False)
+
+
+def write_table_dataset(
+    tables: Iterable[pd.DataFrame],
+    directory: Union[str, Path],
+    file_format: str = "parquet",
+) -> list[Path]:
+    """
+    write each table in `tables` (e.g., the output of `iter_tables()`) to
+    its own file in `directory` as it arrives, producing a partitioned
+    dataset that can be read back with, e.g., `pd.read_parquet(directory)`.
+    `file_format` may be "parquet" or "feather"; both require `pyarrow`.
+    if `directory` already contains a dataset, appends to it; raises a
+    ValueError if that dataset is in the other format. returns the paths of
+    the written files.
+    """
+    if file_format not in ("parquet", "feather"):
+        raise ValueError("file_format must be 'parquet' or 'feather'")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    existing = {"parquet": [], "feather": []}
+    for path in directory.iterdir():
+        match = re.match(r"part-(\d+)\.(parquet|feather)$", path.name)
+        if match is not None:
+            existing[match[2]].append(int(match[1]))
+    other_format = "feather" if file_format == "parquet" else "parquet"
+    if existing[other_format]:
+        raise ValueError(
+            f"{directory} already contains a {other_format} dataset"
+        )
+    # continue numbering after the highest existing part, so that gaps in
+    # the numbering don't cause existing parts to be overwritten
+    ix = max(existing[file_format], default=-1) + 1
+    paths = []
+    for table in tables:
+        path = directory / f"part-{ix:05d}.{file_format}"
+        if file_format == "parquet":
+            table.to_parquet(path, index=False)
+        else:
+            table.reset_index(drop=True).to_feather(path)
+        paths.append(path)
+        ix += 1
+    return paths
+
+
+def _query_with_retries(
+    lhorizon: LHorizon,
+    rate_limiter: RateLimiter,
+    delay_retry: float,
+    max_retries: int,
+    max_delay_retry: float,
+    make_session: Optional[Callable[[], requests.Session]] = None,
+):
+    """
+    query a single LHorizon for the bulk query functions, retrying as
+    described in `query_all_lhorizons()`. if `make_session` is passed, closes
+    the LHorizon's session and replaces it with `make_session()` before each
+    retry.
+    """
+    # this checks the response cache; on a hit, there's nothing to send
+    if lhorizon._needs_fetch(refetch=False):
+        rate_limiter.acquire()
+        lhorizon.query(refetch=True)
+    retries = 0
+    while lhorizon.response.status_code != 200:
+        check_retryable(lhorizon.response)
+        if retries > max_retries:
+            raise TimeoutError(
+                f"exceeded {max_retries}; retries aborting request."
             )
+        delay = retry_delay(
+            lhorizon.response, retries, delay_retry, max_delay_retry
+        )
+        logging.info(
+            f"response code {lhorizon.response.status_code}, "
+            f"pausing {round(delay, 1)} s before retrying request"
+        )
+        rate_limiter.defer(delay)
+        if make_session is not None:
             lhorizon.session.close()
-            time.sleep(delay_retry)
-            logging.info("retrying request")
-            session = default_lhorizon_session()
-            lhorizon.session = default_lhorizon_session()
+        rate_limiter.acquire()
+        logging.info("retrying request")
+        if make_session is not None:
+            lhorizon.session = make_session()
             lhorizon.prepare_request()
-            lhorizon.query(refetch=True)
-            retries += 1
-        logging.info(
-            f"collected data from {lhorizon.epochs['start']} "
-            f"to {lhorizon.epochs['stop']}"
+        lhorizon.query(refetch=True)
+        retries += 1
+    logging.info(f"collected data for {lhorizon}")
+
+
+def _is_truncated(lhorizon: LHorizon) -> bool:
+    """has this LHorizon received a truncated response?"""
+    if lhorizon.response is None:
+        return False
+    body = lhorizon._response_body()
+    # an empty (e.g. released) response isn't a truncated one
+    return bool(body) and horizons_response_truncated(body)
+
+
+def _query_splitting(
+    lhorizon: LHorizon,
+    query: Callable[[LHorizon], None],
+    max_splits: int,
+) -> list[LHorizon]:
+    """
+    query an LHorizon with `query`. if its response is truncated, split it
+    (see `split_lhorizon()`) and query the halves, recursively, up to
+    `max_splits` times. returns the successfully-queried LHorizons that
+    cover its epochs, in order: just `lhorizon` if its response was not
+    truncated.
+    """
+    try:
+        query(lhorizon)
+    except HorizonsReturnedError:
+        if not _is_truncated(lhorizon):
+            raise
+    if not _is_truncated(lhorizon):
+        return [lhorizon]
+    if max_splits == 0:
+        raise HorizonsReturnedError(
+            f"Horizons truncated the response to {lhorizon}, and it cannot "
+            f"be split any further."
         )
-        # pausing for politeness
-        if ix != len(lhorizons) - 1:
-            logging.info("pausing before next request")
-            time.sleep(delay_between)
+    logging.info(f"response truncated; splitting {lhorizon}")
+    return [
+        piece
+        for half in split_lhorizon(lhorizon)
+        for piece in _query_splitting(half, query, max_splits - 1)
+    ]
 
 
 def _format_site_id(obj):
@@ -0,0 +1,195 @@
+"""
+local interpolation of VECTORS ephemerides. positions and velocities
+sampled by _Horizons_ at a modest cadence determine an ephemeris between
+samples to high accuracy, so a `HermiteEphemeris` built from one coarse
+query can stand in for many fine-grained ones.
+"""
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from lhorizon._type_aliases import Array
+from lhorizon.constants import J2000_JD, J2000_TDB
+from lhorizon.lhorizon_utils import jd_to_et
+
+POSITION_COLUMNS = ("x", "y", "z")
+VELOCITY_COLUMNS = ("vx", "vy", "vz")
+
+
+def tdb_jd(epochs: Union[float, Array]) -> np.ndarray:
+    """
+    Julian date(s) in TDB from Julian dates or datetimes in TDB (like the
+    'jd_tdb' and 'time_tdb' columns of VECTORS tables)
+    """
+    epochs = np.atleast_1d(np.asarray(epochs))
+    if epochs.dtype.kind == "M":
+        return J2000_JD + (epochs - np.datetime64(J2000_TDB)) / np.timedelta64(
+            1, "D"
+        )
+    return epochs.astype(np.float64)
+
+
+def vectors_arrays(
+    table: pd.DataFrame,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    sample times (as ET), positions, and velocities from a VECTORS table
+    with columns x, y, z, vx, vy, vz and jd_tdb or time_tdb. checks that
+    there are at least two samples and that times are strictly increasing.
+    """
+    missing = set(POSITION_COLUMNS + VELOCITY_COLUMNS).difference(
+        table.columns
+    )
+    if missing:
+        raise ValueError(f"table lacks columns {sorted(missing)}")
+    times = table["jd_tdb" if "jd_tdb" in table.columns else "time_tdb"]
+    et = jd_to_et(tdb_jd(times.to_numpy()))
+    if len(et) < 2:
+        raise ValueError("interpolation requires at least two samples")
+    if not (np.diff(et) > 0).all():
+        raise ValueError("sample times must be strictly increasing")
+    return (
+        et,
+        table[list(POSITION_COLUMNS)].to_numpy(np.float64),
+        table[list(VELOCITY_COLUMNS)].to_numpy(np.float64),
+    )
+
+
+def hermite(
+    position_0: np.ndarray,
+    velocity_0: np.ndarray,
+    position_1: np.ndarray,
+    velocity_1: np.ndarray,
+    interval: np.ndarray,
+    fraction: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    evaluate cubic Hermite polynomials matching positions and velocities at
+    the start and end of intervals of length `interval`, at `fraction` of
+    the way through each interval. vectors are rows; all arguments
+    broadcast. returns positions and velocities.
+    """
+    s, h = fraction[:, None], interval[:, None]
+    s2, s3 = s ** 2, s ** 3
+    position = (
+        (2 * s3 - 3 * s2 + 1) * position_0
+        + (s3 - 2 * s2 + s) * h * velocity_0
+        + (3 * s2 - 2 * s3) * position_1
+        + (s3 - s2) * h * velocity_1
+    )
+    velocity = (
+        (6 * s2 - 6 * s) * (position_0 - position_1) / h
+        + (3 * s2 - 4 * s + 1) * velocity_0
+        + (3 * s2 - 2 * s) * velocity_1
+    )
+    return position, velocity
+
+
+class HermiteEphemeris:
+    """
+    piecewise cubic Hermite interpolant of a VECTORS ephemeris. between each
+    pair of consecutive samples, position is the cubic polynomial that
+    matches the positions and velocities at both samples, which makes
+    position and velocity continuous everywhere.
+
+    evaluation is vectorized: epochs are located by binary search and the
+    polynomials for all of them are evaluated at once. it also gives an
+    estimate of the position error at each epoch. the error of a cubic
+    Hermite interpolant is proportional to the fourth derivative of
+    position times (t - t0)^2 (t - t1)^2; this estimates that derivative
+    near each sample by interpolating across it from its neighbors and
+    comparing the result to the sample.
+
+    the interpolant is only as good as the sampling: it should be sampled
+    finely enough that the error estimates are acceptably small, and it
+    will not follow abrupt changes (e.g. maneuvers or close encounters)
+    between samples.
+
+    ### parameters
+    #### table: pd.DataFrame
+    a VECTORS table, as produced by `LHorizon.table()`, with columns x, y,
+    z, vx, vy, vz and jd_tdb or time_tdb. positions and velocities must be
+    in m and m/s, as `table()` gives them, and times must be increasing.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.et, self.position, self.velocity = vectors_arrays(table)
+        self._error_coefficients = self._estimate_error_coefficients()
+
+    @classmethod
+    def from_lhorizon(cls, lhorizon) -> "HermiteEphemeris":
+        """make a HermiteEphemeris from a VECTORS LHorizon's table"""
+        if lhorizon.query_type != "VECTORS":
+            raise ValueError("interpolation requires a VECTORS query")
+        return cls(lhorizon.table())
+
+    def _estimate_error_coefficients(self) -> np.ndarray:
+        """
+        estimate, for each interval between samples, the coefficient of
+        (t - t0)^2 (t - t1)^2 in the interpolant's position error
+        """
+        if len(self.et) < 3:
+            return np.full(len(self.et) - 1, np.nan)
+        span = self.et[2:] - self.et[:-2]
+        fraction = (self.et[1:-1] - self.et[:-2]) / span
+        predicted, _ = hermite(
+            self.position[:-2],
+            self.velocity[:-2],
+            self.position[2:],
+            self.velocity[2:],
+            span,
+            fraction,
+        )
+        error = np.linalg.norm(predicted - self.position[1:-1], axis=1)
+        node = error / (fraction ** 2 * (1 - fraction) ** 2 * span ** 4)
+        # end samples have one neighbor; borrow their neighbors' estimates
+        node = np.concatenate([node[:1], node, node[-1:]])
+        return np.maximum(node[:-1], node[1:])
+
+    def evaluate(
+        self, epochs: Union[float, Array]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        interpolate at `epochs`, Julian dates or datetimes in TDB, which
+        must lie within the span of the samples. returns arrays of
+        positions (m) and velocities (m/s), one row per epoch, and of
+        estimated position errors (m).
+        """
+        et = jd_to_et(tdb_jd(epochs))
+        if (et.min() < self.et[0]) or (et.max() > self.et[-1]):
+            raise ValueError("epochs lie outside the span of the samples")
+        ix = np.clip(
+            np.searchsorted(self.et, et, "right") - 1, 0, len(self.et) - 2
+        )
+        interval = self.et[ix + 1] - self.et[ix]
+        fraction = (et - self.et[ix]) / interval
+        position, velocity = hermite(
+            self.position[ix],
+            self.velocity[ix],
+            self.position[ix + 1],
+            self.velocity[ix + 1],
+            interval,
+            fraction,
+        )
+        error = (
+            self._error_coefficients[ix]
+            * (fraction * (1 - fraction)) ** 2
+            * interval ** 4
+        )
+        return position, velocity, error
+
+    def table(self, epochs: Union[float, Array]) -> pd.DataFrame:
+        """
+        interpolate at `epochs` (see `evaluate()`), returning a table in the
+        style of a VECTORS table, with an additional 'error' column of
+        estimated position errors (m)
+        """
+        position, velocity, error = self.evaluate(epochs)
+        table = pd.DataFrame(
+            np.hstack([position, velocity]),
+            columns=list(POSITION_COLUMNS + VELOCITY_COLUMNS),
+        )
+        table.insert(0, "jd_tdb", tdb_jd(epochs))
+        table["error"] = error
+        return table
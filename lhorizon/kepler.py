@@ -0,0 +1,183 @@
+"""
+two-body (Keplerian) propagation of osculating orbital elements, like those
+in the tables of ELEMENTS LHorizons. one ELEMENTS query per body, propagated
+locally, can stand in for dense VECTORS queries wherever two-body motion is
+accurate enough -- e.g. for survey planning, where perturbations over weeks
+or months are small compared to fields of view. all functions operate on
+NumPy arrays, over any number of epochs (or bodies) at once.
+"""
+from collections.abc import Mapping
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from lhorizon._type_aliases import Array
+from lhorizon.interpolation import POSITION_COLUMNS, VELOCITY_COLUMNS, tdb_jd
+
+# element columns of ELEMENTS tables that propagate_elements() uses
+PROPAGATION_ELEMENTS = (
+    "ecc",
+    "periapsis_dist",
+    "inc",
+    "node",
+    "arg_periapsis",
+    "tp",
+    "mean_motion",
+)
+
+
+def _newton(function, derivative, start, tolerance, max_iterations):
+    """vectorized Newton's method, stopping when all steps are small"""
+    solution = start
+    for _ in range(max_iterations):
+        step = function(solution) / derivative(solution)
+        solution = solution - step
+        if (
+            np.abs(step) <= tolerance * np.maximum(1, np.abs(solution))
+        ).all():
+            return solution
+    raise ValueError("Kepler's equation did not converge")
+
+
+def solve_kepler(
+    mean_anomaly: Union[float, Array],
+    ecc: Union[float, Array],
+    tolerance: float = 1e-14,
+    max_iterations: int = 50,
+) -> np.ndarray:
+    """
+    solve Kepler's equation by Newton's method for the eccentric anomaly E
+    (M = E - e sin E) of elliptical orbits, or the hyperbolic anomaly H
+    (M = e sinh H - H) of hyperbolic orbits, for arrays of mean anomalies
+    (rad) and eccentricities, which broadcast. elliptical solutions are
+    reduced to [-pi, pi). raises a ValueError for parabolic orbits (e = 1)
+    or if the solution does not converge.
+    """
+    mean_anomaly, ecc = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(mean_anomaly, dtype=np.float64)),
+        np.atleast_1d(np.asarray(ecc, dtype=np.float64)),
+    )
+    if (ecc == 1).any():
+        raise ValueError("parabolic orbits are not supported")
+    anomaly = np.empty(mean_anomaly.shape)
+    elliptical = ecc < 1
+    m, e = mean_anomaly[elliptical], ecc[elliptical]
+    m = np.mod(m + np.pi, 2 * np.pi) - np.pi
+    anomaly[elliptical] = _newton(
+        lambda x: x - e * np.sin(x) - m,
+        lambda x: 1 - e * np.cos(x),
+        # Danby's starting value
+        m + 0.85 * e * np.sign(m),
+        tolerance,
+        max_iterations,
+    )
+    m, e = mean_anomaly[~elliptical], ecc[~elliptical]
+    anomaly[~elliptical] = _newton(
+        lambda x: e * np.sinh(x) - x - m,
+        lambda x: e * np.cosh(x) - 1,
+        np.sign(m) * np.log(2 * np.abs(m) / e + 1.8),
+        tolerance,
+        max_iterations,
+    )
+    return anomaly
+
+
+def kepler_states(
+    ecc: Union[float, Array],
+    periapsis_dist: Union[float, Array],
+    inc: Union[float, Array],
+    node: Union[float, Array],
+    arg_periapsis: Union[float, Array],
+    tp: Union[float, Array],
+    mean_motion: Union[float, Array],
+    jd_tdb: Union[float, Array],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    positions and velocities on two-body orbits at Julian dates `jd_tdb`,
+    in the frame and units of the elements: periapsis distance in m, angles
+    in degrees, time of periapsis `tp` as a Julian date (TDB), and mean
+    motion in degrees per second, as in ELEMENTS tables. all arguments
+    broadcast, so this propagates one orbit to many epochs, many orbits to
+    one epoch each, etc. returns arrays of positions (m) and velocities
+    (m/s) with one row per epoch.
+    """
+    ecc, periapsis_dist, inc, node, arg_periapsis, tp, mean_motion, jd = (
+        np.broadcast_arrays(
+            *(
+                np.atleast_1d(np.asarray(value, dtype=np.float64))
+                for value in (
+                    ecc,
+                    periapsis_dist,
+                    inc,
+                    node,
+                    arg_periapsis,
+                    tp,
+                    mean_motion,
+                    jd_tdb,
+                )
+            )
+        )
+    )
+    inc, node, arg_periapsis, mean_motion = map(
+        np.radians, (inc, node, arg_periapsis, mean_motion)
+    )
+    # semi-major axis, taken as positive for hyperbolic orbits too
+    axis = periapsis_dist / np.abs(1 - ecc)
+    anomaly = solve_kepler(mean_motion * (jd - tp) * 86400, ecc)
+    elliptical = ecc < 1
+    # position and velocity in the orbital plane, periapsis along x
+    minor = np.sqrt(np.abs(1 - ecc ** 2))
+    cos = np.where(elliptical, np.cos(anomaly), np.cosh(anomaly))
+    sin = np.where(elliptical, np.sin(anomaly), np.sinh(anomaly))
+    rate = mean_motion / np.where(elliptical, 1 - ecc * cos, ecc * cos - 1)
+    x = axis * np.where(elliptical, cos - ecc, ecc - cos)
+    y = axis * minor * sin
+    vx = -axis * sin * rate
+    vy = axis * minor * cos * rate
+    # rotate into the reference frame
+    p_hat = np.stack(
+        [
+            np.cos(node) * np.cos(arg_periapsis)
+            - np.sin(node) * np.sin(arg_periapsis) * np.cos(inc),
+            np.sin(node) * np.cos(arg_periapsis)
+            + np.cos(node) * np.sin(arg_periapsis) * np.cos(inc),
+            np.sin(arg_periapsis) * np.sin(inc),
+        ],
+        axis=1,
+    )
+    q_hat = np.stack(
+        [
+            -np.cos(node) * np.sin(arg_periapsis)
+            - np.sin(node) * np.cos(arg_periapsis) * np.cos(inc),
+            -np.sin(node) * np.sin(arg_periapsis)
+            + np.cos(node) * np.cos(arg_periapsis) * np.cos(inc),
+            np.cos(arg_periapsis) * np.sin(inc),
+        ],
+        axis=1,
+    )
+    position = x[:, None] * p_hat + y[:, None] * q_hat
+    velocity = vx[:, None] * p_hat + vy[:, None] * q_hat
+    return position, velocity
+
+
+def propagate_elements(
+    elements: Union[pd.Series, Mapping], epochs: Union[float, Array]
+) -> pd.DataFrame:
+    """
+    propagate one set of osculating elements -- e.g. a row of the table()
+    of an ELEMENTS LHorizon -- to `epochs` (Julian dates or datetimes in
+    TDB) by two-body motion. returns a table in the style of a VECTORS
+    table, relative to the same center and in the same frame as the
+    elements, with columns jd_tdb, x, y, z, vx, vy, and vz.
+    """
+    jd_tdb = tdb_jd(epochs)
+    position, velocity = kepler_states(
+        *(elements[name] for name in PROPAGATION_ELEMENTS), jd_tdb
+    )
+    table = pd.DataFrame(
+        np.hstack([position, velocity]),
+        columns=list(POSITION_COLUMNS + VELOCITY_COLUMNS),
+    )
+    table.insert(0, "jd_tdb", jd_tdb)
+    return table
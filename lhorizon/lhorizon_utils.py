@@ -1,19 +1,30 @@
 from collections.abc import Callable, Iterable, Sequence
+from contextlib import contextmanager
+import datetime as dt
 from functools import reduce, partial, wraps
 from itertools import starmap
 from operator import or_, and_, contains
+import os
+from pathlib import Path
 import re
+import tempfile
 from typing import Any, Optional, Pattern, Union, Iterator
 
+import dateutil.parser as dtp
+from dateutil.relativedelta import relativedelta
 import numpy as np
 import pandas as pd
 import pandas.api.types
 import requests
+from requests.adapters import HTTPAdapter
 from erfa import cal2jd, taitt, utctai, dtdb
 
 from lhorizon import config as config
 from lhorizon._type_aliases import Array
-from lhorizon.constants import J2000_TDB
+from lhorizon.constants import (
+    HORIZON_TIME_ABBREVIATIONS, J2000_JD, J2000_TDB, MJD_ZERO_JD,
+    UNIX_EPOCH_JD
+)
 from lhorizon.vendor.telnetlib import Telnet
 
 
@@ -113,6 +124,36 @@ LHORIZON_STRFTIME_MAPPING = {
 }
 
 
+# columns that can order rows of tables, in order of preference
+TIME_KEY_COLUMNS = ("jd_tdb", "jd", "time_tdb", "time")
+
+
+def time_key(table: pd.DataFrame) -> str:
+    """
+    name of the column that orders the rows of a table (e.g., in
+    `lhorizon.handlers.assemble_tables()`): its Julian date column or, if
+    it has none, its time column
+    """
+    for column in TIME_KEY_COLUMNS:
+        if (column in table.columns) and (table[column].dtype.kind in "fM"):
+            return column
+    raise ValueError(
+        "tables must have a Julian date or datetime time column to be "
+        "assembled."
+    )
+
+
+def key_times(table: pd.DataFrame, key: str) -> np.ndarray:
+    """
+    the values of a table's time key column as a NumPy array that orders
+    its rows. time zone-aware times are compared in UTC.
+    """
+    times = table[key]
+    if isinstance(times.dtype, pd.DatetimeTZDtype):
+        times = times.dt.tz_convert(None)
+    return times.to_numpy()
+
+
 def convert_horizons_date_spec_to_strftime(date_spec):
     for k, v in LHORIZON_STRFTIME_MAPPING.items():
         date_spec = re.sub(k, v, date_spec)
@@ -216,6 +257,112 @@ def utc_to_et(utc_time: Any):
     return (utc_to_tdb(utc_time) - J2000_TDB) / pd.Timedelta("1s")
 
 
+def jd_to_datetime64(jd: Union[float, Array]) -> np.ndarray:
+    """
+    convert Julian date(s) to numpy datetime64[us] (proleptic Gregorian, no
+    timescale conversion). unlike pandas Timestamps, these can represent any
+    time within ~290,000 years of 1970, including dates B.C.
+    """
+    microseconds = np.round(
+        (np.asarray(jd, dtype=np.float64) - UNIX_EPOCH_JD) * 86400e6
+    )
+    return microseconds.astype(np.int64).astype("datetime64[us]")
+
+
+def parse_horizons_time(time: str) -> dt.datetime:
+    """
+    parse a time in the form _Horizons_ accepts in epoch ranges -- a
+    calendar date, or a Julian date prefixed with "JD" -- as a datetime. no
+    timescale conversion is performed.
+    """
+    if time.strip().upper().startswith("JD"):
+        parsed = jd_to_datetime64(float(time.strip()[2:])).item()
+        # (numpy gives ints for times outside the range of datetimes)
+        if not isinstance(parsed, dt.datetime):
+            raise ValueError(f"{time} is outside the range of datetimes")
+        return parsed
+    return dtp.parse(time)
+
+
+# step sizes: a count followed by a unit, or a bare count of intervals
+STEP_SEARCH = re.compile(r"^\s*(\d+)\s*([a-z]*)\s*$", re.IGNORECASE)
+# step units whose length depends on the calendar
+CALENDAR_STEP_UNITS = {"mo": "months", "y": "years"}
+
+
+def parse_step(step: Union[int, str]) -> tuple[int, str]:
+    """
+    split a _Horizons_ step size into a count and a unit ("" for unitless
+    steps, i.e. a number of intervals)
+    """
+    match = STEP_SEARCH.match(str(step))
+    if match is not None:
+        count, unit = int(match[1]), match[2].lower()
+        if (count > 0) and (
+            unit in ("", *HORIZON_TIME_ABBREVIATIONS, *CALENDAR_STEP_UNITS)
+        ):
+            return count, unit
+    raise ValueError(f"can't interpret step size {step}")
+
+
+def naive_utc(time: dt.datetime) -> dt.datetime:
+    """drop time zones, which _Horizons_ doesn't accept, converting to UTC"""
+    if time.tzinfo is None:
+        return time
+    return time.astimezone(dt.UTC).replace(tzinfo=None)
+
+
+def step_grid(
+    start: dt.datetime, stop: dt.datetime, count: int, unit: str
+) -> tuple[Callable[[int], dt.datetime], int]:
+    """
+    the times _Horizons_ samples in a time range: returns a function giving
+    the time of the kth sample, and the index of the last sample. times are
+    computed from `start` (not accumulated step by step), so they are exact
+    to the microsecond.
+    """
+    if stop < start:
+        raise ValueError("stop time is earlier than start time")
+    if unit == "":
+        return (lambda k: start + (stop - start) * k / count), count
+    if unit in CALENDAR_STEP_UNITS:
+
+        def step_time(k):
+            delta = relativedelta(**{CALENDAR_STEP_UNITS[unit]: count * k})
+            return start + delta
+
+        months = (stop.year - start.year) * 12 + stop.month - start.month
+        last = months // (count * (12 if unit == "y" else 1))
+        while step_time(last) > stop:
+            last -= 1
+        return step_time, last
+    step = dt.timedelta(seconds=HORIZON_TIME_ABBREVIATIONS[unit] * count)
+    return (lambda k: start + step * k), (stop - start) // step
+
+
+def jd_utc_to_tdb(jd_utc: Union[float, Array]) -> np.ndarray:
+    """
+    convert Julian date(s) in UTC (like the 'jd' column of OBSERVER tables)
+    to TDB (the timescale of VECTORS tables). does not account for observer
+    position; see `utc_tdb_offset()`.
+    """
+    day_fraction = np.asarray(jd_utc, dtype=np.float64) - MJD_ZERO_JD
+    tai_1, tai_2 = utctai(MJD_ZERO_JD, day_fraction)
+    tt_1, tt_2 = taitt(tai_1, tai_2)
+    # as in utc_tdb_offset(), dtdb wants the day fraction in UT
+    delta = dtdb(tt_1, tt_2, np.mod(day_fraction, 1), 0, 0, 0)
+    return tt_1 + tt_2 + delta / 86400
+
+
+def jd_to_et(jd_tdb: Union[float, Array]) -> np.ndarray:
+    """
+    convert Julian date(s) in TDB (like the 'jd_tdb' column of VECTORS
+    tables) to ET, 'ephemeris time' -- absolute seconds since J2000 -- the
+    timescale preferred by SPICE.
+    """
+    return (np.asarray(jd_tdb, dtype=np.float64) - J2000_JD) * 86400
+
+
 def sph2cart(
     lat: Union[float, Array],
     lon: Union[float, Array],
@@ -306,14 +453,70 @@ def make_raveled_meshgrid(
     return pd.DataFrame(grids | indices)
 
 
-def default_lhorizon_session() -> requests.Session:
-    """returns a requests.Session object with default `lhorizon` options"""
+def default_lhorizon_session(
+    pool_size: Optional[int] = None
+) -> requests.Session:
+    """
+    returns a requests.Session object with default `lhorizon` options. if
+    pool_size is passed, the session keeps up to that many connections to
+    each host open, for use by that many threads.
+    """
     session = requests.Session()
     session.headers = config.DEFAULT_HEADERS
     session.stream = False
+    if pool_size is not None:
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
     return session
 
 
+def construct_response(
+    url: str,
+    content: bytes,
+    status_code: int = 200,
+    headers: Optional[dict] = None
+) -> requests.Response:
+    """
+    construct a requests.Response object from response content retrieved
+    from somewhere other than the network (e.g. a response cache)
+    """
+    response = requests.Response()
+    response._content = content
+    response.status_code = status_code
+    response.url = url
+    response.encoding = "utf-8"
+    if headers is not None:
+        response.headers.update(headers)
+    return response
+
+
+@contextmanager
+def atomic_path(path: Union[str, Path]) -> Iterator[Path]:
+    """
+    context manager giving a temporary path in the same directory as
+    `path`. once the with block completes, the file written there is moved
+    to `path`; if the block fails, it is deleted. readers of `path` never
+    see partially-written files.
+    """
+    descriptor, temp_path = tempfile.mkstemp(dir=Path(path).parent)
+    os.close(descriptor)
+    try:
+        yield Path(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_atomically(path: Union[str, Path], content: bytes):
+    """write `content` to `path` by way of `atomic_path()`"""
+    with atomic_path(path) as temp_path:
+        temp_path.write_bytes(content)
+
+
 def open_noninteractive_jpl_telnet_connection() -> Telnet:
     jpl = Telnet()
     jpl.open("ssd.jpl.nasa.gov", 6775)
@@ -0,0 +1,163 @@
+"""
+request pacing and retry policy for bulk queries to JPL Horizons. a
+`RateLimiter` is a token bucket that can be shared by several bulk jobs (in
+threads or in an event loop) in one process, so that their combined request
+rate stays polite. the functions in this module decide whether and how long
+to wait before retrying a rejected request.
+"""
+import asyncio
+import email.utils
+import datetime as dt
+import math
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+
+from lhorizon._response_parsers import (
+    HorizonsReturnedError,
+    horizons_error_message,
+)
+
+# HTTP status codes that indicate a transient condition -- request timeout,
+# throttling, or server trouble -- rather than a problem with the request
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """
+    thread-safe token-bucket rate limiter. permits an average of `rate`
+    requests per second, with bursts of up to `burst` requests. `rate` may be
+    `math.inf`, in which case the limiter only enforces pauses requested via
+    `defer()`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._deferred_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        take a token, returning the number of seconds the caller must wait
+        before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if not math.isinf(self.rate):
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = -self._tokens / self.rate
+            return max(wait, self._deferred_until - now)
+
+    def acquire(self):
+        """block until a request is permitted"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """asynchronous version of acquire()"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def defer(self, seconds: float):
+        """
+        permit no requests for the next `seconds` seconds. used to make all
+        jobs sharing this limiter back off when _Horizons_ is throttling.
+        """
+        with self._lock:
+            self._deferred_until = max(
+                self._deferred_until, time.monotonic() + seconds
+            )
+
+
+def make_rate_limiter(
+    delay_between: float, rate_limiter: Optional[RateLimiter] = None
+) -> RateLimiter:
+    """
+    return `rate_limiter` if it is passed; otherwise, make a new RateLimiter
+    that permits one request every `delay_between` seconds.
+    """
+    if rate_limiter is not None:
+        return rate_limiter
+    if delay_between > 0:
+        return RateLimiter(1 / delay_between)
+    return RateLimiter(math.inf)
+
+
+def backoff_delay(
+    retries: int, base: float, cap: float = 300, jitter: float = 0.5
+) -> float:
+    """
+    exponential backoff: `base` * 2 ** `retries` seconds, capped at `cap`,
+    increased by a random factor of up to `jitter` so that clients that
+    failed together do not retry together.
+    """
+    return min(cap, base * 2 ** retries) * (1 + random.uniform(0, jitter))
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """
+    number of seconds requested by a response's Retry-After header, or None
+    if it has no (parseable) Retry-After header
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_time = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_time - dt.datetime.now(dt.UTC)).total_seconds(), 0)
+
+
+def check_retryable(response: requests.Response):
+    """
+    raise a HorizonsReturnedError if a rejected request should not be
+    retried -- i.e., if the rejection was caused by the request itself (bad
+    command, unknown target, etc.) rather than a transient condition.
+    """
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        return
+    message = horizons_error_message(response.text)
+    # plain-text (format=text) responses carry the message as their body
+    if (message is None) and ("format=text" in str(response.url)):
+        message = response.text.strip() or None
+    if message is None:
+        message = f"request rejected with status {response.status_code}"
+    raise HorizonsReturnedError(message)
+
+
+def retry_delay(
+    response: Optional[requests.Response],
+    retries: int,
+    base: float,
+    cap: float = 300,
+) -> float:
+    """
+    seconds to wait before retrying a request: the larger of a backoff delay
+    and any delay requested by the response's Retry-After header
+    """
+    delay = backoff_delay(retries, base, cap)
+    if response is not None:
+        delay = max(delay, retry_after_seconds(response) or 0)
+    return delay
@@ -0,0 +1,155 @@
+"""
+binary SPK files for small bodies, generated by JPL Horizons. rather than
+querying Horizons for vectors at every epoch of interest, `SmallBodySPK`
+asks it once for an SPK file covering a span of time, keeps the file on
+disk, and evaluates it locally with SPICE.
+"""
+import base64
+import datetime as dt
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+import requests
+import spiceypy as spice
+
+from lhorizon import config
+from lhorizon._response_parsers import (
+    HorizonsReturnedError,
+    horizons_error_message,
+)
+from lhorizon._type_aliases import Array
+from lhorizon.cache import cache_key
+from lhorizon.interpolation import tdb_jd
+from lhorizon.lhorizon_utils import (
+    default_lhorizon_session,
+    jd_to_et,
+    write_atomically,
+)
+from lhorizon.spk import state_columns
+
+
+class SmallBodySPK:
+    """
+    SPK file for a small body (asteroid or comet) over a span of time,
+    generated by JPL Horizons (EPHEM_TYPE=SPK) and cached in a local
+    directory. `fetch()` requests the file if it is not already cached;
+    `load()` also loads it into SPICE, after which `table()` evaluates the
+    body's state at any epochs in the span without further traffic to
+    JPL Horizons. Horizons' small-body SPK files give heliocentric states;
+    other centers require other kernels (e.g. a planetary ephemeris) to be
+    loaded too.
+
+    once loaded, the file also serves `lhorizon.spk.SpiceBackend`, for
+    VECTORS LHorizons that name the body by its SPK ID (see `body`).
+
+    ### parameters
+    #### target: str
+    the small body, in Horizons' COMMAND syntax for small bodies, e.g.
+    "DES=2000433;" or "433;" (Eros) or "DES=1P;" (Halley).
+    #### start: Union[str, dt.datetime]
+    start of the span (TDB)
+    #### stop: Union[str, dt.datetime]
+    end of the span (TDB)
+    #### directory: Union[str, Path]
+    directory in which to cache SPK files. created if it does not exist.
+    #### session: Optional[requests.Session] = None
+    session used to request the file. a new session is generated if one is
+    not passed.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        start: Union[str, dt.datetime],
+        stop: Union[str, dt.datetime],
+        directory: Union[str, Path],
+        session: Optional[requests.Session] = None,
+    ):
+        self.target = target
+        self.start, self.stop = (
+            t.isoformat() if isinstance(t, dt.datetime) else t
+            for t in (start, stop)
+        )
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if session is None:
+            session = default_lhorizon_session()
+        self.session = session
+        self.request = session.prepare_request(
+            requests.Request(
+                "GET",
+                config.HORIZONS_SERVER,
+                params={
+                    "format": "json",
+                    "EPHEM_TYPE": "SPK",
+                    "OBJ_DATA": "NO",
+                    "COMMAND": f"'{target}'",
+                    "START_TIME": f"'{self.start}'",
+                    "STOP_TIME": f"'{self.stop}'",
+                },
+            )
+        )
+        self.path = self.directory / f"{cache_key(self.request.url)}.bsp"
+        self.body = None
+
+    def fetch(self, refetch: bool = False) -> Path:
+        """
+        request the SPK file from JPL Horizons, unless it is already cached
+        (or `refetch` is True). returns its path. raises a
+        HorizonsReturnedError if Horizons does not return an SPK file.
+        """
+        if self.path.exists() and (refetch is False):
+            return self.path
+        response = self.session.send(self.request, timeout=config.TIMEOUT)
+        response.raise_for_status()
+        message = horizons_error_message(response.text)
+        if message is not None:
+            raise HorizonsReturnedError(message)
+        body = json.loads(response.text)
+        if "spk" not in body:
+            raise HorizonsReturnedError(
+                f"JPL Horizons did not return an SPK file for {self.target}: "
+                f"{body.get('result', '')}"
+            )
+        write_atomically(self.path, base64.b64decode(body["spk"]))
+        return self.path
+
+    def load(self):
+        """fetch the SPK file if necessary and load it into SPICE"""
+        self.fetch()
+        spice.furnsh(str(self.path))
+        bodies = list(spice.spkobj(str(self.path)))
+        if len(bodies) != 1:
+            raise ValueError(f"{self.path} covers {len(bodies)} bodies")
+        self.body = int(bodies[0])
+
+    def unload(self):
+        """unload the SPK file from SPICE"""
+        spice.unload(str(self.path))
+        self.body = None
+
+    def table(
+        self,
+        epochs: Union[float, Array],
+        center: int = 10,
+        frame: str = "ECLIPJ2000",
+        abcorr: str = "NONE",
+    ) -> pd.DataFrame:
+        """
+        the body's states at `epochs` (Julian dates or datetimes in TDB)
+        relative to `center` (a NAIF ID), in a table like a VECTORS table
+        with a 'jd_tdb' column. `frame` and `abcorr` are as for
+        `spiceypy.spkezr()`. loads the file first if it is not loaded.
+        raises a SpiceyError for epochs outside the span.
+        """
+        if self.body is None:
+            self.load()
+        jd_tdb = tdb_jd(epochs)
+        states, light_times = spice.spkezr(
+            str(self.body), jd_to_et(jd_tdb), frame, abcorr, str(center)
+        )
+        return pd.DataFrame(
+            {"jd_tdb": jd_tdb} | state_columns(states, light_times)
+        )
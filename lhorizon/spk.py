@@ -0,0 +1,296 @@
+"""
+VECTORS ephemerides and SPICE SPK kernels. `write_spk()` turns the tables
+of VECTORS LHorizons into type 13 (Hermite interpolation over
+unequally-spaced states) segments, so that SPICE can evaluate them --
+e.g. by `spiceypy.spkpos()` after `spiceypy.furnsh()` -- in place of the
+tables themselves. conversely, `SpiceBackend` answers VECTORS LHorizons'
+requests from loaded kernels, without querying JPL Horizons.
+"""
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+import re
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import spiceypy as spice
+
+from lhorizon import LHorizon
+from lhorizon.constants import J2000_JD, J2000_TDB, TABLE_COLUMN_QUANTITIES
+from lhorizon.interpolation import vectors_arrays
+from lhorizon.lhorizon_utils import (
+    jd_to_et,
+    naive_utc,
+    parse_horizons_time,
+    parse_step,
+    step_grid,
+)
+
+# SPICE frames equivalent to Horizons' REF_PLANE and REF_SYSTEM. SPICE
+# treats its J2000 frame as the ICRF, as Horizons does.
+SPK_FRAMES = {
+    ("FRAME", "ICRF"): "J2000",
+    ("FRAME", "J2000"): "J2000",
+    ("FRAME", "B1950"): "B1950",
+    ("ECLIPTIC", "ICRF"): "ECLIPJ2000",
+    ("ECLIPTIC", "J2000"): "ECLIPJ2000",
+    ("ECLIPTIC", "B1950"): "ECLIPB1950",
+}
+# body centers, optionally written with Horizons' body-center site code
+CENTER_SEARCH = re.compile(r"^(?:500)?@(-?\d+)$")
+# SPICE aberration corrections equivalent to Horizons' VEC_CORR
+SPICE_ABCORR = {"NONE": "NONE", "LT": "LT", "LT+S": "LT+S"}
+# (P)osition, (V)elocity, and (L)ight-time / range / range-rate groups of
+# each VEC_TABLE code (see TABLE_COLUMN_QUANTITIES)
+VEC_TABLE_GROUPS = {1: "P", 2: "PV", 3: "PVL", 4: "PL", 5: "V", 6: "L"}
+
+
+def _request_params(lhorizon: LHorizon) -> dict[str, str]:
+    """parameters of a LHorizon's prepared request, unquoted"""
+    query = parse_qs(urlparse(lhorizon.request.url).query)
+    return {key: value[0].strip("'\"") for key, value in query.items()}
+
+
+def _segment_parameters(
+    params: dict[str, str],
+    body: Optional[int],
+    center: Optional[int],
+    frame: Optional[str],
+) -> dict:
+    """
+    body, center, and frame of a request's vectors, where not passed.
+    see `spk_segment_parameters()`.
+    """
+    if frame is None:
+        frame = SPK_FRAMES.get((params["REF_PLANE"], params["REF_SYSTEM"]))
+        if frame is None:
+            raise ValueError(
+                f"no SPICE frame matches REF_PLANE {params['REF_PLANE']} "
+                f"and REF_SYSTEM {params['REF_SYSTEM']}"
+            )
+    if center is None:
+        match = CENTER_SEARCH.match(params.get("CENTER", ""))
+        if match is None:
+            raise ValueError(
+                "SPK segments require a body center (like '500@399') as "
+                "origin"
+            )
+        center = int(match.group(1))
+    if body is None:
+        if re.match(r"^-?\d+$", params["COMMAND"]) is None:
+            raise ValueError(
+                f"target {params['COMMAND']} is not a NAIF ID; pass one as "
+                f"`body`"
+            )
+        body = int(params["COMMAND"])
+    return {"body": body, "center": center, "frame": frame}
+
+
+def spk_segment_parameters(
+    lhorizon: LHorizon,
+    body: Optional[int] = None,
+    center: Optional[int] = None,
+    frame: Optional[str] = None,
+) -> dict:
+    """
+    infer the NAIF IDs of the target ('body') and center and the name of
+    the SPICE frame of a VECTORS LHorizon from its request, except for any
+    that are passed. raises a ValueError if the request cannot be
+    represented in an SPK segment: if it is not for geometric (uncorrected)
+    vectors, or if a parameter that must be inferred cannot be -- the
+    origin is a site rather than a body center, or the target is not named
+    by NAIF ID.
+    """
+    if lhorizon.query_type != "VECTORS":
+        raise ValueError("only VECTORS queries can be written to SPK files")
+    params = _request_params(lhorizon)
+    if params["VEC_CORR"] != "NONE":
+        raise ValueError(
+            "only geometric vectors (vec_corr='NONE') can be written to SPK "
+            "files"
+        )
+    return _segment_parameters(params, body, center, frame)
+
+
+def write_spk(
+    path: Union[str, Path],
+    lhorizons: Union[LHorizon, Sequence[LHorizon]],
+    degree: int = 7,
+    body: Optional[int] = None,
+    center: Optional[int] = None,
+    frame: Optional[str] = None,
+):
+    """
+    write the tables of one or more VECTORS LHorizons (querying them if
+    they have not been queried) to a new SPK file at `path`, one type 13
+    segment per LHorizon. where LHorizons' coverage overlaps, SPICE uses
+    the later segment. tables must include velocities (the default
+    vec_table=3 does).
+
+    `body`, `center`, and `frame` override the NAIF IDs of the target and
+    center and the name of the frame inferred from each request by
+    `spk_segment_parameters()`; `body` is required for targets not named by
+    NAIF ID (e.g. small bodies named by designation). `degree` is the
+    (odd) degree of the Hermite polynomials SPICE will interpolate with;
+    segments with too few states for it use lower degrees.
+    """
+    if isinstance(lhorizons, LHorizon):
+        lhorizons = [lhorizons]
+    if len(lhorizons) == 0:
+        raise ValueError("at least one LHorizon is required")
+    if degree % 2 == 0:
+        raise ValueError("type 13 segments require odd degrees")
+    if Path(path).exists():
+        raise FileExistsError(f"{path} already exists")
+    segments = [
+        spk_segment_parameters(lhorizon, body, center, frame)
+        for lhorizon in lhorizons
+    ]
+    handle = spice.spkopn(str(path), "lhorizon", 0)
+    try:
+        for lhorizon, segment in zip(lhorizons, segments):
+            et, position, velocity = vectors_arrays(lhorizon.table())
+            # SPK states are in km and km/s
+            states = np.hstack([position, velocity]) / 1000
+            spice.spkw13(
+                handle,
+                segment["body"],
+                segment["center"],
+                segment["frame"],
+                et[0],
+                et[-1],
+                f"lhorizon {segment['body']}"[:40],
+                min(degree, 2 * len(et) - 1),
+                len(et),
+                np.ascontiguousarray(states),
+                et,
+            )
+    except Exception:
+        # spkcls() refuses to close files without segments
+        spice.dafcls(handle)
+        Path(path).unlink()
+        raise
+    spice.spkcls(handle)
+
+
+def state_columns(
+    states: Sequence, light_times: Sequence
+) -> dict[str, np.ndarray]:
+    """
+    the columns of a full VECTORS table (x, y, z, vx, vy, vz, light_time,
+    dist, and velocity, in m, m/s, and s) from states in km and km/s and
+    one-way light times, as returned by `spiceypy.spkezr()`
+    """
+    states = np.atleast_2d(np.array(states)) * 1000
+    position, velocity = states[:, :3], states[:, 3:]
+    dist = np.linalg.norm(position, axis=1)
+    return {
+        "x": position[:, 0],
+        "y": position[:, 1],
+        "z": position[:, 2],
+        "vx": velocity[:, 0],
+        "vy": velocity[:, 1],
+        "vz": velocity[:, 2],
+        "light_time": np.atleast_1d(np.array(light_times)),
+        "dist": dist,
+        "velocity": (position * velocity).sum(axis=1) / dist,
+    }
+
+
+def _sample_times(lhorizon: LHorizon) -> tuple[np.ndarray, np.ndarray]:
+    """
+    the times at which JPL Horizons would sample a VECTORS LHorizon's
+    epochs, which it reads as TDB: as ET, and as Julian dates
+    """
+    epochs = lhorizon.epochs
+    if not isinstance(epochs, Mapping):
+        jd_tdb = np.atleast_1d(np.asarray(epochs, dtype=np.float64))
+        return jd_to_et(jd_tdb), jd_tdb
+    count, unit = parse_step(epochs["step"])
+    step_time, last = step_grid(
+        naive_utc(parse_horizons_time(str(epochs["start"]))),
+        naive_utc(parse_horizons_time(str(epochs["stop"]))),
+        count,
+        unit,
+    )
+    times = np.array([step_time(k) for k in range(last + 1)], dtype="M8[us]")
+    et = (times - np.datetime64(J2000_TDB, "us")) / np.timedelta64(1, "s")
+    return et, J2000_JD + et / 86400
+
+
+class SpiceBackend:
+    """
+    local source of VECTORS tables: computes the table() of a VECTORS
+    LHorizon from loaded SPICE kernels rather than querying JPL Horizons.
+    pass one to a LHorizon as `backend`. LHorizons with backends try them
+    first, and fall back to querying JPL Horizons if the backend cannot
+    answer -- if the request is not a VECTORS request this class supports,
+    or if the loaded kernels do not cover its target, center, and times.
+
+    supported requests name their target by NAIF ID, have a body center
+    as origin, and use vec_corr "NONE", "LT", or "LT+S" and the ECLIPTIC
+    or FRAME reference plane. states are computed by `spiceypy.spkezr()`
+    over all of a request's sample times at once, and are only as accurate
+    as the kernels; with recent JPL planetary and satellite kernels, they
+    generally agree with JPL Horizons to within meters.
+
+    ### parameters
+    #### kernels: Sequence[Union[str, Path]] = ()
+    kernels to load with `spiceypy.furnsh()`. kernels loaded by other means
+    (e.g. `lhorizon.kernels.load_metakernel()`) are used too.
+    """
+
+    def __init__(self, kernels: Sequence[Union[str, Path]] = ()):
+        for kernel in kernels:
+            spice.furnsh(str(kernel))
+
+    def table(self, lhorizon: LHorizon) -> Optional[pd.DataFrame]:
+        """
+        the table() of a VECTORS LHorizon, or None if this backend cannot
+        produce it
+        """
+        if lhorizon.query_type != "VECTORS":
+            return None
+        params = _request_params(lhorizon)
+        abcorr = SPICE_ABCORR.get(params["VEC_CORR"].replace(" ", ""))
+        groups = VEC_TABLE_GROUPS.get(
+            int(params["VEC_TABLE"]) if params["VEC_TABLE"].isdigit() else 0
+        )
+        try:
+            segment = _segment_parameters(params, None, None, None)
+        except ValueError:
+            return None
+        if (abcorr is None) or (groups is None):
+            return None
+        try:
+            et, jd_tdb = _sample_times(lhorizon)
+        except (ValueError, OverflowError):
+            # epochs this class can't interpret; JPL Horizons may
+            return None
+        try:
+            states, light_times = spice.spkezr(
+                str(segment["body"]),
+                et,
+                segment["frame"],
+                abcorr,
+                str(segment["center"]),
+            )
+        except spice.stypes.SpiceyError:
+            # usually missing coverage
+            return None
+        columns = state_columns(states, light_times)
+        if lhorizon.time_format == "jd":
+            table = {"jd_tdb": jd_tdb}
+        else:
+            table = {
+                "time_tdb": np.datetime64(J2000_TDB, "us")
+                + np.round(et * 1e6).astype("m8[us]")
+            }
+        quantities = TABLE_COLUMN_QUANTITIES["VECTORS"]
+        table |= {
+            name: column
+            for name, column in columns.items()
+            if quantities[name] in groups
+        }
+        return pd.DataFrame(table)
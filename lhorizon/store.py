@@ -0,0 +1,309 @@
+"""
+a local store of ephemerides retrieved from JPL Horizons. `EphemerisStore`
+keeps the tables it fetches in Parquet files, grouped by query (target,
+origin, query type, options, and step), and records which stretches of
+time it holds for each query. a request for a time range fetches only the
+parts of the range the store does not already hold, so repeated or
+sliding-window queries become mostly local reads. requires `pyarrow`.
+"""
+from collections.abc import Mapping, Sequence
+import datetime as dt
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import dateutil.parser as dtp
+import numpy as np
+import pandas as pd
+
+from lhorizon.constants import HORIZON_TIME_ABBREVIATIONS, J2000_JD
+from lhorizon.handlers import (
+    assemble_tables,
+    construct_lhorizon_list,
+    query_all_lhorizons,
+)
+from lhorizon.lhorizon_utils import (
+    atomic_path,
+    key_times,
+    naive_utc,
+    parse_step,
+    time_key,
+    write_atomically,
+)
+
+# sample times of each stored query are counted in steps from the first
+# sample at or after this time
+GRID_REFERENCE = dt.datetime(2000, 1, 1)
+
+
+class SampleGrid:
+    """
+    the times _Horizons_ samples at a fixed step, numbered from the first
+    sample after GRID_REFERENCE. ranges with the same step whose start times
+    differ by a whole number of steps share a grid.
+    """
+
+    def __init__(self, epochs: Mapping):
+        count, unit = parse_step(epochs["step"])
+        # a year step is a calendar year, not a fixed number of seconds
+        if (unit not in HORIZON_TIME_ABBREVIATIONS) or (unit == "y"):
+            raise ValueError(
+                "only ranges with minute, hour, or day steps can be stored."
+            )
+        self.step_size = f"{count}{unit}"
+        self.step = dt.timedelta(
+            seconds=HORIZON_TIME_ABBREVIATIONS[unit] * count
+        )
+        start = naive_utc(dtp.parse(epochs["start"]))
+        stop = naive_utc(dtp.parse(epochs["stop"]))
+        if stop < start:
+            raise ValueError("stop time is earlier than start time")
+        self.anchor = GRID_REFERENCE + (start - GRID_REFERENCE) % self.step
+        self.first = (start - self.anchor) // self.step
+        self.last = (stop - self.anchor) // self.step
+
+    def time(self, sample: int) -> dt.datetime:
+        """time of a sample"""
+        return self.anchor + self.step * sample
+
+    def epochs(self, first: int, last: int) -> dict:
+        """range of samples `first` through `last`, in LHorizon format"""
+        return {
+            "start": self.time(first).isoformat(),
+            "stop": self.time(last).isoformat(),
+            "step": self.step_size,
+        }
+
+    def samples(self, table: pd.DataFrame) -> np.ndarray:
+        """numbers of the samples in the rows of a table"""
+        times = key_times(table, time_key(table))
+        if times.dtype.kind == "M":
+            anchor = np.datetime64(self.anchor, "us")
+            offsets = (times - anchor) / np.timedelta64(self.step)
+        else:
+            # Julian dates are in the same time scale as the request
+            anchor_jd = J2000_JD + (
+                self.anchor - dt.datetime(2000, 1, 1, 12)
+            ) / dt.timedelta(days=1)
+            offsets = (times - anchor_jd) / (self.step / dt.timedelta(days=1))
+        return np.round(offsets).astype(np.int64)
+
+
+def merge_intervals(intervals: Sequence[Sequence[int]]) -> list[list[int]]:
+    """merge overlapping or adjacent intervals of sample numbers"""
+    merged = []
+    for first, last in sorted(intervals):
+        if merged and (first <= merged[-1][1] + 1):
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+def subtract_intervals(
+    first: int, last: int, intervals: Sequence[Sequence[int]]
+) -> list[list[int]]:
+    """
+    the parts of the interval from `first` to `last` not covered by
+    `intervals` (merged, as returned by merge_intervals())
+    """
+    gaps = []
+    for held_first, held_last in intervals:
+        if held_last < first:
+            continue
+        if held_first > last:
+            break
+        if held_first > first:
+            gaps.append([first, held_first - 1])
+        first = held_last + 1
+    if first <= last:
+        gaps.append([first, last])
+    return gaps
+
+
+class EphemerisStore:
+    """
+    local, persistent store of ephemeris tables from JPL Horizons. each
+    distinct query -- target, origin, query type, query options, columns,
+    time format, and step (including its phase: ranges must start a whole
+    number of steps apart to share stored samples) -- gets a subdirectory,
+    named by a hash of its parameters, that holds a Parquet file for each
+    range fetched for it and an index recording the sample ranges it holds.
+
+    `table()` fetches only the parts of a requested range that are not
+    already held, stores them, and returns the requested range from the
+    store. only ranges with minute, hour, or day steps can be stored. the
+    store is not safe for concurrent writers.
+
+    ### parameters
+    #### directory: Union[str, Path]
+    root directory of the store. created if it does not exist.
+    #### chunksize: int = 85000
+    maximum number of lines per request, as in
+    `lhorizon.handlers.construct_lhorizon_list()`.
+    #### fetch_options: Optional[Mapping] = None
+    options for `lhorizon.handlers.query_all_lhorizons()` (e.g.
+    `delay_between` or `rate_limiter`), used when fetching.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        chunksize: int = 85000,
+        fetch_options: Optional[Mapping] = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunksize = chunksize
+        self.fetch_options = {} if fetch_options is None else fetch_options
+
+    def table(
+        self,
+        epochs: Mapping,
+        target: Union[int, str, Mapping] = "301",
+        origin: Union[int, str, Mapping] = "500@399",
+        query_type: str = "OBSERVER",
+        query_options: Optional[Mapping] = None,
+        columns: Optional[Sequence[str]] = None,
+        time_format: str = "calendar",
+    ) -> pd.DataFrame:
+        """
+        return a table (as produced by `LHorizon.table()`) for a range of
+        `epochs`, fetching from JPL Horizons only the parts of the range
+        this store does not already hold. other arguments are as for
+        `LHorizon`.
+        """
+        grid = SampleGrid(epochs)
+        query = self._query_parameters(
+            grid, target, origin, query_type, query_options, columns,
+            time_format
+        )
+        directory = self._query_directory(query)
+        index = self._read_index(directory)
+        for first, last in subtract_intervals(
+            grid.first, grid.last, index["intervals"]
+        ):
+            # a range with one sample would have no duration; fetch one
+            # extra sample (at worst, one we already hold)
+            lhorizons = construct_lhorizon_list(
+                grid.epochs(first, max(last, first + 1)),
+                target,
+                origin,
+                query_type=query_type,
+                query_options=query_options,
+                chunksize=self.chunksize,
+                time_format=time_format,
+                columns=columns,
+            )
+            query_all_lhorizons(lhorizons, **self.fetch_options)
+            self._write_part(
+                directory, index, grid, assemble_tables(lhorizons), first,
+                max(last, first + 1)
+            )
+        return self._read(directory, index, grid.first, grid.last)
+
+    def missing(
+        self,
+        epochs: Mapping,
+        target: Union[int, str, Mapping] = "301",
+        origin: Union[int, str, Mapping] = "500@399",
+        query_type: str = "OBSERVER",
+        query_options: Optional[Mapping] = None,
+        columns: Optional[Sequence[str]] = None,
+        time_format: str = "calendar",
+    ) -> list[dict]:
+        """
+        ranges that table() would fetch from JPL Horizons for the same
+        arguments, in LHorizon format
+        """
+        grid = SampleGrid(epochs)
+        query = self._query_parameters(
+            grid, target, origin, query_type, query_options, columns,
+            time_format
+        )
+        index = self._read_index(self._query_directory(query))
+        return [
+            grid.epochs(first, last)
+            for first, last in subtract_intervals(
+                grid.first, grid.last, index["intervals"]
+            )
+        ]
+
+    @staticmethod
+    def _query_parameters(
+        grid, target, origin, query_type, query_options, columns, time_format
+    ) -> dict:
+        """parameters that distinguish one stored query from another"""
+        return {
+            "target": target,
+            "origin": origin,
+            "query_type": query_type,
+            "query_options": {} if query_options is None else query_options,
+            "columns": None if columns is None else list(columns),
+            "time_format": time_format,
+            "step": grid.step_size,
+            "anchor": grid.anchor.isoformat(),
+        }
+
+    def _query_directory(self, query: dict) -> Path:
+        encoded = json.dumps(query, sort_keys=True, default=str)
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        directory = self.directory / digest
+        if not directory.exists():
+            directory.mkdir()
+            write_atomically(
+                directory / "_query.json", encoded.encode("utf-8")
+            )
+        return directory
+
+    @staticmethod
+    def _read_index(directory: Path) -> dict:
+        try:
+            return json.loads((directory / "_index.json").read_text())
+        except FileNotFoundError:
+            return {"intervals": [], "parts": {}}
+
+    @staticmethod
+    def _write_part(
+        directory: Path,
+        index: dict,
+        grid: SampleGrid,
+        table: pd.DataFrame,
+        first: int,
+        last: int,
+    ):
+        """store a fetched table covering samples `first` to `last`"""
+        table["sample"] = grid.samples(table)
+        name = f"part-{len(index['parts']):05d}.parquet"
+        with atomic_path(directory / name) as temp_path:
+            table.to_parquet(temp_path, index=False)
+        index["parts"][name] = [first, last]
+        index["intervals"] = merge_intervals(
+            index["intervals"] + [[first, last]]
+        )
+        write_atomically(
+            directory / "_index.json", json.dumps(index).encode("utf-8")
+        )
+
+    @staticmethod
+    def _read(
+        directory: Path, index: dict, first: int, last: int
+    ) -> pd.DataFrame:
+        """read samples `first` to `last` from the parts that hold them"""
+        parts = sorted(
+            (part_first, name)
+            for name, (part_first, part_last) in index["parts"].items()
+            if (part_first <= last) and (part_last >= first)
+        )
+        tables = (
+            pd.read_parquet(
+                directory / name,
+                filters=[("sample", ">=", first), ("sample", "<=", last)],
+            )
+            for _, name in parts
+        )
+        table = assemble_tables(tables, expected_rows=last - first + 1)
+        # (no parts means no columns)
+        return table.drop(columns="sample", errors="ignore")
+
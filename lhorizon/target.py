@@ -1,5 +1,7 @@
 from collections.abc import Callable, Mapping
-from typing import Optional, Union
+from copy import copy
+from types import MappingProxyType
+from typing import Any, Optional, Union
 import warnings
 
 import numpy as np
@@ -7,23 +9,54 @@ import pandas as pd
 
 from lhorizon import LHorizon
 from lhorizon._type_aliases import Ephemeris
-from lhorizon.lhorizon_utils import sph2cart, hats, utc_to_et
+from lhorizon.interpolation import HermiteEphemeris
+from lhorizon.lhorizon_utils import (
+    _cast_timeseries,
+    hats,
+    jd_utc_to_tdb,
+    sph2cart,
+    utc_to_et,
+    utc_to_jd,
+)
 from lhorizon.solutions import make_ray_sphere_lambdas
 from lhorizon.targeter_utils import array_reference_shift
 
 
+# columns of LHorizon tables used by Targeter
+TARGETER_COLUMNS = MappingProxyType(
+    {
+        "OBSERVER": (
+            "time",
+            "ra_app_icrf",
+            "dec_app_icrf",
+            "dist",
+            "geo_lon",
+            "geo_lat",
+            "geo_el",
+        ),
+        "VECTORS": ("time_tdb", "x", "y", "z"),
+    }
+)
+
+
 class Targeter:
     def __init__(
         self,
         target: Ephemeris,
         solutions: Mapping[str, Callable] = None,
         target_radius: Optional[float] = None,
+        epochs: Any = None,
     ):
         """
-        target: LHorizon instance or dataframe; if a dataframe, must
-            have columns named 'ra, dec, dist', 'az, alt, dist', or 'x, y, z'
-            if the LHorizon instance is an OBSERVER query, uses ra_app_icrf
-            and dec_app_icrf, if VECTORS, uses x/y/z
+        target: LHorizon instance, dataframe, or HermiteEphemeris; if a
+            dataframe, must have columns named 'ra, dec, dist',
+            'az, alt, dist', or 'x, y, z'. if the LHorizon instance is an
+            OBSERVER query, uses ra_app_icrf and dec_app_icrf, if VECTORS,
+            uses x/y/z. if the LHorizon has not yet been queried and has no
+            `columns` set, Targeter queries a copy of it that requests only
+            the columns Targeter uses (TARGETER_COLUMNS); the passed
+            LHorizon is not modified. if a HermiteEphemeris, interpolates it
+            at `epochs`.
 
         solutions: mapping of functions that each accept six args -- x1, y1,
             z1, x2, y2, z2 -- and return at least x, y, z position of an
@@ -35,6 +68,9 @@ class Targeter:
         target_radius: used only if no intersection solutions are
             passed; generates a system of ray-sphere intersection solutions for
             a target body of this radius.
+
+        epochs: UTC times at which to interpolate the target, if it is a
+            HermiteEphemeris; ignored otherwise.
         """
         self.solutions = self._check_solution_arguments(
             solutions, target_radius
@@ -45,9 +81,14 @@ class Targeter:
             self.ephemerides["body"]["time"] = target["time"]
         elif isinstance(target, LHorizon):
             self.ephemerides["body"] = self._coerce_lhorizon_cartesian(target)
+        elif isinstance(target, HermiteEphemeris):
+            self.ephemerides["body"] = self._interpolate_cartesian(
+                target, epochs
+            )
         else:
             raise ValueError(
-                "Targeter must be initialized with a dataframe or a lhorizon."
+                "Targeter must be initialized with a dataframe, a lhorizon, "
+                "or a HermiteEphemeris."
             )
 
     @staticmethod
@@ -78,6 +119,23 @@ class Targeter:
             "or 'x, y, z'"
         )
 
+    @staticmethod
+    def _interpolate_cartesian(
+        target: HermiteEphemeris, epochs: Any
+    ) -> pd.DataFrame:
+        """
+        produce a DataFrame of cartesian coordinates by interpolating a
+        HermiteEphemeris at UTC epochs
+        """
+        if epochs is None:
+            raise ValueError(
+                "epochs are required to use a HermiteEphemeris as a target."
+            )
+        times = pd.Series(_cast_timeseries(epochs))
+        table = target.table(jd_utc_to_tdb(utc_to_jd(times)))
+        table["time"] = times
+        return table
+
     @staticmethod
     def _check_solution_arguments(
         solutions: Optional[Mapping[Callable]], target_radius: Optional[float]
@@ -99,6 +157,15 @@ class Targeter:
     @staticmethod
     def _coerce_lhorizon_cartesian(target: LHorizon) -> pd.DataFrame:
         """produce a DataFrame of cartesian coordinates from a LHorizon"""
+        if (
+            (target.columns is None)
+            and (target.query_type in TARGETER_COLUMNS)
+            and not target.check_queried()
+        ):
+            # query a copy, leaving the caller's LHorizon as it was
+            target = copy(target)
+            target.columns = TARGETER_COLUMNS[target.query_type]
+            target.prepare_request()
         table = target.table()
         if target.query_type == "VECTORS":
             return table
@@ -0,0 +1,109 @@
+"""
+tests for lhorizon.aio, using a local HTTP server that serves cached
+responses from _Horizons_
+"""
+
+import asyncio
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import web
+
+import lhorizon.config
+from lhorizon import LHorizon
+from lhorizon.aio import aquery_all_lhorizons
+from lhorizon.tests.data.test_cases import TEST_CASES
+from lhorizon.tests.utilz import check_numeric_closeness, raise_badness
+
+CASE = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+
+
+async def serve_and_run(coroutine_function, failures=0, delay=0.0):
+    """
+    start a local server that mimics Horizons, responding with 503 to the
+    first `failures` requests it receives, and run `coroutine_function`
+    against it. returns server statistics.
+    """
+    with open(CASE["data_path"] + "_OBSERVER", "rb") as file:
+        content = file.read()
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def respond(_request):
+        stats["requests"] += 1
+        ordinal = stats["requests"]
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(
+            stats["max_in_flight"], stats["in_flight"]
+        )
+        await asyncio.sleep(delay)
+        stats["in_flight"] -= 1
+        if ordinal <= failures:
+            return web.Response(status=503)
+        return web.Response(body=content)
+
+    app = web.Application()
+    app.router.add_get("/api/horizons.api", respond)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        await coroutine_function(f"http://127.0.0.1:{port}/api/horizons.api")
+    finally:
+        await runner.cleanup()
+    return stats
+
+
+def test_aquery(monkeypatch):
+    """aquery() should produce the same table as query() would"""
+    lhorizons = []
+
+    async def run(server):
+        monkeypatch.setattr(lhorizon.config, "HORIZONS_SERVER", server)
+        lhorizons.append(LHorizon(**CASE["init_kwargs"]))
+        await lhorizons[0].aquery()
+
+    asyncio.run(serve_and_run(run))
+    assert lhorizons[0].check_queried()
+    saved_table = pd.read_csv(CASE["data_path"] + "_OBSERVER_table.csv")
+    raise_badness(check_numeric_closeness(lhorizons[0].table(), saved_table))
+
+
+def test_aquery_all_concurrency_and_retries(monkeypatch):
+    """
+    aquery_all_lhorizons() should keep several requests in flight, but no
+    more than max_concurrent, and should retry rejected requests.
+    """
+    lhorizons = []
+
+    async def run(server):
+        monkeypatch.setattr(lhorizon.config, "HORIZONS_SERVER", server)
+        for i in range(6):
+            kwargs = CASE["init_kwargs"] | {"epochs": 2451544.5 + i}
+            lhorizons.append(LHorizon(**kwargs))
+        await aquery_all_lhorizons(
+            lhorizons, max_concurrent=3, delay_retry=0.01, parse=True
+        )
+
+    stats = asyncio.run(serve_and_run(run, failures=2, delay=0.05))
+    assert stats["requests"] == 8
+    assert stats["max_in_flight"] == 3
+    assert all(lh.response.status_code == 200 for lh in lhorizons)
+    assert all(lh._table is not None for lh in lhorizons)
+
+
+def test_aquery_all_gives_up(monkeypatch):
+    """aquery_all_lhorizons() should give up after max_retries retries"""
+
+    async def run(server):
+        monkeypatch.setattr(lhorizon.config, "HORIZONS_SERVER", server)
+        await aquery_all_lhorizons(
+            [LHorizon()], delay_retry=0.01, max_retries=2
+        )
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(serve_and_run(run, failures=100))
@@ -0,0 +1,151 @@
+"""tests for lhorizon.cache, using locally-cached HTTP responses"""
+
+import time
+
+import pytest
+
+from lhorizon import LHorizon
+from lhorizon.cache import (
+    DiskResponseCache, ResponseCache, cache_key, normalize_url
+)
+from lhorizon.config import CACHE_RECENT_TTL, HORIZONS_SERVER
+from lhorizon.handlers import construct_lhorizon_list, query_all_lhorizons
+from lhorizon.tests.data.test_cases import TEST_CASES
+from lhorizon.tests.utilz import MockResponse, raise_badness, \
+    check_numeric_closeness
+
+
+def make_mock_send(test_case, calls, query_type_suffix="OBSERVER"):
+    """mock wrapper for requests.Session.send() that counts its calls"""
+
+    def mock_send(*args, **kwargs):
+        # works whether patched onto a Session instance or the class
+        request = args[-1]
+        calls.append(request.url)
+        with open(
+            test_case["data_path"] + "_" + query_type_suffix, "rb"
+        ) as file:
+            return MockResponse(content=file.read(), url=request.url)
+
+    return mock_send
+
+
+def test_url_normalization():
+    """parameter order and quoting style should not change the cache key"""
+    url_1 = f"{HORIZONS_SERVER}?COMMAND=%22301%22&CENTER=%27500%40399%27"
+    url_2 = f"{HORIZONS_SERVER}?CENTER='500@399'&COMMAND=\"301\""
+    assert normalize_url(url_1) == normalize_url(url_2)
+    assert cache_key(url_1) == cache_key(url_2)
+    assert cache_key(url_1) != cache_key(url_1.replace("301", "302"))
+
+
+def test_disk_cache_basics(tmp_path):
+    """round trip, ttl expiry, and counters"""
+    cache = DiskResponseCache(tmp_path)
+    assert cache.get("https://a?b=1") is None
+    cache.put("https://a?b=1", b"forever")
+    cache.put("https://a?b=2", b"fleeting", ttl=0.05)
+    assert cache.get("https://a?b=1") == b"forever"
+    assert cache.get("https://a?b=2") == b"fleeting"
+    time.sleep(0.1)
+    assert cache.get("https://a?b=2") is None
+    # a second object sharing the directory sees the same entries
+    assert DiskResponseCache(tmp_path).get("https://a?b=1") == b"forever"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 1)
+
+
+def test_incomplete_cache():
+    """caches that don't implement get() and put() can't be created"""
+
+    class GetOnlyCache(ResponseCache):
+        def get(self, url):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyCache()
+
+
+def test_disk_cache_lru_eviction(tmp_path):
+    """least-recently-used entries should be evicted to stay under max_size"""
+    cache = DiskResponseCache(tmp_path, max_size=25)
+    for ix in range(3):
+        cache.put(f"https://a?b={ix}", b"x" * 10)
+        time.sleep(0.01)
+    # 0 was evicted; touch 1, so that 2 is evicted next
+    assert cache.get("https://a?b=0") is None
+    assert cache.get("https://a?b=1") is not None
+    time.sleep(0.01)
+    cache.put("https://a?b=3", b"x" * 10)
+    assert cache.get("https://a?b=2") is None
+    assert cache.get("https://a?b=1") is not None
+    assert cache.stats()["size"] == 20
+
+
+def test_lhorizon_cache(mocker, tmp_path):
+    """
+    a second LHorizon with identical parameters should get its response
+    from the cache, and make an identical table from it.
+    """
+    case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    calls = []
+    cache = DiskResponseCache(tmp_path)
+    tables = []
+    for _ in range(2):
+        lhorizon = LHorizon(**case["init_kwargs"], cache=cache)
+        mocker.patch.object(
+            lhorizon.session, "send", make_mock_send(case, calls)
+        )
+        tables.append(lhorizon.table())
+    assert len(calls) == 1
+    assert lhorizon.from_cache is True
+    raise_badness(check_numeric_closeness(*tables))
+    lhorizon.query(refetch=True)
+    assert len(calls) == 2
+    assert lhorizon.from_cache is False
+
+
+def test_bulk_query_cache(mocker, tmp_path):
+    """query_all_lhorizons should not send or pause for cached responses"""
+    case = TEST_CASES["MARS_SUN_ANGLE_MINIMAL"]
+    calls = []
+    mock_send = make_mock_send(TEST_CASES["CERES_2000"], calls)
+    mocker.patch("requests.Session.send", mock_send)
+    cache = DiskResponseCache(tmp_path)
+    query_all_lhorizons(
+        construct_lhorizon_list(**case["init_kwargs"]),
+        delay_between=0,
+        cache=cache,
+    )
+    assert len(calls) == case["lhorizon_count"]
+    lhorizons = construct_lhorizon_list(**case["init_kwargs"], cache=cache)
+    start = time.time()
+    query_all_lhorizons(lhorizons)
+    assert time.time() - start < 1
+    assert len(calls) == case["lhorizon_count"]
+    assert all(lhorizon.from_cache for lhorizon in lhorizons)
+
+
+def test_cache_lifetimes(mocker, tmp_path):
+    """
+    responses for past times should be cached indefinitely, unless they lack
+    an ephemeris (e.g. error messages)
+    """
+    case = TEST_CASES["CERES_2000"]
+    cache = DiskResponseCache(tmp_path)
+    put = mocker.spy(cache, "put")
+    past = {"start": "JD 2451545", "stop": "JD 2451555", "step": "1d"}
+    lhorizon = LHorizon("Ceres", epochs=past, cache=cache)
+    mocker.patch.object(lhorizon.session, "send", make_mock_send(case, []))
+    lhorizon.query()
+    assert put.call_args.kwargs["ttl"] is None
+    lhorizon = LHorizon("Ceres", "@0", epochs=past, cache=cache)
+    mocker.patch.object(
+        lhorizon.session,
+        "send",
+        lambda request, **_: MockResponse(
+            content=b'{"error": "try again later"}', url=request.url
+        ),
+    )
+    lhorizon.query()
+    assert put.call_args.kwargs["ttl"] == CACHE_RECENT_TTL
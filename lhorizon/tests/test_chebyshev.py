@@ -0,0 +1,47 @@
+"""tests for lhorizon.chebyshev, using an analytic orbit"""
+
+import numpy as np
+import pytest
+
+from lhorizon.chebyshev import ChebyshevEphemeris
+from lhorizon.constants import J2000_JD
+from lhorizon.tests.utilz import circular_orbit, vectors_table
+
+
+def moon_like_orbit(jd_tdb):
+    """
+    positions and velocities (m, m/s) of a body on a slightly tilted monthly
+    circle around a point on a yearly circle
+    """
+    yearly = circular_orbit(jd_tdb, 1.496e11, 365.25)
+    monthly = circular_orbit(jd_tdb, 3.844e8, 27.32, tilt=0.05)
+    return yearly[0] + monthly[0], yearly[1] + monthly[1]
+
+
+def test_chebyshev_ephemeris(tmp_path):
+    # a month of 1-minute samples
+    jd_tdb = J2000_JD + np.arange(30 * 1440 + 1) / 1440
+    table = vectors_table(jd_tdb, *moon_like_orbit(jd_tdb))
+    fitted = ChebyshevEphemeris.fit(
+        table, tolerance=1, metadata={"target": "test"}
+    )
+    assert fitted.residuals.max() <= 1
+    path = tmp_path / "test.lhcheb"
+    fitted.save(path)
+    assert table.memory_usage(index=False).sum() / path.stat().st_size > 100
+    ephemeris = ChebyshevEphemeris.open(path)
+    assert isinstance(ephemeris.coefficients, np.memmap)
+    assert ephemeris.metadata == {"target": "test"}
+    assert np.array_equal(ephemeris.coefficients, fitted.coefficients)
+    epochs = J2000_JD + np.random.default_rng(0).uniform(0, 30, 10000)
+    position, velocity, error = ephemeris.evaluate(epochs)
+    true_position, true_velocity = moon_like_orbit(epochs)
+    assert np.linalg.norm(position - true_position, axis=1).max() < 1
+    assert np.abs(velocity - true_velocity).max() < 1e-3
+    assert (error <= 1).all()
+    assert len(ephemeris.table(epochs[:10])) == 10
+    with pytest.raises(ValueError):
+        ephemeris.evaluate(J2000_JD + 31)
+    # hourly samples cannot pin a 30-day orbit down to a micron at degree 3
+    with pytest.raises(ValueError):
+        ChebyshevEphemeris.fit(table.iloc[::60], tolerance=1e-6, degree=3)
@@ -3,21 +3,43 @@ tests for lhorizon.handlers, using both mocked responses and data retrieved
 live from the JPL Horizons CGI and telnet endpoints
 """
 
+import datetime as dt
+import json
 import time
 
+import dateutil.parser as dtp
+import numpy as np
 import pandas as pd
 import pytest
 
 from lhorizon import LHorizon
+from lhorizon._response_parsers import HorizonsReturnedError
 from lhorizon.handlers import (
     query_all_lhorizons,
+    query_lhorizons_threaded,
+    iter_lhorizon_tables,
+    iter_tables,
+    construct_tlist_lhorizons,
+    gather_tlist_tables,
+    plan_epoch_ranges,
+    construct_planned_lhorizons,
+    gather_planned_tables,
+    bisect_epochs,
+    plan_chunks,
+    write_table_dataset,
+    assemble_tables,
     construct_lhorizon_list,
     list_sites,
     list_majorbodies, get_observer_quantity_codes,
 )
+from lhorizon.lhorizon_utils import utc_to_jd
 from lhorizon.tests.data.test_cases import TEST_CASES
 from lhorizon.tests.utilz import (
-    check_numeric_closeness, make_mock_failing_query, raise_badness
+    check_numeric_closeness,
+    make_mock_failing_query,
+    make_mock_query_from_test_case,
+    raise_badness,
+    MockResponse,
 )
 
 CASES_TO_USE = [
@@ -63,6 +85,355 @@ def test_retry_request_behavior(mocker):
     raise ValueError("did not correctly halt on multiple retries")
 
 
+def test_unretryable_request_behavior(mocker):
+    """
+    query_all_lhorizons should fail immediately if Horizons rejects a query
+    because there is something wrong with it.
+    """
+
+    def bad_query(self, *args, **kwargs):
+        self.response = MockResponse(
+            content=b'{"error": "no TLIST values given"}', status_code=400
+        )
+
+    mocker.patch.object(LHorizon, "query", bad_query)
+    start = time.time()
+    with pytest.raises(HorizonsReturnedError):
+        query_all_lhorizons([LHorizon()], delay_retry=10)
+    assert time.time() - start < 1
+
+
+def test_threaded_query_behavior(mocker):
+    """
+    query_lhorizons_threaded should run queries concurrently, isolate
+    failures, and return results in input order.
+    """
+    in_flight, max_in_flight = [], []
+
+    def sometimes_bad_query(self, *args, **kwargs):
+        in_flight.append(self)
+        max_in_flight.append(len(in_flight))
+        time.sleep(0.05)
+        in_flight.remove(self)
+        if self.epochs == 2451547:
+            raise ConnectionError("the network is down")
+        if self.epochs == 2451548:
+            self.response = MockResponse(
+                content=b'{"error": "no TLIST values given"}',
+                status_code=400,
+            )
+            return
+        self.response = MockResponse(status_code=200)
+
+    mocker.patch.object(LHorizon, "query", sometimes_bad_query)
+    lhorizons = [LHorizon(epochs=2451545 + i) for i in range(8)]
+    results = query_lhorizons_threaded(
+        lhorizons, max_workers=4, delay_between=0
+    )
+    assert [result.lhorizon for result in results] == lhorizons
+    assert isinstance(results[2].error, ConnectionError)
+    assert isinstance(results[3].error, HorizonsReturnedError)
+    assert all(
+        result.error is None
+        for ix, result in enumerate(results) if ix not in (2, 3)
+    )
+    assert max(max_in_flight) == 4
+
+
+@pytest.mark.parametrize("parse_processes", (0, 2))
+def test_pipelined_tables(mocker, parse_processes):
+    """
+    iter_lhorizon_tables should yield the same tables LHorizon.table()
+    would, in order, while releasing responses as it goes.
+    """
+    case = TEST_CASES["MARS_SUN_ANGLE_MINIMAL"]
+    responses = (
+        "CERES_2000", "SUN_PHOBOS_1999", "CYDONIA_PALM_SPRINGS_1959_TOPO"
+    )
+
+    def mock_query(self, *args, **kwargs):
+        response_case = TEST_CASES[responses[lhorizons.index(self) % 3]]
+        make_mock_query_from_test_case(response_case)(self)
+
+    mocker.patch.object(LHorizon, "query", mock_query)
+    lhorizons = construct_lhorizon_list(**case["init_kwargs"])
+    tables = list(
+        iter_lhorizon_tables(
+            lhorizons, parse_processes=parse_processes, delay_between=0
+        )
+    )
+    assert len(tables) == case["lhorizon_count"]
+    assert all(lhorizon.response.text == "" for lhorizon in lhorizons)
+    for ix, table in enumerate(tables):
+        saved_table = pd.read_csv(
+            TEST_CASES[responses[ix % 3]]["data_path"]
+            + "_OBSERVER_table.csv"
+        )
+        assert np.allclose(table["dist"], saved_table["dist"])
+
+
+def test_streaming_tables(mocker, tmp_path):
+    """
+    iter_tables should lazily yield a table for each chunk of a time range,
+    and write_table_dataset should write them to a dataset.
+    """
+    pytest.importorskip("pyarrow")
+    case = TEST_CASES["MARS_SUN_ANGLE_MINIMAL"]
+    response_case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    mocker.patch.object(
+        LHorizon, "query", make_mock_query_from_test_case(response_case)
+    )
+    tables = iter_tables(
+        **case["init_kwargs"],
+        parse_processes=0,
+        max_pending=1,
+        delay_between=0
+    )
+    parquet_dir = tmp_path / "parquet"
+    paths = write_table_dataset(tables, parquet_dir)
+    assert len(paths) == case["lhorizon_count"]
+    dataset = pd.read_parquet(parquet_dir)
+    saved_table = pd.read_csv(
+        response_case["data_path"] + "_OBSERVER_table.csv"
+    )
+    assert len(dataset) == len(saved_table) * case["lhorizon_count"]
+    assert np.allclose(
+        dataset["dist"].iloc[: len(saved_table)], saved_table["dist"]
+    )
+    # appending after a part has been removed doesn't overwrite later parts
+    (parquet_dir / "part-00000.parquet").unlink()
+    appended = write_table_dataset([dataset.iloc[:10]], parquet_dir)
+    next_part = f"part-{case['lhorizon_count']:05d}.parquet"
+    assert appended == [parquet_dir / next_part]
+    # formats aren't mixed in one dataset
+    with pytest.raises(ValueError):
+        write_table_dataset([dataset.iloc[:10]], parquet_dir, "feather")
+    write_table_dataset([dataset.iloc[:10]], tmp_path / "feather", "feather")
+    assert (tmp_path / "feather" / "part-00000.feather").exists()
+
+
+def test_epoch_batch_planning(mocker):
+    """
+    construct_tlist_lhorizons() should pack distinct, sorted epochs into
+    URL-safe requests, and gather_tlist_tables() should put the results back
+    in the original order.
+    """
+    rng = np.random.default_rng()
+    epochs = np.round(2451545 + rng.random(1500) * 1000, 5)
+    epochs = np.concatenate([epochs, epochs[:100]])
+    rng.shuffle(epochs)
+    lhorizons = construct_tlist_lhorizons(epochs, query_type="VECTORS")
+    assert all(len(lhorizon.request.url) < 2000 for lhorizon in lhorizons)
+    queried = np.concatenate([lhorizon.epochs for lhorizon in lhorizons])
+    assert (queried == np.unique(epochs)).all()
+    mocker.patch.object(
+        LHorizon, "table", lambda self: pd.DataFrame({"jd": self.epochs})
+    )
+    table = gather_tlist_tables(lhorizons, epochs)
+    assert (table["jd"] == epochs).all()
+    with pytest.raises(ValueError, match="one for each distinct epoch"):
+        gather_tlist_tables(lhorizons[1:], epochs)
+    with pytest.raises(ValueError, match="no epochs"):
+        construct_tlist_lhorizons([])
+
+
+def test_epoch_range_planning(mocker):
+    """
+    plan_epoch_ranges() should cover regular runs of epochs with range
+    queries, bridging short gaps but not long ones, and leave irregular
+    epochs to explicit lists; gather_planned_tables() should then select
+    the requested epochs, in their original order.
+    """
+    step = 10 / 1440
+    cadence = 2451545 + np.arange(300) * step
+    # a short gap, bridged by the first range, then a long one
+    cadence = np.concatenate([cadence[:100], cadence[120:], cadence + 10])
+    rng = np.random.default_rng()
+    # off-grid epochs, well away from any grid point
+    offsets = rng.integers(0, 288, 10) + rng.uniform(0.2, 0.8, 10)
+    strays = 2451545 + offsets * step
+    epochs = np.concatenate([cadence, strays, cadence[:50]])
+    rng.shuffle(epochs)
+    plan = plan_epoch_ranges(epochs)
+    assert len(plan.ranges) == 2
+    assert plan.ranges[0].intervals == 299
+    assert len(plan.residual) == 10
+    lhorizons = construct_planned_lhorizons(plan)
+
+    def mock_table(self):
+        if isinstance(self.epochs, dict):
+            start, stop = (
+                float(self.epochs[key][3:]) for key in ("start", "stop")
+            )
+            jds = np.linspace(start, stop, int(self.epochs["step"]) + 1)
+            return pd.DataFrame({"jd": jds})
+        return pd.DataFrame({"jd": self.epochs})
+
+    mocker.patch.object(LHorizon, "table", mock_table)
+    table = gather_planned_tables(plan, lhorizons)
+    assert np.allclose(table["jd"], epochs, rtol=0, atol=1e-8)
+    # planned ranges can be split (e.g., if Horizons truncates a response)
+    # into halves that sample the same times
+    whole = plan.ranges[0]
+    first, second = bisect_epochs(whole.epochs())
+    assert int(first["step"]) + int(second["step"]) + 1 == whole.intervals
+    bounds = [
+        utc_to_jd(dtp.parse(half[key]))
+        for half in (first, second)
+        for key in ("start", "stop")
+    ]
+    assert np.allclose(
+        bounds,
+        [
+            whole.start,
+            whole.start + int(first["step"]) * step,
+            whole.start + (int(first["step"]) + 1) * step,
+            whole.stop,
+        ],
+        rtol=0,
+        atol=1e-8,
+    )
+
+
+def test_chunk_planning():
+    """
+    plan_chunks() should split time ranges into balanced chunks that sample
+    exactly the times the whole range would, for all kinds of steps.
+    """
+    # the last sample of the range falls on its stop time
+    chunks = plan_chunks(
+        {"start": "2000-01-01", "stop": "2000-01-11", "step": "1d"},
+        chunksize=4,
+    )
+    assert [(c["start"][:10], c["stop"][:10]) for c in chunks] == [
+        ("2000-01-01", "2000-01-03"),
+        ("2000-01-04", "2000-01-07"),
+        ("2000-01-08", "2000-01-11"),
+    ]
+    # calendar months, divided between three workers
+    chunks = plan_chunks(
+        {"start": "2000-01-15", "stop": "2003-01-01", "step": "1mo"},
+        n_chunks=3,
+    )
+    assert [c["start"][:10] for c in chunks] == [
+        "2000-01-15", "2001-01-15", "2002-01-15"
+    ]
+    assert chunks[-1]["stop"][:10] == "2002-12-15"
+    # unitless steps: 25 samples, in chunks of 8, 8, and 9
+    chunks = plan_chunks(
+        {"start": "2000-01-01", "stop": "2000-01-02", "step": "24"},
+        chunksize=10,
+    )
+    assert [c["step"] for c in chunks] == ["7", "7", "8"]
+    assert chunks[1]["start"] == "2000-01-01T08:00:00"
+    assert chunks[-1]["stop"] == "2000-01-02T00:00:00"
+    # n_chunks gives a multiple of n_chunks chunks
+    chunks = plan_chunks(
+        {"start": "2000-01-01", "stop": "2000-02-01", "step": "1h"},
+        chunksize=100,
+        n_chunks=4,
+    )
+    assert len(chunks) == 8
+    # months after the 28th don't stay on the grid
+    with pytest.raises(ValueError):
+        plan_chunks(
+            {"start": "2000-01-31", "stop": "2003-01-01", "step": "1mo"},
+            n_chunks=2,
+        )
+
+
+def test_table_assembly(mocker):
+    """
+    assemble_tables() should combine chunks into the table concatenating
+    them would make, without the rows where they overlap, releasing
+    responses as it goes; it should refuse chunks that are out of order.
+    """
+    case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    mocker.patch.object(
+        LHorizon, "query", make_mock_query_from_test_case(case)
+    )
+    table = LHorizon(**case["init_kwargs"]).table()
+    chunks = [
+        table.iloc[:20],
+        table.iloc[15:40].reset_index(drop=True),
+        table.iloc[40:],
+    ]
+    pd.testing.assert_frame_equal(assemble_tables(chunks), table)
+    with pytest.raises(ValueError):
+        assemble_tables(chunks[::-1])
+    # identical chunks overlap entirely. make the buffers grow, too.
+    lhorizons = [LHorizon(**case["init_kwargs"]) for _ in range(2)]
+    assembled = assemble_tables(iter(lhorizons), expected_rows=10)
+    pd.testing.assert_frame_equal(assembled, table)
+    assert all(lhorizon.response.content == b"" for lhorizon in lhorizons)
+    # time zone-aware time columns can't be buffered, but can still be keys
+    aware = table.drop(columns="jd").assign(
+        time=table["time"].dt.tz_localize("UTC")
+    )
+    aware_chunks = [aware.iloc[:20], aware.iloc[15:].reset_index(drop=True)]
+    pd.testing.assert_frame_equal(assemble_tables(aware_chunks), aware)
+
+
+def test_truncated_response_splitting(mocker):
+    """
+    the bulk query functions should split queries whose responses Horizons
+    truncated, down to pieces it will answer, and stitch their tables
+    together.
+    """
+    data_path = TEST_CASES["CERES_2000"]["data_path"] + "_VECTORS"
+    with open(data_path, "rb") as file:
+        content = file.read()
+    refusal = json.dumps(
+        {
+            "result": "Projected output length (~193) exceeds 90024 line "
+            "max -- change step-size"
+        }
+    ).encode()
+    answered = []
+
+    def picky_query(self, *args, **kwargs):
+        start, stop = (dtp.parse(self.epochs[k]) for k in ("start", "stop"))
+        if stop - start > dt.timedelta(days=2):
+            self.response = MockResponse(content=refusal)
+            return
+        answered.append((start, stop))
+        self.response = MockResponse(content=content)
+
+    mocker.patch.object(LHorizon, "query", picky_query)
+    epochs = {"start": "2000-01-01", "stop": "2000-01-09", "step": "1h"}
+    lhorizon = LHorizon(epochs=epochs, query_type="VECTORS")
+    query_all_lhorizons([lhorizon], delay_between=0)
+    # the pieces cover the range, without overlapping
+    assert len(answered) == 4
+    assert answered[0][0] == dtp.parse(epochs["start"])
+    assert answered[-1][1] == dtp.parse(epochs["stop"])
+    for previous, following in zip(answered, answered[1:]):
+        assert following[0] - previous[1] == dt.timedelta(hours=1)
+    rows = len(pd.read_csv(data_path + "_df.csv"))
+    assert len(lhorizon.dataframe()) == len(lhorizon.table()) == rows * 4
+    tables = list(
+        iter_lhorizon_tables(
+            [LHorizon(epochs=epochs, query_type="VECTORS")],
+            parse_processes=0,
+            delay_between=0,
+        )
+    )
+    assert len(tables) == 1
+    pd.testing.assert_frame_equal(tables[0], lhorizon.table())
+    with pytest.raises(HorizonsReturnedError):
+        query_all_lhorizons(
+            [LHorizon(epochs=epochs, query_type="VECTORS")],
+            delay_between=0,
+            max_splits=1,
+        )
+    # unitless steps are split into complementary numbers of intervals
+    first, second = bisect_epochs(
+        {"start": "2000-01-01", "stop": "2000-01-02", "step": "24"}
+    )
+    assert (first["stop"], first["step"]) == ("2000-01-01T11:00:00", "11")
+    assert (second["start"], second["step"]) == ("2000-01-01T12:00:00", "12")
+
+
 def test_list_sites():
     """
     simple test of the list_sites function. make sure the dataframe it
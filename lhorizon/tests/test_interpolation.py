@@ -0,0 +1,63 @@
+"""tests for lhorizon.interpolation, using an analytic orbit"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lhorizon.constants import J2000_JD
+from lhorizon.interpolation import HermiteEphemeris
+from lhorizon.tests.utilz import circular_orbit, vectors_table
+
+RADIUS = 1.5e11
+PERIOD = 365.25
+
+
+def orbit(jd_tdb):
+    """positions and velocities on a one-year circular orbit"""
+    return circular_orbit(jd_tdb, RADIUS, PERIOD)
+
+
+def orbit_table(jd_tdb):
+    return vectors_table(jd_tdb, *orbit(jd_tdb))
+
+
+def test_hermite_ephemeris():
+    ephemeris = HermiteEphemeris(orbit_table(J2000_JD + np.arange(60.0)))
+    epochs = J2000_JD + np.random.default_rng(0).uniform(0, 59, 10000)
+    position, velocity, error = ephemeris.evaluate(epochs)
+    true_position, true_velocity = orbit(epochs)
+    actual = np.linalg.norm(position - true_position, axis=1)
+    # daily samples of a one-year orbit are good to tens of meters...
+    assert actual.max() < 50
+    assert np.abs(velocity - true_velocity).max() < 0.01
+    # ...and the error estimate should know it
+    assert (actual < 1.1 * error + 1e-3).all()
+    assert np.median(error / actual) < 1.5
+    # samples are reproduced exactly, with no estimated error
+    samples = ephemeris.table(J2000_JD + np.arange(60.0))
+    assert np.allclose(
+        samples[["x", "y", "z"]].to_numpy(), ephemeris.position, atol=1e-3
+    )
+    assert (samples["error"] == 0).all()
+    with pytest.raises(ValueError):
+        ephemeris.evaluate(J2000_JD + 60.5)
+
+
+def test_hermite_ephemeris_targeter():
+    # lhorizon.target requires the optional sympy and spiceypy
+    pytest.importorskip("sympy")
+    pytest.importorskip("spiceypy")
+    from lhorizon.target import Targeter
+
+    ephemeris = HermiteEphemeris(orbit_table(J2000_JD + np.arange(10.0)))
+    times = pd.Series(pd.date_range("2000-01-03", "2000-01-04", freq="6h"))
+    targeter = Targeter(ephemeris, target_radius=1e9, epochs=times)
+    body = targeter.ephemerides["body"]
+    assert (body["time"] == times).all()
+    position, _ = orbit(body["jd_tdb"].to_numpy())
+    assert np.allclose(body[["x", "y", "z"]], position, rtol=0, atol=50)
+    # point straight at the body from the origin
+    targeter.find_targets(body[["x", "y", "z"]].copy())
+    assert targeter.ephemerides["topocentric"].notna().all().all()
+    with pytest.raises(ValueError):
+        Targeter(ephemeris, target_radius=1e9)
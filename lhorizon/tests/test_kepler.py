@@ -0,0 +1,201 @@
+"""
+tests for ELEMENTS tables and lhorizon.kepler, using a stand-in Horizons
+response
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lhorizon import LHorizon
+from lhorizon.constants import AU_TO_M, J2000_JD
+from lhorizon.kepler import propagate_elements, solve_kepler
+from lhorizon.tests.utilz import MockResponse
+
+# heliocentric ecliptic osculating elements of Ceres (au, days, deg),
+# as given in the preamble of Horizons' CERES_2000 responses
+CERES = {
+    "EC": 0.07687465013145245,
+    "QR": 2.556401146697176,
+    "TP": 2458240.1791309435,
+    "OM": 80.3011901917491,
+    "W": 73.80896808746482,
+    "IN": 10.59127767086216,
+}
+SUN_GM = 1.32712440041279419e11  # km3/s2
+ELEMENTS_COLUMNS = (
+    "JDTDB, Calendar Date (TDB), EC, QR, IN, OM, W, Tp, N, MA, TA, A, AD, PR,"
+)
+
+
+def stand_in_elements_response(jd_tdb):
+    """
+    a Horizons ELEMENTS response (in the default km-s units) giving CERES'
+    two-body elements at `jd_tdb`
+    """
+    a = CERES["QR"] * AU_TO_M / 1000 / (1 - CERES["EC"])
+    mean_motion = np.degrees(np.sqrt(SUN_GM / a ** 3))
+    rows = []
+    for jd in jd_tdb:
+        mean_anomaly = np.mod(mean_motion * (jd - CERES["TP"]) * 86400, 360)
+        eccentric = solve_kepler(np.radians(mean_anomaly), CERES["EC"])[0]
+        true_anomaly = np.mod(
+            np.degrees(
+                2 * np.arctan2(
+                    np.sqrt(1 + CERES["EC"]) * np.sin(eccentric / 2),
+                    np.sqrt(1 - CERES["EC"]) * np.cos(eccentric / 2),
+                )
+            ),
+            360,
+        )
+        calendar = (
+            pd.Timestamp("2000-01-01T12:00")
+            + pd.to_timedelta(jd - J2000_JD, unit="D")
+        ).strftime("%Y-%b-%d %H:%M:%S.0000")
+        values = (
+            CERES["EC"],
+            CERES["QR"] * AU_TO_M / 1000,
+            CERES["IN"],
+            CERES["OM"],
+            CERES["W"],
+            CERES["TP"],
+            mean_motion,
+            mean_anomaly,
+            true_anomaly,
+            a,
+            a * (1 + CERES["EC"]),
+            360 / mean_motion,
+        )
+        rows.append(
+            f"{jd:.9f}, A.D. {calendar}, "
+            + ", ".join(f"{value: .15E}" for value in values)
+            + ","
+        )
+    result = "\n".join(
+        [
+            "*" * 79,
+            ELEMENTS_COLUMNS,
+            "*" * 79,
+            "$$SOE",
+            *rows,
+            "$$EOE",
+            "*" * 79,
+        ]
+    )
+    return json.dumps(
+        {"signature": {"version": "1.2"}, "result": result}
+    ).encode("utf-8")
+
+
+def mock_elements_query(mocker, jd_tdb):
+    def mock_query(self, *args, **kwargs):
+        self.response = MockResponse(
+            content=stand_in_elements_response(jd_tdb)
+        )
+
+    mocker.patch.object(LHorizon, "query", mock_query)
+
+
+def test_elements_table(mocker):
+    mock_elements_query(mocker, [J2000_JD, J2000_JD + 10])
+    ceres = LHorizon(
+        "Ceres;",
+        "500@10",
+        epochs={"start": "2000-01-01T12:00", "stop": "2000-01-11T12:00",
+                "step": "10d"},
+        query_type="ELEMENTS",
+    )
+    assert "TABLE_TYPE=ELEMENTS" in ceres.request.url
+    table = ceres.table()
+    assert list(table.columns) == [
+        "time_tdb",
+        "ecc",
+        "periapsis_dist",
+        "inc",
+        "node",
+        "arg_periapsis",
+        "tp",
+        "mean_motion",
+        "mean_anomaly",
+        "true_anomaly",
+        "a",
+        "apoapsis_dist",
+        "period",
+    ]
+    assert table["time_tdb"].iloc[1] == pd.Timestamp("2000-01-11T12:00")
+    # distances are in m
+    assert np.allclose(table["periapsis_dist"], CERES["QR"] * AU_TO_M)
+    assert np.allclose(table["tp"], CERES["TP"])
+    jd_table = LHorizon(
+        "Ceres;", "500@10", epochs=J2000_JD, query_type="ELEMENTS",
+        time_format="jd", columns=["jd_tdb", "ecc", "a"]
+    ).table()
+    assert list(jd_table.columns) == ["jd_tdb", "ecc", "a"]
+    assert jd_table["jd_tdb"].iloc[0] == J2000_JD
+
+
+def test_solve_kepler():
+    rng = np.random.default_rng(0)
+    mean_anomaly = rng.uniform(-20, 20, 100000)
+    ecc = rng.uniform(0, 0.999, 100000)
+    eccentric = solve_kepler(mean_anomaly, ecc)
+    reduced = np.mod(mean_anomaly + np.pi, 2 * np.pi) - np.pi
+    assert np.allclose(
+        eccentric - ecc * np.sin(eccentric), reduced, rtol=0, atol=1e-12
+    )
+    ecc = rng.uniform(1.001, 10, 100000)
+    hyperbolic = solve_kepler(mean_anomaly * 10, ecc)
+    assert np.allclose(
+        ecc * np.sinh(hyperbolic) - hyperbolic,
+        mean_anomaly * 10,
+        rtol=0,
+        atol=1e-9,
+    )
+    with pytest.raises(ValueError):
+        solve_kepler(1, 1)
+
+
+def test_propagate_elements(mocker):
+    mock_elements_query(mocker, [J2000_JD])
+    elements = LHorizon(
+        "Ceres;", "500@10", epochs=J2000_JD, query_type="ELEMENTS"
+    ).table().iloc[0]
+    # a decade of hourly states from one set of elements
+    epochs = J2000_JD + np.arange(0, 3652.5, 1 / 24)
+    states = propagate_elements(elements, epochs)
+    assert len(states) == len(epochs)
+    position = states[["x", "y", "z"]].to_numpy()
+    velocity = states[["vx", "vy", "vz"]].to_numpy()
+    dist = np.linalg.norm(position, axis=1)
+    a = elements["a"]
+    # the orbit stays between periapsis and apoapsis...
+    assert dist.min() >= elements["periapsis_dist"] * (1 - 1e-12)
+    assert dist.max() <= elements["apoapsis_dist"] * (1 + 1e-12)
+    # ...conserves energy (vis-viva) and angular momentum...
+    gm = np.radians(elements["mean_motion"]) ** 2 * a ** 3
+    speed = np.linalg.norm(velocity, axis=1)
+    assert np.allclose(speed ** 2, gm * (2 / dist - 1 / a), rtol=1e-10)
+    momentum = np.cross(position, velocity)
+    assert np.allclose(momentum, momentum[0], rtol=1e-10)
+    # ...is inclined to the ecliptic as the elements say...
+    assert np.isclose(
+        np.degrees(np.arccos(momentum[0, 2] / np.linalg.norm(momentum[0]))),
+        CERES["IN"],
+    )
+    # ...and is at the given true anomaly at the elements' epoch
+    at_epoch = propagate_elements(elements, J2000_JD)
+    at_periapsis = propagate_elements(elements, elements["tp"])
+    periapsis = at_periapsis[["x", "y", "z"]].to_numpy()[0]
+    here = at_epoch[["x", "y", "z"]].to_numpy()[0]
+    angle = np.degrees(
+        np.arccos(
+            np.dot(here, periapsis)
+            / np.linalg.norm(here)
+            / np.linalg.norm(periapsis)
+        )
+    )
+    true_anomaly = elements["true_anomaly"]
+    assert np.isclose(angle, min(true_anomaly, 360 - true_anomaly))
+    assert np.isclose(np.linalg.norm(periapsis), elements["periapsis_dist"])
@@ -4,17 +4,23 @@ _Horizons_
 """
 
 import datetime as dt
+import json
 import re
 import warnings
 
 import pandas as pd
 import pytest
 
+import lhorizon.base
 from lhorizon import LHorizon
+from lhorizon._response_parsers import HorizonsReturnedError
 from lhorizon.lhorizon_utils import utc_to_jd
 from lhorizon.tests.data.test_cases import TEST_CASES
 from lhorizon.tests.utilz import (
-    check_numeric_closeness, make_mock_query_from_test_case, raise_badness
+    MockResponse,
+    check_numeric_closeness,
+    make_mock_query_from_test_case,
+    raise_badness,
 )
 
 
@@ -99,3 +105,120 @@ def test_make_table_1(mocker):
     table = test_lhorizon.table()
     saved_table = pd.read_csv(case["data_path"] + "_OBSERVER_table.csv")
     raise_badness(check_numeric_closeness(table, saved_table))
+
+
+def test_parse_memoization(mocker):
+    """
+    LHorizon should parse its response only once, and parse it again only
+    after its request or response changes.
+    """
+    case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    mocker.patch.object(
+        LHorizon, "query", make_mock_query_from_test_case(case)
+    )
+    parser = mocker.spy(lhorizon.base, "make_lhorizon_dataframe")
+    test_lhorizon = LHorizon(**case["init_kwargs"])
+    test_lhorizon.dataframe()
+    table = test_lhorizon.table()
+    # returned frames are copies; mutating them shouldn't affect the cache
+    table.drop(columns="time", inplace=True)
+    assert "time" in test_lhorizon.table().columns
+    assert parser.call_count == 1
+    test_lhorizon.prepare_request()
+    test_lhorizon.table()
+    assert parser.call_count == 2
+
+
+def test_release_response(mocker):
+    """
+    with release_response=True, LHorizon should drop response text once
+    parsed, and fetch it again only if it needs to parse it again.
+    """
+    case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    mock_query = mocker.Mock(wraps=make_mock_query_from_test_case(case))
+    mocker.patch.object(
+        LHorizon, "query", lambda self, *a, **k: mock_query(self, *a, **k)
+    )
+    test_lhorizon = LHorizon(**case["init_kwargs"], release_response=True)
+    table = test_lhorizon.table()
+    assert test_lhorizon.response.text == ""
+    test_lhorizon.table()
+    assert mock_query.call_count == 1
+    test_lhorizon.prepare_request()
+    raise_badness(check_numeric_closeness(table, test_lhorizon.table()))
+    assert mock_query.call_count == 2
+
+
+def test_text_response_format(mocker):
+    """
+    with response_format="text", LHorizon should request and parse plain
+    text, producing the same table as it would from JSON, and raise
+    HorizonsReturnedError if Horizons sends a message instead of data.
+    """
+    case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    with open(case["data_path"] + "_OBSERVER", "rb") as file:
+        text = json.loads(file.read())["result"].encode("utf-8")
+
+    def mock_query(self, *_args, **_kwargs):
+        self.response = MockResponse(content=text)
+
+    mocker.patch.object(LHorizon, "query", mock_query)
+    test_lhorizon = LHorizon(**case["init_kwargs"], response_format="text")
+    assert "format=text" in test_lhorizon.request.url
+    assert "format=" not in LHorizon(**case["init_kwargs"]).request.url
+    saved_table = pd.read_csv(case["data_path"] + "_OBSERVER_table.csv")
+    raise_badness(check_numeric_closeness(test_lhorizon.table(), saved_table))
+    text = b"Cannot interpret date. Type \"?!\" for help.\n"
+    test_lhorizon.query(refetch=True)
+    test_lhorizon.prepare_request()
+    with pytest.raises(HorizonsReturnedError, match="Cannot interpret"):
+        test_lhorizon.table()
+
+
+def test_jd_time_format(mocker):
+    """
+    with time_format="jd", LHorizon should request Julian dates and leave
+    them unparsed, without otherwise changing its tables.
+    """
+    case = TEST_CASES["CERES_2000"]
+    for query_type, time_column in (
+        ("OBSERVER", "jd"), ("VECTORS", "jd_tdb")
+    ):
+        mocker.patch.object(
+            LHorizon, "query", make_mock_query_from_test_case(case, query_type)
+        )
+        kwargs = case["init_kwargs"] | {"query_type": query_type}
+        test_lhorizon = LHorizon(**kwargs, time_format="jd")
+        if query_type == "OBSERVER":
+            assert "CAL_FORMAT=JD" in test_lhorizon.request.url
+        table = test_lhorizon.table()
+        assert table.columns[0] == time_column
+        assert table[time_column].dtype == "float64"
+        assert not {"time", "time_tdb"}.intersection(table.columns)
+        calendar_table = LHorizon(**kwargs).table()
+        calendar_columns = [
+            c for c in calendar_table.columns
+            if c not in ("time", "time_tdb", time_column)
+        ]
+        assert list(table.columns[1:]) == calendar_columns
+
+
+def test_column_projection(mocker):
+    """
+    an LHorizon with columns set should request only the quantities needed
+    to make those columns, and its table should contain only them.
+    """
+    columns = ["time", "ra_app_icrf", "dec_app_icrf", "dist"]
+    test_lhorizon = LHorizon(columns=columns)
+    assert "QUANTITIES=%2720%2C45%27" in test_lhorizon.request.url
+    assert "OBJ_DATA=NO" in test_lhorizon.request.url
+    vectors = LHorizon(query_type="VECTORS", columns=["time_tdb", "x", "z"])
+    assert "VEC_TABLE=%271%27" in vectors.request.url
+    with pytest.raises(ValueError, match="unknown OBSERVER"):
+        LHorizon(columns=["x"])
+    case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    mocker.patch.object(
+        LHorizon, "query", make_mock_query_from_test_case(case)
+    )
+    test_lhorizon = LHorizon(**case["init_kwargs"], columns=columns[::-1])
+    assert list(test_lhorizon.table().columns) == columns[::-1]
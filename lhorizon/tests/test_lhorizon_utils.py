@@ -5,15 +5,21 @@ import re
 
 import numpy as np
 import pandas as pd
+import pytest
 from more_itertools import chunked
 
 from lhorizon.lhorizon_utils import (
+    atomic_path,
+    write_atomically,
     hats,
     is_it,
     sph2cart,
     hunt_csv,
     snorm,
     listify, cart2sph,
+    jd_to_datetime64,
+    jd_to_et,
+    jd_utc_to_tdb,
 )
 
 rng = np.random.default_rng()
@@ -137,3 +143,27 @@ def test_listify():
     assert isinstance(listify(1), list)
     assert isinstance(listify(map(sum, [(1, 2, 3), (1, 2, 3)])), list)
 
+
+def test_jd_conversions():
+    """check JD conversion helpers against known epochs"""
+    assert jd_to_datetime64(2451545.0) == np.datetime64("2000-01-01T12:00")
+    # deep time: JD 0 is noon, 24 November 4714 BC (proleptic Gregorian)
+    assert jd_to_datetime64(0) == np.datetime64("-4713-11-24T12:00")
+    assert jd_to_et(2451545.0) == 0
+    # TDB - UTC was 32 s of leap seconds + 32.184 s at J2000
+    offset = (jd_utc_to_tdb(np.array([2451545.0])) - 2451545.0) * 86400
+    assert np.allclose(offset, 64.184, atol=0.002)
+
+
+def test_write_atomically(tmp_path):
+    """atomic writes replace files whole, and leave nothing if they fail"""
+    path = tmp_path / "file"
+    write_atomically(path, b"first")
+    write_atomically(path, b"second")
+    assert path.read_bytes() == b"second"
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as temp_path:
+            temp_path.write_bytes(b"partial")
+            raise RuntimeError
+    assert path.read_bytes() == b"second"
+    assert list(tmp_path.iterdir()) == [path]
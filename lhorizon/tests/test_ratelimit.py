@@ -0,0 +1,81 @@
+"""unit tests for lhorizon.ratelimit"""
+
+import asyncio
+import time
+
+import pytest
+
+from lhorizon._response_parsers import HorizonsReturnedError
+from lhorizon.ratelimit import (
+    RateLimiter,
+    backoff_delay,
+    check_retryable,
+    retry_after_seconds,
+    retry_delay,
+)
+from lhorizon.tests.utilz import MockResponse
+
+
+def test_token_bucket():
+    """
+    a limiter should permit a burst immediately, then pace requests at its
+    rate, whether they come from threads or coroutines.
+    """
+    limiter = RateLimiter(rate=20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.04
+    limiter.acquire()
+    asyncio.run(limiter.aacquire())
+    assert time.monotonic() - start > 0.09
+
+
+def test_defer():
+    """defer() should hold off all requests, even unlimited ones"""
+    limiter = RateLimiter(rate=float("inf"))
+    limiter.defer(0.1)
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start > 0.09
+
+
+def test_backoff():
+    """backoff delays should grow exponentially, with bounded jitter"""
+    for retries in range(5):
+        delay = backoff_delay(retries, 1, cap=10, jitter=0.5)
+        assert min(10, 2 ** retries) <= delay <= min(10, 2 ** retries) * 1.5
+
+
+def test_retry_after():
+    """Retry-After can be given in seconds or as an HTTP date"""
+    assert retry_after_seconds(MockResponse(headers={})) is None
+    response = MockResponse(headers={"Retry-After": "120"}, status_code=429)
+    assert retry_after_seconds(response) == 120
+    assert retry_delay(response, 0, 1) == 120
+    dated = MockResponse(
+        headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    )
+    assert retry_after_seconds(dated) == 0
+
+
+def test_retry_classification():
+    """
+    throttling and server trouble are retryable; Horizons rejecting the
+    request itself is not.
+    """
+    for status_code in (429, 500, 503):
+        check_retryable(MockResponse(status_code=status_code))
+    bad_command = MockResponse(
+        content=b'{"error": "Cannot interpret date. Type \\"?!\\""}',
+        status_code=400,
+    )
+    with pytest.raises(HorizonsReturnedError, match="Cannot interpret"):
+        check_retryable(bad_command)
+    bad_text_command = MockResponse(
+        content=b"Cannot interpret date.\n",
+        url="https://ssd.jpl.nasa.gov/api/horizons.api?format=text",
+        status_code=400,
+    )
+    with pytest.raises(HorizonsReturnedError, match="Cannot interpret"):
+        check_retryable(bad_text_command)
@@ -1,10 +1,19 @@
 """unit tests for special response-parsing cases"""
 
 from itertools import product
+import json
 
+import pandas as pd
 import pytest
-from lhorizon._response_parsers import make_lhorizon_dataframe, \
-    polish_lhorizon_dataframe
+
+import lhorizon.config
+from lhorizon._response_parsers import (
+    OOBTimeWarning,
+    make_cleanup_plan,
+    make_lhorizon_dataframe,
+    parse_vectors_calendar,
+    polish_lhorizon_dataframe,
+)
 from lhorizon.tests.data.test_cases import TEST_CASES
 from lhorizon.tests.utilz import check_against_reference
 
@@ -31,3 +40,57 @@ def test_response_parser(case_name: str, query_type: str):
     test_df = make_lhorizon_dataframe(test_text)
     test_table = polish_lhorizon_dataframe(test_df, query_type)
     check_against_reference(case, query_type, test_df, test_table)
+
+
+def test_response_parser_edge_cases():
+    """
+    non-ASCII text before the data section should not throw off the
+    parser's offsets, and responses without data should raise errors
+    """
+    case = cases["CERES_2000"]
+    with open(case["data_path"] + "_VECTORS", "rb") as file:
+        body = json.loads(file.read())
+    reference = make_lhorizon_dataframe(json.dumps(body))
+    body["result"] = "Ceres — °\n" + body["result"]
+    pd.testing.assert_frame_equal(
+        make_lhorizon_dataframe(json.dumps(body)), reference
+    )
+    body["result"] = body["result"].replace("$$SOE", "")
+    with pytest.raises(ValueError, match="Couldn't parse"):
+        make_lhorizon_dataframe(json.dumps(body))
+
+
+def test_vectors_calendar_parsing():
+    """
+    VECTORS calendar dates should parse to Timestamps across the A.D.
+    range, and be left as strings, with a warning, if any are B.C.
+    """
+    dates = pd.Series(
+        ["A.D. 2000-Jan-01 00:00:00.0000", "A.D. 1066-Oct-14 09:30:00.5000"]
+    )
+    parsed = parse_vectors_calendar(dates)
+    assert parsed[0] == pd.Timestamp("2000-01-01")
+    assert parsed[1] == pd.Timestamp("1066-10-14 09:30:00.5")
+    dates[2] = "B.C. 0044-Mar-15 12:00:00.0000"
+    with pytest.warns(OOBTimeWarning):
+        assert parse_vectors_calendar(dates) is dates
+
+
+def test_cleanup_plan_cache(monkeypatch):
+    """
+    cleanup plans should be reused for identical columns, but not if
+    TABLE_PATTERNS changes.
+    """
+    case = cases["CERES_2000"]
+    with open(case["data_path"] + "_VECTORS", "rb") as file:
+        frame = make_lhorizon_dataframe(file.read().decode())
+    plan = make_cleanup_plan("VECTORS", frame.columns)
+    assert make_cleanup_plan("VECTORS", list(frame.columns)) is plan
+    assert [step.name for step in plan][:2] == ["time_tdb", "x"]
+    assert (plan[0].scale, plan[1].scale) == (None, 1000)
+    monkeypatch.setitem(
+        lhorizon.config.TABLE_PATTERNS,
+        "VECTORS",
+        lhorizon.config.TABLE_PATTERNS["VECTORS"] | {"X": "x_m"},
+    )
+    assert polish_lhorizon_dataframe(frame, "VECTORS").columns[1] == "x_m"
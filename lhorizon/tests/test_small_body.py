@@ -0,0 +1,84 @@
+"""tests for lhorizon.small_body, using a stand-in Horizons response"""
+
+import base64
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("spiceypy")
+
+from lhorizon import LHorizon
+from lhorizon._response_parsers import HorizonsReturnedError
+from lhorizon.constants import J2000_JD
+from lhorizon.lhorizon_utils import default_lhorizon_session
+from lhorizon.small_body import SmallBodySPK
+from lhorizon.spk import write_spk
+from lhorizon.tests.utilz import (
+    MockResponse,
+    circular_orbit,
+    mock_circular_orbit_table,
+)
+
+RADIUS = 2.2e11
+PERIOD = 1.76 * 365.25
+
+
+def stand_in_spk_response(mocker, tmp_path):
+    """
+    the body of a Horizons small-body SPK response, with an SPK file for a
+    body on a circular heliocentric orbit written by write_spk()
+    """
+
+    mock_circular_orbit_table(
+        mocker, J2000_JD + np.arange(0, 60.5, 0.5), RADIUS, PERIOD
+    )
+    path = tmp_path / "stand_in.bsp"
+    write_spk(
+        path,
+        LHorizon("DES=2000433;", "@10", query_type="VECTORS"),
+        body=20000433,
+    )
+    mocker.stopall()
+    return json.dumps(
+        {
+            "signature": {"source": "stand-in", "version": "1.2"},
+            "spk_file_id": "20000433",
+            "spk": base64.b64encode(path.read_bytes()).decode("ascii"),
+        }
+    ).encode("utf-8")
+
+
+def test_small_body_spk(mocker, tmp_path):
+    content = stand_in_spk_response(mocker, tmp_path)
+    session = default_lhorizon_session()
+    send = mocker.patch.object(
+        session, "send", return_value=MockResponse(content=content)
+    )
+    cache = tmp_path / "spk"
+    eros = SmallBodySPK(
+        "DES=2000433;", "2000-01-01", "2000-03-01", cache, session=session
+    )
+    assert "EPHEM_TYPE=SPK" in eros.request.url
+    try:
+        epochs = J2000_JD + np.linspace(1, 59, 20)
+        table = eros.table(epochs)
+        assert eros.body == 20000433
+        position, _ = circular_orbit(epochs, RADIUS, PERIOD)
+        assert np.allclose(table["x"], position[:, 0], atol=5)
+        assert np.allclose(table["dist"], RADIUS, atol=5)
+        # a second object for the same span reads the cached file
+        again = SmallBodySPK(
+            "DES=2000433;", "2000-01-01", "2000-03-01", cache, session=session
+        )
+        assert again.fetch() == eros.path
+        assert send.call_count == 1
+    finally:
+        eros.unload()
+    send.return_value = MockResponse(
+        content=json.dumps({"error": "no such object"}).encode("utf-8")
+    )
+    with pytest.raises(HorizonsReturnedError):
+        SmallBodySPK(
+            "DES=9999999;", "2000-01-01", "2000-03-01", cache, session=session
+        ).fetch()
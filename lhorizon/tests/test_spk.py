@@ -0,0 +1,169 @@
+"""tests for lhorizon.spk, using mocked VECTORS tables"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+spice = pytest.importorskip("spiceypy")
+
+from lhorizon import LHorizon
+from lhorizon.constants import J2000_JD
+from lhorizon.lhorizon_utils import jd_to_et
+from lhorizon.spk import SpiceBackend, spk_segment_parameters, write_spk
+from lhorizon.tests.data.test_cases import TEST_CASES
+from lhorizon.tests.utilz import (
+    circular_orbit,
+    make_mock_query_from_test_case,
+    mock_circular_orbit_table,
+)
+
+RADIUS = 3.844e8
+PERIOD = 27.32
+
+
+def mock_vectors_table(mocker):
+    """make LHorizon.table() return 6-hourly samples of a circular orbit"""
+    mock_circular_orbit_table(
+        mocker, J2000_JD + np.arange(0, 30.25, 0.25), RADIUS, PERIOD
+    )
+
+
+def test_spk_segment_parameters():
+    vectors = LHorizon(301, "500@399", query_type="VECTORS")
+    assert spk_segment_parameters(vectors) == {
+        "body": 301, "center": 399, "frame": "ECLIPJ2000"
+    }
+    equatorial = LHorizon(
+        "301",
+        "@10",
+        query_type="VECTORS",
+        query_options={"ref_plane": "FRAME"},
+    )
+    assert spk_segment_parameters(equatorial)["frame"] == "J2000"
+    assert spk_segment_parameters(equatorial)["center"] == 10
+    with pytest.raises(ValueError):
+        spk_segment_parameters(LHorizon("Ceres", query_type="VECTORS"))
+    assert spk_segment_parameters(
+        LHorizon("Ceres", query_type="VECTORS"), body=2000001
+    )["body"] == 2000001
+    with pytest.raises(ValueError):
+        spk_segment_parameters(LHorizon(301, "5@399", query_type="VECTORS"))
+    with pytest.raises(ValueError):
+        spk_segment_parameters(
+            LHorizon(301, query_type="VECTORS", vec_corr="LT")
+        )
+    with pytest.raises(ValueError):
+        spk_segment_parameters(LHorizon(301))
+
+
+def test_write_spk(mocker, tmp_path):
+    mock_vectors_table(mocker)
+    path = tmp_path / "moon.bsp"
+    write_spk(path, LHorizon(301, "500@399", query_type="VECTORS"))
+    with pytest.raises(FileExistsError):
+        write_spk(path, LHorizon(301, "500@399", query_type="VECTORS"))
+    spice.furnsh(str(path))
+    try:
+        et = jd_to_et(J2000_JD + np.linspace(0.1, 29.9, 50))
+        states, _ = spice.spkezr(
+            "301", et, "ECLIPJ2000", "NONE", "399"
+        )
+        states = np.array(states) * 1000
+        position, _ = circular_orbit(J2000_JD + et / 86400, RADIUS, PERIOD)
+        # 6-hourly samples of a month-long orbit are good to meters
+        assert np.abs(states[:, :3] - position).max() < 5
+        with pytest.raises(spice.stypes.SpiceyError):
+            spice.spkezr(
+                "301", jd_to_et(J2000_JD + 31), "J2000", "NONE", "399"
+            )
+    finally:
+        spice.unload(str(path))
+    # failed writes leave no file behind
+    broken = tmp_path / "broken.bsp"
+    with pytest.raises(spice.stypes.SpiceyError):
+        write_spk(
+            broken,
+            LHorizon(301, "500@399", query_type="VECTORS"),
+            frame="NOT_A_FRAME",
+        )
+    assert not broken.exists()
+
+
+def test_spice_backend(mocker, tmp_path):
+    mock_vectors_table(mocker)
+    path = tmp_path / "moon.bsp"
+    write_spk(path, LHorizon(301, "500@399", query_type="VECTORS"))
+    mocker.stopall()
+    backend = SpiceBackend([path])
+    try:
+        hourly = LHorizon(
+            301,
+            "500@399",
+            epochs={"start": "2000-01-02", "stop": "2000-01-05", "step": "1h"},
+            query_type="VECTORS",
+            backend=backend,
+        )
+        table = hourly.table()
+        reference = pd.read_csv(
+            TEST_CASES["CERES_2000"]["data_path"] + "_VECTORS_table.csv"
+        )
+        assert list(table.columns) == list(reference.columns)
+        assert len(table) == 73
+        assert table["time_tdb"].iloc[1] == pd.Timestamp("2000-01-02T01:00")
+        position, _ = circular_orbit(
+            J2000_JD + 0.5 + np.arange(73) / 24, RADIUS, PERIOD
+        )
+        assert np.allclose(table["x"], position[:, 0], rtol=0, atol=5)
+        assert np.allclose(table["dist"], RADIUS, rtol=0, atol=5)
+        assert np.allclose(table["velocity"], 0, atol=1e-3)
+        assert np.allclose(table["light_time"], RADIUS / 299792458)
+        # options are respected
+        listed = LHorizon(
+            301,
+            "500@399",
+            epochs=[J2000_JD + 1, J2000_JD + 2],
+            query_type="VECTORS",
+            time_format="jd",
+            columns=["jd_tdb", "x", "y"],
+            backend=backend,
+        ).table()
+        assert list(listed.columns) == ["jd_tdb", "x", "y"]
+        assert np.allclose(listed["x"], table["x"].iloc[[12, 36]])
+        # requests the kernels do not cover go to JPL Horizons
+        mocker.patch.object(
+            LHorizon,
+            "query",
+            make_mock_query_from_test_case(
+                TEST_CASES["CERES_2000"], "VECTORS"
+            ),
+        )
+        uncovered = LHorizon(
+            499, "500@399", epochs=J2000_JD, query_type="VECTORS"
+        )
+        assert backend.table(uncovered) is None
+        uncovered.backend = backend
+        assert np.allclose(uncovered.table()["x"], reference["x"])
+        # as do requests whose epochs the backend can't interpret...
+        unreadable = LHorizon(
+            301,
+            "500@399",
+            epochs={"start": "2000-01-02", "stop": "2000-01-05",
+                    "step": "1 hours"},
+            query_type="VECTORS",
+        )
+        assert backend.table(unreadable) is None
+        unreadable.backend = backend
+        assert np.allclose(unreadable.table()["x"], reference["x"])
+        # ...but Julian date ranges are read
+        julian = LHorizon(
+            301,
+            "500@399",
+            epochs={"start": "JD2451545.5", "stop": "JD2451546.5",
+                    "step": "1h"},
+            query_type="VECTORS",
+        )
+        assert np.allclose(
+            backend.table(julian)["x"], table["x"].iloc[:25]
+        )
+    finally:
+        spice.unload(str(path))
@@ -0,0 +1,93 @@
+"""tests for lhorizon.store, using mocked queries"""
+
+import dateutil.parser as dtp
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from lhorizon import LHorizon
+from lhorizon.store import (
+    EphemerisStore,
+    merge_intervals,
+    subtract_intervals,
+)
+from lhorizon.tests.utilz import MockResponse
+
+
+def mock_lhorizons(mocker):
+    """
+    make LHorizons produce tables with a row for each time in their ranges.
+    returns a list that records the ranges that were queried.
+    """
+    queried = []
+
+    def mock_query(self, *args, **kwargs):
+        queried.append(self.epochs)
+        self.response = MockResponse(content=b"{}")
+
+    def mock_table(self):
+        times = pd.date_range(
+            dtp.parse(self.epochs["start"]),
+            dtp.parse(self.epochs["stop"]),
+            freq=self.epochs["step"].replace("m", "min"),
+        ).astype("M8[us]")
+        return pd.DataFrame({"time": times, "x": times.day.astype(float)})
+
+    mocker.patch.object(LHorizon, "query", mock_query)
+    mocker.patch.object(LHorizon, "table", mock_table)
+    return queried
+
+
+def test_interval_arithmetic():
+    assert merge_intervals([[5, 9], [0, 3], [4, 4], [12, 15]]) == [
+        [0, 9], [12, 15]
+    ]
+    assert subtract_intervals(-5, 20, [[0, 9], [12, 15]]) == [
+        [-5, -1], [10, 11], [16, 20]
+    ]
+    assert subtract_intervals(1, 8, [[0, 9]]) == []
+
+
+def test_ephemeris_store(mocker, tmp_path):
+    """
+    the store should fetch only the parts of a range it does not hold,
+    remember what it holds between sessions, and return exactly the
+    requested range.
+    """
+    queried = mock_lhorizons(mocker)
+    store = EphemerisStore(tmp_path, fetch_options={"delay_between": 0})
+    first = {"start": "2000-01-01", "stop": "2000-01-10", "step": "1h"}
+    table = store.table(first)
+    assert len(queried) == 1
+    assert len(table) == 9 * 24 + 1
+    # a sliding window fetches only its new part
+    second = {"start": "2000-01-05", "stop": "2000-01-15", "step": "1h"}
+    table = store.table(second)
+    assert queried[-1]["start"] == "2000-01-10T01:00:00"
+    assert queried[-1]["stop"] == "2000-01-15T00:00:00"
+    expected = pd.date_range("2000-01-05", "2000-01-15", freq="1h")
+    assert np.array_equal(table["time"], expected)
+    # a new store object over the same directory holds all of it
+    store = EphemerisStore(tmp_path)
+    assert store.missing(
+        {"start": "2000-01-01T06:00", "stop": "2000-01-14", "step": "1h"}
+    ) == []
+    table = store.table(
+        {"start": "2000-01-01T06:00", "stop": "2000-01-14", "step": "1h"}
+    )
+    assert len(queried) == 2
+    assert table["time"].iloc[0] == pd.Timestamp("2000-01-01T06:00")
+    assert len(table) == 12 * 24 + 18 + 1
+    # ranges on another grid, or with other options, are separate queries
+    assert len(
+        store.missing(
+            {"start": "2000-01-01T00:30", "stop": "2000-01-02", "step": "1h"}
+        )
+    ) == 1
+    assert len(store.missing(first, query_type="VECTORS")) == 1
+    with pytest.raises(ValueError):
+        store.missing(
+            {"start": "2000-01-01", "stop": "2001-01-01", "step": "1mo"}
+        )
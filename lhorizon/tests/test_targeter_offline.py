@@ -6,7 +6,11 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from lhorizon.tests.utilz import make_sure_this_fails, PointlessTargeter
+from lhorizon.tests.utilz import (
+    make_mock_query_from_test_case,
+    make_sure_this_fails,
+    PointlessTargeter,
+)
 
 # skip these tests if running in an install that doesn't include dependencies
 # for lhorizon.target
@@ -181,3 +185,29 @@ def test_things_that_should_not_work():
         [lol_no],
         expected_error_type=TypeError,
     )
+
+
+def test_targeter_requests_minimal_columns(mocker):
+    """
+    Targeter should ask an unqueried LHorizon for only the columns it needs
+    """
+    case = TEST_CASES["CYDONIA_PALM_SPRINGS_1959_TOPO"]
+    mock_query = make_mock_query_from_test_case(case)
+    urls = []
+
+    def recording_query(self, *args, **kwargs):
+        urls.append(self.request.url)
+        return mock_query(self, *args, **kwargs)
+
+    mocker.patch.object(LHorizon, "query", recording_query)
+    body = LHorizon(**case["init_kwargs"])
+    url = body.request.url
+    targeter = Targeter(body, target_radius=LUNAR_RADIUS)
+    assert "QUANTITIES=%2720%2C45%27" in urls[0]
+    # the passed LHorizon is left alone
+    assert (body.columns is None) and (body.request.url == url)
+    assert body.check_queried() is False
+    assert {"x", "y", "z", "time", "dist"}.issubset(
+        targeter.ephemerides["body"].columns
+    )
+    assert "sub_lon" not in targeter.ephemerides["body"].columns
@@ -5,7 +5,8 @@ import json
 import numpy as np
 import pandas as pd
 
-from lhorizon.lhorizon_utils import numeric_columns
+from lhorizon import LHorizon
+from lhorizon.lhorizon_utils import jd_to_et, numeric_columns
 
 
 class MockResponse:
@@ -74,6 +75,43 @@ def make_mock_query_from_test_case(test_case, query_type_suffix="OBSERVER"):
     return mock_query
 
 
+def circular_orbit(jd_tdb, radius, period, tilt=0):
+    """
+    positions and velocities (m, m/s) at Julian dates (TDB) `jd_tdb` of a
+    body on a circular orbit with `radius` in m and `period` in days, at +x
+    at J2000. the orbit is in the xy plane, unless `tilt` is nonzero, in
+    which case z is `tilt` times y.
+    """
+    rate = 2 * np.pi / (period * 86400)
+    angle = rate * jd_to_et(jd_tdb)
+    cos, sin = np.cos(angle), np.sin(angle)
+    position = radius * np.c_[cos, sin, tilt * sin]
+    velocity = radius * rate * np.c_[-sin, cos, tilt * cos]
+    return position, velocity
+
+
+def vectors_table(jd_tdb, position, velocity):
+    """a VECTORS-style table of states at Julian dates (TDB) `jd_tdb`"""
+    table = pd.DataFrame(
+        np.hstack([position, velocity]),
+        columns=["x", "y", "z", "vx", "vy", "vz"],
+    )
+    table.insert(0, "jd_tdb", jd_tdb)
+    return table
+
+
+def mock_circular_orbit_table(mocker, jd_tdb, radius, period):
+    """
+    make LHorizon.table() return samples of a circular orbit (see
+    `circular_orbit()`) at `jd_tdb`
+    """
+
+    def mock_table(self):
+        return vectors_table(jd_tdb, *circular_orbit(jd_tdb, radius, period))
+
+    mocker.patch.object(LHorizon, "table", mock_table)
+
+
 def raise_badness(bad_table, bad_df=None):
     bad_table_str = ", ".join(f"{k}: (max {v})" for k, v in bad_table.items())
     if bad_df is not None:
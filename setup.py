@@ -21,6 +21,8 @@ setup(
         "tests": ["pytest", "pytest-mock", "pytest-cov"],
         "target": ["spiceypy", "sympy"],
         "examples": ["jupyter"],
+        "async": ["aiohttp"],
+        "dataset": ["pyarrow"],
         "benchmarks": ["memory-profiler", "pympler", "astroquery"]
     },
     package_data={